@@ -1,49 +1,30 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-import os
-
-from services.data import get_ohlcv, get_info, get_financials
-from services.news import google_news_rss
-from services.technical import add_indicators, technical_plan
-from services.orderflow import orderflow_radar
-from services.financials import key_financial_tables
-from services.valuation import fair_value_pe, fair_value_pbv, classify_valuation
-from services.scoring import score_all, verdict
-from services.relative import build_peer_table, calc_relative_snapshot, label_relative
-from services.risk import risk_flags
-from services.fundamental_score import fundamental_score
-from services.verdict_engine import final_verdict
-from services.ai_news import gemini_news_summary
+
+from services.cache import default_cache
+from services.coordinator import default_coordinator
+from services.data import get_ohlcv, get_info
+from services.asof import AsOfReplay, sources_as_of
+from services.intraday import trailing
+from services.technical import TIMEFRAME_LABELS
+from services.news import google_news_rss, ticker_query
+from services.news_signal import default_news_signals
+from services.relative import build_peer_table, calc_relative_snapshot, label_relative, percentile_rank
+from services.ai_news import default_summarizer
+from services.pipeline import build_pipeline
+from services.prefetch import Prefetcher, default_jobs, staleness
+from services.info_snapshot import default_snapshot
+from services.statements import default_statement_store
 
 from dotenv import load_dotenv
 load_dotenv()
 
-from utils import rupiah, rupiah_short
+from utils import age_label, rupiah, rupiah_short, load_watchlist
 
 
 st.set_page_config(page_title="StockLab", layout="wide")
 
-def load_watchlist(filename="watchlist.txt"):
-    base_dir = os.path.dirname(os.path.abspath(__file__))  # lokasi app.py
-    file_path = os.path.join(base_dir, filename)
-
-    try:
-        with open(file_path, "r") as f:
-            tickers = []
-            for line in f:
-                t = line.strip().upper()
-                if not t:
-                    continue
-                if not t.endswith(".JK"):
-                    t += ".JK"
-                tickers.append(t)
-            return tickers
-
-    except FileNotFoundError:
-        return ["BBRI.JK", "ADRO.JK"]
-
-
 def candle_chart(df, title):
     fig = go.Figure()
     fig.add_trace(go.Candlestick(
@@ -72,40 +53,6 @@ def trend_label(series):
     except Exception:
         return "N/A"
 
-def calc_risk_snapshot(
-    capital,
-    entry_price,
-    stop_price,
-    tp_price,
-    risk_pct=1.0
-):
-    # risk per share
-    risk_per_share = entry_price - stop_price
-    if risk_per_share <= 0:
-        return None
-
-    # uang yang siap dirisikokan
-    risk_amount = capital * (risk_pct / 100)
-
-    # ukuran posisi (lembar)
-    position_size = risk_amount / risk_per_share
-
-    # nilai posisi
-    position_value = position_size * entry_price
-
-    # reward
-    reward_per_share = tp_price - entry_price
-    rr_actual = reward_per_share / risk_per_share if risk_per_share > 0 else None
-
-    return {
-        "risk_amount": risk_amount,
-        "position_size": position_size,
-        "position_value": position_value,
-        "rr_actual": rr_actual,
-        "risk_pct": risk_pct,
-    }
-
-
 st.title("📈 StockLab — Analisis Saham End-to-End")
 
 watchlist = load_watchlist()
@@ -129,6 +76,31 @@ with st.sidebar:
     )
     risk_pct = st.slider("Risk per Trade (%)", 0.5, 2.0, 1.0, 0.25)
 
+    st.divider()
+    st.subheader("Replay Historis")
+    as_of = None
+    if st.checkbox("Tampilkan dashboard per tanggal lampau (as of)"):
+        as_of = st.date_input("As of", value=pd.Timestamp.now().date() - pd.Timedelta(days=365))
+
+    st.divider()
+    cache_stats = default_cache().stats()
+    fetch_stats = default_coordinator().stats()
+    st.caption(f"Cache data: hit rate {cache_stats['hit_rate']:.0%} • {fetch_stats['started']} fetch • "
+               f"{fetch_stats['coalesced']} request digabung • {fetch_stats['timeouts']} timeout • "
+               f"{cache_stats['stale']} stale")
+
+@st.cache_resource
+def prefetcher():
+    # satu scheduler warm-up per proses server: ticker aktif & berikutnya duluan, laporan malam hari
+    pf = Prefetcher(watchlist, jobs=default_jobs(period="2y", news_items=10))
+    pf.start()
+    return pf
+
+
+pf = prefetcher()
+pf.touch(ticker)
+pf.hint_next(watchlist[(watchlist.index(ticker) + 1) % len(watchlist)])
+
 df_raw = get_ohlcv(ticker, period=period, interval="1d")
 min_bars = 220 if period in ["2y", "5y"] else 120
 
@@ -138,12 +110,72 @@ if df_raw.empty or len(df_raw) < min_bars:
         "Analisis disederhanakan (EMA200 / bandarmologi bisa kurang akurat)."
     )
 
-df = add_indicators(df_raw)
-
 info = get_info(ticker)
-fin = get_financials(ticker)
-# --- Peer infos (best effort, dari watchlist)
-peer_infos = {ticker: info}  
+# long kanonik; refresh laporan dijadwalkan prefetcher di luar jam bursa, Yahoo hanya kalau belum ada lokal
+fin = default_statement_store().read(ticker)
+if fin.empty:
+    fin = default_statement_store().load(ticker)
+
+# berita (cache feed on-disk) -> sinyal terstruktur; hanya artikel baru yang diklasifikasi
+news = google_news_rss(ticker_query(ticker), max_items=10)
+news_sig = default_news_signals().update(ticker, news)
+
+if as_of:
+    # point-in-time: OHLCV s/d tanggal itu, hanya laporan yang sudah terbit, sinyal berita saat itu
+    src = sources_as_of({"ohlcv": df_raw, "info": info, "financials": fin}, as_of, ticker, default_news_signals())
+    df_raw, info, fin, news_sig = src["ohlcv"], src["info"], src["financials"], src["news_signal"]
+    if df_raw.empty:
+        st.error(f"Tidak ada data harga s/d {as_of}; perbesar Period.")
+        st.stop()
+    st.info(f"Mode historis: dashboard direkonstruksi per **{as_of}** (daftar berita di bawah tetap terbaru).")
+
+
+@st.cache_resource
+def analysis_pipeline():
+    # satu DAG + cache hasil per proses server, dipakai bersama semua sesi
+    return build_pipeline()
+
+
+# --- Seluruh analisis lewat DAG: stage yang input/parameternya tidak berubah diambil dari cache
+res = analysis_pipeline().run(
+    inputs={"ohlcv": df_raw, "info": info, "financials": fin, "news_signal": news_sig},
+    params={
+        "rr": rr,
+        "lookback": 20,
+        "target_pe": target_pe,
+        "target_pbv": target_pbv,
+        "capital": capital,
+        "risk_pct": risk_pct,
+    },
+)
+df = res["indicators"]
+
+
+@st.cache_resource
+def info_snapshot():
+    # snapshot diisi job "info" prefetcher; thread ini cadangan berlaju rendah untuk ticker yang
+    # belum terjangkau prefetcher (hanya yang stale > 24 jam), lewat get_info & budget yang sama
+    snap = default_snapshot()
+    snap.start_background_refresh(watchlist, every=6 * 3600, batch=10, max_workers=1,
+                                  fetch=get_info, limiter=pf.limiter)
+    return snap
+
+
+# --- Peer infos (snapshot on-disk seluruh watchlist)
+snapshot = info_snapshot()
+if info and not as_of and snapshot.stale([ticker]):
+    snapshot.update(ticker, info)
+peer_infos = snapshot.peers(sector=info.get("sector")) if info.get("sector") else {}
+if not as_of:
+    peer_infos[ticker] = info
+
+
+# --- Umur data (cache dijaga hangat oleh prefetcher)
+ages = staleness(ticker, period=period)
+st.caption(
+    "Umur data: " + " • ".join(f"{k} {age_label(v)}" for k, v in ages.items())
+    + f" • prefetch {pf.summary()['warm_tickers']}/{len(watchlist)} ticker hangat"
+)
 
 
 # ---- 1) Profile
@@ -164,13 +196,12 @@ with col2:
 with col3:
     last_close = float(df["Close"].iloc[-1])
     st.metric("Last Close", f"{last_close:,.2f}")
-    st.metric("52W High", f"{float(df['High'].tail(252).max()):,.2f}")
-    st.metric("52W Low", f"{float(df['Low'].tail(252).min()):,.2f}")
+    last_52w = trailing(df, "52W")  # window waktu, bukan jumlah bar
+    st.metric("52W High", f"{float(last_52w['High'].max()):,.2f}")
+    st.metric("52W Low", f"{float(last_52w['Low'].min()):,.2f}")
 
 # ---- 2) News
 st.header("2) Berita Terkait")
-q = f"{ticker.replace('.JK','')} saham"
-news = google_news_rss(q, max_items=10)
 if not news:
     st.info("Belum dapat berita dari RSS. Coba query lain atau cek koneksi.")
 else:
@@ -182,11 +213,26 @@ else:
             unsafe_allow_html=True
         )
 
+st.caption(
+    f"Sinyal berita: **{news_sig['label']}** (skor {news_sig['score']:+.2f}, "
+    f"{news_sig['events']} artikel tercatat, half-life 7 hari)"
+    + (" • ⚠️ ada berita HIGH negatif baru-baru ini" if news_sig["high_negative"] else "")
+)
+with st.expander("Klasifikasi berita (kategori / dampak)"):
+    ev = default_news_signals().events(ticker, limit=20)
+    if ev:
+        ev_df = pd.DataFrame(ev)
+        ev_df["ts"] = pd.to_datetime(ev_df["ts"], unit="s")
+        ev_df["sign"] = ev_df["sign"].map({1: "➕", 0: "•", -1: "➖"})
+        st.dataframe(ev_df, use_container_width=True, hide_index=True)
+    else:
+        st.caption("Belum ada berita tercatat.")
+
 st.subheader("🧠 AI News Summary")
 
-@st.cache_data(ttl=3600)
 def cached_ai_news_summary(ticker, news):
-    return gemini_news_summary(news)
+    # cache persisten di summarizer (key = hash headline teratas), bukan seluruh list berita
+    return default_summarizer().summarize(ticker, news)
 
 if "ai_news_summary" not in st.session_state:
     st.session_state.ai_news_summary = {}
@@ -214,7 +260,7 @@ if st.session_state.ai_summary:
 
 # ---- 3) Financials 5Y
 st.header("3) Statistik Keuangan (Best-effort 5 Tahun)")
-tables = key_financial_tables(fin)
+tables = res["tables"]
 
 cA, cB, cC = st.columns(3)
 
@@ -284,52 +330,7 @@ if not tables["income"].empty:
             st.metric("Revenue YoY", "-")
 
 
-rev_yoy = None
-ni_yoy = None
-
-if not tables["income"].empty:
-    inc = tables["income"]
-    if "Total Revenue" in inc.index and len(inc.loc["Total Revenue"]) >= 2:
-        s = inc.loc["Total Revenue"]
-        rev_yoy = (s.iloc[0] - s.iloc[1]) / abs(s.iloc[1]) * 100 if s.iloc[1] != 0 else None
-
-    if "Net Income" in inc.index and len(inc.loc["Net Income"]) >= 2:
-        s = inc.loc["Net Income"]
-        ni_yoy = (s.iloc[0] - s.iloc[1]) / abs(s.iloc[1]) * 100 if s.iloc[1] != 0 else None
-
-gross_margin = None
-net_margin = None
-if not tables["income"].empty:
-    inc = tables["income"]
-    if "Gross Profit" in inc.index and "Total Revenue" in inc.index:
-        gross_margin = inc.loc["Gross Profit"].iloc[0] / inc.loc["Total Revenue"].iloc[0]
-    if "Net Income" in inc.index and "Total Revenue" in inc.index:
-        net_margin = inc.loc["Net Income"].iloc[0] / inc.loc["Total Revenue"].iloc[0]
-
-roe = info.get("returnOnEquity")
-roe = roe * 100 if roe is not None else None
-
-de_ratio = info.get("debtToEquity")
-equity_ratio = None
-if not tables["balance"].empty:
-    bal = tables["balance"]
-    if "Total Stockholder Equity" in bal.index and "Total Assets" in bal.index:
-        equity_ratio = bal.loc["Total Stockholder Equity"].iloc[0] / bal.loc["Total Assets"].iloc[0]
-
-fcf_series = None
-if not tables["cashflow"].empty and "Free Cash Flow" in tables["cashflow"].index:
-    fcf_series = tables["cashflow"].loc["Free Cash Flow"]
-
-result = fundamental_score({
-    "rev_yoy": rev_yoy,
-    "ni_yoy": ni_yoy,
-    "gross_margin": gross_margin,
-    "net_margin": net_margin,
-    "roe": roe,
-    "de_ratio": de_ratio,
-    "equity_ratio": equity_ratio,
-    "fcf_series": fcf_series
-})
+result = res["fundamentals"]
 
 st.header("🧮 Fundamental Scoring")
 
@@ -346,42 +347,60 @@ with c2:
 
 st.header("📊 Relative Analysis (vs Peer Watchlist)")
 
-peer_df = build_peer_table(ticker, peer_infos)
+if as_of:
+    # snapshot peer = data terkini -> membandingkan dengan PE/PBV point-in-time akan menyesatkan
+    st.info("Perbandingan peer dilewati di mode historis: snapshot peer hanya berisi data terkini.")
+else:
+    peer_df = build_peer_table(ticker, peer_infos)
 
-# filter peers yang satu sektor (kalau tersedia)
-target_sector = info.get("sector")
-peer_same_sector = peer_df[peer_df["Sector"] == target_sector] if target_sector and not peer_df.empty else peer_df
+    # filter peers yang satu sektor (kalau tersedia)
+    target_sector = info.get("sector")
+    peer_same_sector = peer_df[peer_df["Sector"] == target_sector] if target_sector and not peer_df.empty else peer_df
 
-snap = calc_relative_snapshot(info, peer_same_sector)
+    # agregat sektor dari index snapshot (O(1)), fallback ke median tabel peer
+    peer_index = snapshot.peer_index()
+    snap = peer_index.snapshot(info, sector=target_sector) if target_sector else calc_relative_snapshot(info, peer_same_sector)
 
-c1, c2, c3 = st.columns(3)
+    c1, c2, c3 = st.columns(3)
 
-pe_label = label_relative(snap["target"]["PE"], snap["median"]["PE"])
-pbv_label = label_relative(snap["target"]["PBV"], snap["median"]["PBV"])
-roe_label = label_relative(snap["target"]["ROE%"], snap["median"]["ROE%"], band=0.20)
+    def peers_of(metric):
+        return peer_index.values(metric, sector=target_sector) if target_sector else []
 
-with c1:
-    st.metric("PE (target)", f"{snap['target']['PE']:.2f}" if snap["target"]["PE"] else "-")
-    st.caption(f"Peer median: {snap['median']['PE']:.2f}" if snap["median"]["PE"] else "Peer median: -")
-    st.write(f"Label: **{pe_label}**")
+    pe_label = label_relative(snap["target"]["PE"], snap["median"]["PE"])
+    pbv_label = label_relative(snap["target"]["PBV"], snap["median"]["PBV"])
+    roe_label = label_relative(snap["target"]["ROE%"], snap["median"]["ROE%"], band=0.20)
+    pe_rank = percentile_rank(snap["target"]["PE"], peers_of("PE"))
+    pbv_rank = percentile_rank(snap["target"]["PBV"], peers_of("PBV"))
+    roe_rank = percentile_rank(snap["target"]["ROE%"], peers_of("ROE%"))
 
-with c2:
-    st.metric("PBV (target)", f"{snap['target']['PBV']:.2f}" if snap["target"]["PBV"] else "-")
-    st.caption(f"Peer median: {snap['median']['PBV']:.2f}" if snap["median"]["PBV"] else "Peer median: -")
-    st.write(f"Label: **{pbv_label}**")
+    def rank_caption(pct, metric):
+        return f"Persentil di sektor: P{pct:.0f} dari {len(peers_of(metric))} emiten" if pct is not None else ""
 
-with c3:
-    st.metric("ROE% (target)", f"{snap['target']['ROE%']:.1f}%" if snap["target"]["ROE%"] else "-")
-    st.caption(f"Peer median: {snap['median']['ROE%']:.1f}%" if snap["median"]["ROE%"] else "Peer median: -")
-    st.write(f"Label: **{roe_label}**")
+    with c1:
+        st.metric("PE (target)", f"{snap['target']['PE']:.2f}" if snap["target"]["PE"] else "-")
+        st.caption(f"Peer median: {snap['median']['PE']:.2f}" if snap["median"]["PE"] else "Peer median: -")
+        st.write(f"Label: **{pe_label}**")
+        st.caption(rank_caption(pe_rank, "PE"))
+
+    with c2:
+        st.metric("PBV (target)", f"{snap['target']['PBV']:.2f}" if snap["target"]["PBV"] else "-")
+        st.caption(f"Peer median: {snap['median']['PBV']:.2f}" if snap["median"]["PBV"] else "Peer median: -")
+        st.write(f"Label: **{pbv_label}**")
+        st.caption(rank_caption(pbv_rank, "PBV"))
+
+    with c3:
+        st.metric("ROE% (target)", f"{snap['target']['ROE%']:.1f}%" if snap["target"]["ROE%"] else "-")
+        st.caption(f"Peer median: {snap['median']['ROE%']:.1f}%" if snap["median"]["ROE%"] else "Peer median: -")
+        st.write(f"Label: **{roe_label}**")
+        st.caption(rank_caption(roe_rank, "ROE%"))
 
-with st.expander("Lihat tabel peer"):
-    st.dataframe(peer_same_sector.sort_values(by="MCap", ascending=False), use_container_width=True)
+    with st.expander("Lihat tabel peer"):
+        st.dataframe(peer_same_sector.sort_values(by="MCap", ascending=False), use_container_width=True)
 
 # ---- Key Risks
 st.header("⚠️ Key Risks (Red Flags)")
 
-risks = risk_flags(info, tables)
+risks = res["risks"]
 
 if not risks:
     st.success("Tidak ada red flag utama terdeteksi dari data yang tersedia.")
@@ -394,22 +413,11 @@ st.header("4️) Nilai Wajar vs Harga Terbaru")
 
 last_price = last_close  # sudah kamu hitung sebelumnya
 
-eps = info.get("trailingEps")
-bvps = info.get("bookValue")
-
-fv_pe = fair_value_pe(eps, target_pe) if eps else None
-fv_pbv = fair_value_pbv(bvps, target_pbv) if bvps else None
-
-# combine fair value (rata-rata yang available)
-vals = [v for v in [fv_pe, fv_pbv] if v is not None and v > 0]
-fair = sum(vals) / len(vals) if vals else None
-
-# diskon / premium vs fair value
-discount_pct = None
-if fair and fair > 0:
-    discount_pct = (fair - last_price) / fair * 100
-
-label = classify_valuation(last_price, fair, band=0.10) if fair else "UNKNOWN"
+val = res["valuation"]
+eps, bvps = val["eps"], val["bvps"]
+fv_pe, fv_pbv, fair = val["fv_pe"], val["fv_pbv"], val["fair"]
+discount_pct = val["discount_pct"]
+label = val["label"]
 
 # =========================
 # DISPLAY (HORIZONTAL KPI)
@@ -453,7 +461,7 @@ st.write({
 
 # ---- 5) Technical plan
 st.header("5) Teknikal: Entry, Cutloss, TP (RR 1:2)")
-plan = technical_plan(df, rr=rr)
+plan = res["plan"]
 st.write({
     "Trend": plan["trend"],
     "RSI14": round(plan["rsi14"], 2),
@@ -465,19 +473,36 @@ st.write({
     "Take Profit": rupiah(plan["tp"], 0),
 })
 
+st.subheader("Konfirmasi Multi-Timeframe (Daily / Weekly / Monthly)")
+mtf = res["mtf"]
+st.dataframe(
+    pd.DataFrame([
+        {
+            "Timeframe": TIMEFRAME_LABELS.get(tf, tf),
+            "Bars": v["bars"],
+            "Trend": v["trend"],
+            "Basis": v["trend_basis"],
+            "RSI14": round(v["rsi14"], 2),
+            "Pullback EMA20": v["pullback_ok"],
+            "Vol Ratio": v["vol_ratio"],
+        }
+        for tf, v in mtf["timeframes"].items()
+    ]),
+    use_container_width=True,
+    hide_index=True,
+)
+if mtf["setup_ok"]:
+    st.success("✅ Multi-timeframe searah: " + "; ".join(mtf["reasons"]))
+else:
+    st.info("⏳ Belum searah: " + "; ".join(mtf["reasons"]))
+
 st.plotly_chart(candle_chart(df, f"{ticker} | {period}"), use_container_width=True)
 
 st.header("⚠️ Risk Snapshot & Position Sizing")
 
 entry_price = (plan["entry_low"] + plan["entry_high"]) / 2
 
-risk = calc_risk_snapshot(
-    capital=capital,
-    entry_price=entry_price,
-    stop_price=plan["stop"],
-    tp_price=plan["tp"],
-    risk_pct=risk_pct,
-)
+risk = res["position"]
 
 if risk is None:
     st.error("Risk setup tidak valid (entry <= stoploss).")
@@ -507,7 +532,7 @@ else:
 
 # ---- 6) Bandarmologi proxy
 st.header("6) Bandarmologi (Radar Akumulasi/Distribusi)")
-rad = orderflow_radar(df, lookback=20)
+rad = res["radar"]
 st.write({
     "Radar": rad["label"],
     "Vol Ratio": round(rad["vol_ratio"], 2),
@@ -520,12 +545,7 @@ st.header("7️⃣ Final Verdict: BUY / HOLD / SELL")
 # =========================
 # FINAL VERDICT ENGINE
 # =========================
-final = final_verdict(
-    fundamental_score=result["score"],
-    valuation_label=label,
-    technical_ok=plan["setup_ok"],
-    bandarmologi_label=rad["label"],
-)
+final = res["verdict"]
 
 # =========================
 # KPI DISPLAY
@@ -582,3 +602,14 @@ elif label == "MAHAL":
 # Bandarmologi context
 st.write(f"- Bandarmologi proxy: **{rad['label']}** (OBV / ADL + volume).")
 
+
+if as_of:
+    with st.expander("Riwayat verdict harian s/d tanggal as of (replay incremental)"):
+        replay_days = st.slider("Jumlah hari bursa", 20, 250, 120, 10)
+        params = {"rr": rr, "lookback": 20, "target_pe": target_pe, "target_pbv": target_pbv}
+        replay = AsOfReplay({"ohlcv": df_raw, "info": info, "financials": fin}, params, ticker=ticker,
+                            signals=default_news_signals())
+        hist = replay.frame(start=df_raw.index[-min(replay_days, len(df_raw))])
+        st.dataframe(hist, use_container_width=True)
+        st.caption(f"{replay.stats['days']} hari, skor fundamental dihitung ulang "
+                   f"{replay.stats['statement_slices']}x (hanya saat laporan baru terbit).")
@@ -0,0 +1,50 @@
+# benchmarks/_synthetic.py
+# Data OHLCV sintetis (random walk) supaya benchmark bisa jalan tanpa jaringan.
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# supaya `services.*` bisa di-import saat dijalankan dari folder web/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def synthetic_ohlcv(n_bars=1250, seed=0, start="2020-01-01") -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    idx = pd.bdate_range(start, periods=n_bars, name="Date")
+    close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.02, n_bars)))
+    open_ = close * (1 + rng.normal(0, 0.005, n_bars))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.02, n_bars))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.02, n_bars))
+    vol = rng.integers(100_000, 50_000_000, n_bars).astype(float)
+    return pd.DataFrame(
+        {"Open": open_, "High": high, "Low": low, "Close": close, "Volume": vol},
+        index=idx,
+    )
+
+
+def write_fixtures(root, tickers, n_bars=1250):
+    os.makedirs(root, exist_ok=True)
+    for i, t in enumerate(tickers):
+        synthetic_ohlcv(n_bars, seed=i).to_csv(os.path.join(root, f"{t}.csv"), index_label="Date")
+
+
+def synthetic_intraday(days=20, minutes=1, seed=0, start="2024-01-01") -> pd.DataFrame:
+    """Bar intraday sintetis hanya di jam sesi BEI (services.intraday.SESSIONS), tz Asia/Jakarta."""
+    from services.intraday import IDX_TZ, SESSIONS
+
+    stamps = []
+    for day in pd.bdate_range(start, periods=days):
+        for a, b in SESSIONS[day.weekday()]:
+            stamps.append(pd.date_range(f"{day.date()} {a}", f"{day.date()} {b}", freq=f"{minutes}min",
+                                        inclusive="left"))
+    idx = pd.DatetimeIndex(np.concatenate(stamps)).tz_localize(IDX_TZ).rename("Datetime")
+    n = len(idx)
+    rng = np.random.default_rng(seed)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.001 * np.sqrt(minutes), n)))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.001, n))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.001, n))
+    vol = rng.integers(100, 50_000, n).astype(float) * 100
+    return pd.DataFrame({"Open": open_, "High": high, "Low": low, "Close": close, "Volume": vol}, index=idx)
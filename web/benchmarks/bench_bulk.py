@@ -0,0 +1,44 @@
+# benchmarks/bench_bulk.py
+"""
+Bandingkan fetch serial vs bulk paralel untuk seluruh watchlist, offline.
+
+    cd web
+    python benchmarks/bench_bulk.py                       # fixture sintetis
+    python benchmarks/bench_bulk.py --fixtures data/fx    # fixture hasil record_fixtures
+"""
+import argparse
+import tempfile
+
+from _synthetic import write_fixtures
+
+from services.bulk import fetch_ohlcv_bulk, fixture_backend
+from utils import load_watchlist
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--fixtures", help="folder CSV rekaman; default: buat sintetis")
+    p.add_argument("--latency", type=float, default=0.05, help="simulasi round trip (detik)")
+    p.add_argument("--workers", type=int, default=16)
+    p.add_argument("--limit", type=int, default=200, help="jumlah ticker (0 = semua)")
+    args = p.parse_args()
+
+    tickers = load_watchlist()
+    if args.limit:
+        tickers = tickers[: args.limit]
+
+    root = args.fixtures or tempfile.mkdtemp(prefix="stocklab_fx_")
+    if not args.fixtures:
+        write_fixtures(root, tickers)
+
+    backend = fixture_backend(root, latency=args.latency)
+    for workers in (1, args.workers):
+        res = fetch_ohlcv_bulk(tickers, period="5y", backend=backend, max_workers=workers, retries=0)
+        print(
+            f"workers={workers:>3}  tickers={len(tickers)}  ok={len(res['frames'])}  "
+            f"errors={len(res['errors'])}  elapsed={res['elapsed']:.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
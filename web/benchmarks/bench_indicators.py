@@ -0,0 +1,113 @@
+# benchmarks/bench_indicators.py
+"""
+Jalur indikator hemat alokasi (add_indicators + orderflow_radar) vs versi lama (df.copy berlapis,
+atr via pd.concat, VOL_AVG20 dihitung dua kali): waktu & peak memori per ticker, hasil harus identik.
+
+    cd web
+    python benchmarks/bench_indicators.py --bars 1250 --tickers 200
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from _synthetic import synthetic_ohlcv
+
+from services.orderflow import orderflow_radar, radar_label
+from services.technical import add_indicators, ema, rsi
+
+
+# ---------- versi lama (sebelum jalur copy-free), hanya untuk pembanding ----------
+def legacy_atr(df, period=14):
+    high, low, close = df["High"], df["Low"], df["Close"]
+    prev_close = close.shift(1)
+    tr = pd.concat([(high - low), (high - prev_close).abs(), (low - prev_close).abs()], axis=1).max(axis=1)
+    return tr.ewm(alpha=1/period, adjust=False).mean()
+
+
+def legacy_add_indicators(df):
+    d = df.copy()
+    d["EMA20"] = ema(d["Close"], 20)
+    d["EMA50"] = ema(d["Close"], 50)
+    d["EMA200"] = ema(d["Close"], 200)
+    d["RSI14"] = rsi(d["Close"], 14)
+    d["ATR14"] = legacy_atr(d, 14)
+    d["VOL_AVG20"] = d["Volume"].rolling(20).mean()
+    return d
+
+
+def legacy_orderflow_radar(df, lookback=20):
+    d = df.copy()
+    d["OBV"] = (np.sign(d["Close"].diff()).fillna(0) * d["Volume"]).cumsum()
+    mfm = ((d["Close"] - d["Low"]) - (d["High"] - d["Close"])) / (d["High"] - d["Low"]).replace(0, 1e-12)
+    d["ADL"] = (mfm * d["Volume"]).cumsum()
+    d["VOL_AVG20"] = d["Volume"].rolling(20).mean()
+    recent = d.tail(lookback)
+    obv_slope = recent["OBV"].iloc[-1] - recent["OBV"].iloc[0]
+    adl_slope = recent["ADL"].iloc[-1] - recent["ADL"].iloc[0]
+    last = d.iloc[-1]
+    vol_ratio = float(last["Volume"]) / (float(last["VOL_AVG20"]) if float(last["VOL_AVG20"]) > 0 else 1.0)
+    rng = float(last["High"] - last["Low"]) if float(last["High"] - last["Low"]) != 0 else 1.0
+    close_pos = float((last["Close"] - last["Low"]) / rng)
+    return {"label": radar_label(obv_slope, adl_slope, vol_ratio, close_pos), "vol_ratio": vol_ratio,
+            "close_pos": close_pos, "obv_slope": obv_slope, "adl_slope": adl_slope,
+            "obv_series": d["OBV"], "adl_series": d["ADL"]}
+
+
+def run(path, frames):
+    ind_fn, radar_fn = path
+    out = []
+    for df in frames:
+        d = ind_fn(df)
+        out.append((d, radar_fn(d)))
+    return out
+
+
+def measure(path, frames):
+    t0 = time.perf_counter()
+    run(path, frames)
+    elapsed = time.perf_counter() - t0
+
+    peaks = []
+    for df in frames[:20]:
+        tracemalloc.start()
+        run(path, [df])
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return elapsed / len(frames), float(np.median(peaks))
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--tickers", type=int, default=200)
+    p.add_argument("--bars", type=int, default=1250)
+    args = p.parse_args()
+
+    frames = [synthetic_ohlcv(args.bars, seed=i) for i in range(args.tickers)]
+    legacy = (legacy_add_indicators, legacy_orderflow_radar)
+    new = (add_indicators, orderflow_radar)
+
+    # hasil harus identik (bit-for-bit), juga kalau ada bar dengan Volume / High NaN
+    gaps = frames[0].copy()
+    gaps.iloc[len(gaps) // 3, gaps.columns.get_loc("Volume")] = np.nan
+    gaps.iloc[len(gaps) // 2, gaps.columns.get_loc("High")] = np.nan
+    checks = frames[:20] + [gaps]
+    for (a, ra), (b, rb) in zip(run(legacy, checks), run(new, checks)):
+        pd.testing.assert_frame_equal(a, b, check_exact=True)
+        for k in ("label", "vol_ratio", "close_pos", "obv_slope", "adl_slope"):
+            assert ra[k] == rb[k], k
+        pd.testing.assert_series_equal(ra["obv_series"], rb["obv_series"], check_exact=True, check_names=False)
+        pd.testing.assert_series_equal(ra["adl_series"], rb["adl_series"], check_exact=True, check_names=False)
+
+    run(new, frames[:5])  # warm-up
+    t_old, m_old = measure(legacy, frames)
+    t_new, m_new = measure(new, frames)
+    print(f"{args.tickers} ticker x {args.bars} bar, add_indicators + orderflow_radar (hasil identik)")
+    print(f"lama      {t_old * 1e3:6.2f} ms/ticker   peak {m_old / 1e3:7.1f} KB/ticker")
+    print(f"copy-free {t_new * 1e3:6.2f} ms/ticker   peak {m_new / 1e3:7.1f} KB/ticker")
+    print(f"-> {t_old / t_new:.2f}x lebih cepat, peak memori -{(1 - m_new / m_old) * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
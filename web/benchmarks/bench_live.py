@@ -0,0 +1,53 @@
+# benchmarks/bench_live.py
+"""
+LiveEngine dengan ratusan ticker: latensi per event & memori (harus tetap, tidak tumbuh per event).
+
+    cd web
+    python benchmarks/bench_live.py --tickers 500 --days 60 --ticks 4
+"""
+import argparse
+import time
+import tracemalloc
+
+from _synthetic import synthetic_ohlcv
+
+from services.live import LiveEngine, ReplaySource
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--tickers", type=int, default=500)
+    p.add_argument("--bars", type=int, default=500, help="history per ticker")
+    p.add_argument("--days", type=int, default=60, help="bar yang di-replay")
+    p.add_argument("--ticks", type=int, default=4, help="update per bar")
+    p.add_argument("--memory", action="store_true", help="ukur memori (tracemalloc, latensi jadi ~5x lebih lambat)")
+    args = p.parse_args()
+
+    frames = {f"T{i:03d}.JK": synthetic_ohlcv(args.bars + args.days, seed=i) for i in range(args.tickers)}
+
+    if args.memory:
+        tracemalloc.start()
+    engine = LiveEngine()
+    t0 = time.perf_counter()
+    for t, df in frames.items():
+        engine.subscribe(t, df.iloc[: args.bars])
+    print(f"subscribe {args.tickers} ticker: {time.perf_counter() - t0:.2f}s")
+    if args.memory:
+        print(f"state setelah subscribe {tracemalloc.get_traced_memory()[0] / 1e6:.1f} MB")
+
+    source = ReplaySource({t: df.iloc[args.bars:] for t, df in frames.items()}, ticks_per_bar=args.ticks)
+    t0 = time.perf_counter()
+    res = engine.run(source)
+    elapsed = time.perf_counter() - t0
+
+    print(f"events={res['events']}  updates={res['updates']}  {res['events'] / elapsed:,.0f} event/s")
+    print(f"latency p50={res['p50_us']:.0f}µs  p95={res['p95_us']:.0f}µs  p99={res['p99_us']:.0f}µs  "
+          f"max={res['max_us']:.0f}µs")
+    if args.memory:
+        after, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"memori setelah replay {after / 1e6:.1f} MB (peak {peak / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
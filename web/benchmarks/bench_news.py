@@ -0,0 +1,108 @@
+# benchmarks/bench_news.py
+"""
+Fetch berita banyak ticker terhadap stub server RSS lokal (tanpa internet):
+serial vs konkuren, cache TTL, revalidasi 304, dan dedup artikel lintas ticker.
+
+    cd web
+    python benchmarks/bench_news.py --tickers 100 --latency 0.1
+"""
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.news import FeedCache, news_for_tickers  # noqa: E402
+
+RSS = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>{q}</title>{items}</channel></rss>"""
+ITEM = """<item><title>{title} - {source}</title><link>{link}</link>
+<pubDate>Mon, 06 Jan 2025 09:00:00 GMT</pubDate><source url="https://{source}">{source}</source></item>"""
+
+
+def stub_feed(query: str) -> bytes:
+    code = query.split()[0]
+    items = [
+        # berita pasar umum: muncul di semua feed, link beda tracking param
+        ITEM.format(title="IHSG ditutup menguat, asing net buy", source="pasar.id",
+                    link=f"https://www.pasar.id/ihsg-menguat/?utm_source={code}"),
+        ITEM.format(title="IHSG Ditutup Menguat; Asing Net Buy!", source="bursa.co",
+                    link=f"https://bursa.co/r/{code}/ihsg"),
+    ]
+    items += [
+        ITEM.format(title=f"{code} umumkan kinerja kuartal {i}", source="emiten.id",
+                    link=f"https://emiten.id/{code.lower()}/{i}")
+        for i in range(8)
+    ]
+    return RSS.format(q=query, items="".join(items)).encode()
+
+
+def serve(latency: float):
+    class Handler(BaseHTTPRequestHandler):
+        hits = {"200": 0, "304": 0}
+
+        def do_GET(self):
+            time.sleep(latency)
+            q = parse_qs(urlsplit(self.path).query).get("q", [""])[0]
+            body = stub_feed(q)
+            etag = '"' + hashlib.md5(body).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                Handler.hits["304"] += 1
+                self.send_response(304)
+                self.end_headers()
+                return
+            Handler.hits["200"] += 1
+            self.send_response(200)
+            self.send_header("Content-Type", "application/rss+xml")
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        request_queue_size = 128  # default 5: koneksi konkuren di-drop lalu retry SYN
+
+    server = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, Handler.hits
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--tickers", type=int, default=100)
+    p.add_argument("--latency", type=float, default=0.1, help="simulasi round trip (detik)")
+    p.add_argument("--concurrency", type=int, default=16)
+    args = p.parse_args()
+
+    server, hits = serve(args.latency)
+    template = f"http://127.0.0.1:{server.server_port}/rss?q={{q}}&hl={{hl}}"
+    tickers = [f"T{i:03d}.JK" for i in range(args.tickers)]
+
+    def run(label, cache, concurrency):
+        before = dict(hits)
+        t0 = time.perf_counter()
+        res = news_for_tickers(tickers, max_items=20, concurrency=concurrency, cache=cache, url_template=template)
+        dt = time.perf_counter() - t0
+        n_items = sum(len(v) for v in res["by_ticker"].values())
+        print(f"{label:<22} {dt:6.2f}s  200={hits['200'] - before['200']:>4}  304={hits['304'] - before['304']:>4}  "
+              f"item={n_items}  artikel unik={len(res['articles'])}")
+
+    run("serial (cold)", FeedCache(tempfile.mkdtemp(), ttl=600), 1)
+    cache = FeedCache(tempfile.mkdtemp(), ttl=600)
+    run("konkuren (cold)", cache, args.concurrency)
+    run("konkuren (TTL hit)", cache, args.concurrency)
+    cache.ttl = 0
+    run("konkuren (304)", cache, args.concurrency)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# benchmarks/bench_universe.py
+"""
+UniversePrices vs dict DataFrame per ticker: memori, operasi lintas-ticker, view per ticker.
+
+    cd web
+    python benchmarks/bench_universe.py --tickers 1000 --bars 1250
+"""
+import argparse
+import gc
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from _synthetic import synthetic_ohlcv
+
+from services.technical import add_indicators
+from services.universe import UniversePrices
+
+
+def retained(build):
+    """(objek, byte yang tetap teralokasi setelah build selesai)."""
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, size
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return out, best
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--tickers", type=int, default=1000)
+    p.add_argument("--bars", type=int, default=1250, help="5y bar harian")
+    args = p.parse_args()
+
+    def make_frames():
+        # listing bertahap: sebagian ticker mulai belakangan (kalender tetap gabungan)
+        out = {}
+        for i in range(args.tickers):
+            df = synthetic_ohlcv(args.bars, seed=i)
+            df["Close"] = df["Close"].round(0)  # harga IDX = kelipatan tick
+            out[f"T{i:04d}.JK"] = df.iloc[(i % 10) * 25:]
+        return out
+
+    # data dibuat di luar tracemalloc (lambat kalau di-trace), yang diukur: copy mandiri tiap representasi
+    source = make_frames()
+    frames, mem_frames = retained(lambda: {t: df.copy() for t, df in source.items()})
+    uni, mem_uni = retained(lambda: UniversePrices.from_frames(source))
+    del source
+    bars = sum(len(df) for df in frames.values())
+    print(f"{len(frames)} ticker, {bars:,} bar, kalender {len(uni.calendar)} hari")
+    print(f"memori dict[DataFrame]  {mem_frames / 1e6:8.1f} MB  ({mem_frames / bars:.1f} B/bar)")
+    print(f"memori UniversePrices   {mem_uni / 1e6:8.1f} MB  ({mem_uni / bars:.1f} B/bar, "
+          f"nbytes {uni.nbytes / 1e6:.1f} MB)")
+
+    # lintas-ticker: momentum 20 hari + ranking per tanggal
+    def pandas_cross():
+        close = pd.DataFrame({t: df["Close"] for t, df in frames.items()})
+        return close.pct_change(20, fill_method=None).rank(axis=1)
+
+    def uni_cross():
+        ret = pd.DataFrame(uni.returns(20).T, index=uni.calendar, columns=uni.tickers, copy=False)
+        return ret.rank(axis=1)
+
+    a, t_pd = timed(pandas_cross)
+    b, t_uni = timed(uni_cross)
+    same = np.nanmax(np.abs(a.to_numpy() - b.to_numpy()))
+    print(f"momentum+rank  dict {t_pd * 1e3:7.1f} ms   universe {t_uni * 1e3:7.1f} ms   "
+          f"(x{t_pd / t_uni:.1f}, selisih rank maks {same:g})")
+
+    _, t_wide_pd = timed(lambda: pd.DataFrame({t: df["Close"] for t, df in frames.items()}))
+    _, t_wide_uni = timed(lambda: uni.panel("Close"))
+    print(f"wide Close     dict {t_wide_pd * 1e3:7.1f} ms   universe {t_wide_uni * 1e3:7.3f} ms (view)")
+
+    # view per ticker: tanpa copy, hasil indikator sama
+    t0 = time.perf_counter()
+    views = [uni.frame(t) for t in uni.tickers]
+    t_view = (time.perf_counter() - t0) / len(views)
+    shares = all(np.shares_memory(v["Close"].to_numpy(), uni.prices) for v in views)
+    worst = 0.0
+    for t in uni.tickers[:50]:
+        x, y = add_indicators(frames[t]), add_indicators(uni.frame(t))
+        for c in ("EMA20", "EMA200", "RSI14", "ATR14", "VOL_AVG20"):
+            worst = max(worst, float(np.nanmax(np.abs(x[c] - y[c]) / np.abs(x[c]).clip(1e-9))))
+    print(f"frame(ticker)  {t_view * 1e6:.0f} µs/ticker, zero-copy={shares}, "
+          f"add_indicators selisih relatif maks {worst:.1e} (float32)")
+
+    with tempfile.TemporaryDirectory() as root:
+        uni.save(root)
+        (mm, t_load) = timed(lambda: UniversePrices.load(root, mmap=True))
+        _, t_frame = timed(lambda: add_indicators(mm.frame(mm.tickers[-1])))
+        print(f"memmap load    {t_load * 1e3:.1f} ms, add_indicators dari memmap {t_frame * 1e3:.1f} ms")
+        del mm
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# cli.py
+"""
+Laporan verdict StockLab tanpa browser (mis. cron malam hari).
+
+    cd web
+    python cli.py --out reports/nightly                      # seluruh watchlist.txt
+    python cli.py --out reports/nightly --workers 8 --format parquet csv
+    python cli.py --out reports/bbca BBCA BMRI --offline     # ticker tertentu, data lokal saja
+"""
+import argparse
+import sys
+
+from services.report import FORMATS, run_report
+from utils import load_watchlist
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Laporan verdict StockLab (headless)")
+    p.add_argument("tickers", nargs="*", help="kode saham (tanpa .JK); default: watchlist")
+    p.add_argument("--watchlist", default="watchlist.txt")
+    p.add_argument("--out", default="reports", help="folder output + checkpoint")
+    p.add_argument("--format", nargs="+", choices=FORMATS, default=list(FORMATS))
+    p.add_argument("--workers", type=int, default=0, help="jumlah proses (0 = jumlah CPU)")
+    p.add_argument("--period", default="2y")
+    p.add_argument("--offline", action="store_true", help="pakai data lokal saja, tanpa refresh Yahoo")
+    p.add_argument("--fresh", action="store_true", help="abaikan checkpoint, hitung ulang semua ticker")
+    p.add_argument("--limit", type=int, default=0, help="batasi jumlah ticker (0 = semua)")
+    p.add_argument("--rr", type=float, default=2.0)
+    p.add_argument("--target-pe", type=float, default=12.0)
+    p.add_argument("--target-pbv", type=float, default=2.0)
+    p.add_argument("--capital", type=float, default=50_000_000)
+    p.add_argument("--risk-pct", type=float, default=1.0)
+    args = p.parse_args(argv)
+
+    if args.tickers:
+        tickers = [t.strip().upper() + ("" if t.upper().endswith(".JK") else ".JK") for t in args.tickers]
+    else:
+        tickers = load_watchlist(args.watchlist)
+    if args.limit:
+        tickers = tickers[: args.limit]
+
+    params = {
+        "rr": args.rr,
+        "lookback": 20,
+        "target_pe": args.target_pe,
+        "target_pbv": args.target_pbv,
+        "capital": args.capital,
+        "risk_pct": args.risk_pct,
+    }
+
+    def progress(done, total, ticker):
+        print(f"\r[{done}/{total}] {ticker:<12}", end="", file=sys.stderr, flush=True)
+
+    res = run_report(
+        tickers,
+        args.out,
+        params=params,
+        period=args.period,
+        refresh=not args.offline,
+        formats=args.format,
+        max_workers=args.workers or None,
+        resume=not args.fresh,
+        on_progress=progress,
+    )
+    print(file=sys.stderr)
+
+    print(f"tickers={len(tickers)}  dihitung={res['computed']}  skip (data sama)={res['skipped']}  "
+          f"error={len(res['errors'])}  elapsed={res['elapsed']:.1f}s")
+    if not res["timings"].empty:
+        print("\nWaktu per stage:")
+        print(res["timings"].to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+    for t, err in list(res["errors"].items())[:20]:
+        print(f"  ! {t}: {err}")
+    for path in res["paths"]:
+        print(f"-> {path}")
+
+    # exit code != 0 hanya kalau tidak ada satu pun ticker yang berhasil
+    return 1 if tickers and len(res["errors"]) == len(tickers) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
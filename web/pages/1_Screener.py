@@ -0,0 +1,59 @@
+import streamlit as st
+
+from services.screener import screen_universe, filter_screen
+from services.store import default_store
+from utils import load_watchlist
+
+
+st.set_page_config(page_title="StockLab — Screener", layout="wide")
+st.title("🔎 Screener Watchlist")
+
+watchlist = load_watchlist()
+
+with st.sidebar:
+    period = st.selectbox("Period", ["1y", "2y", "5y"], index=1)
+    rr = st.slider("Risk:Reward", 1.5, 3.0, 2.0, 0.5)
+    target_pe = st.number_input("Target PE", min_value=1.0, value=12.0, step=1.0)
+    target_pbv = st.number_input("Target PBV", min_value=0.1, value=2.0, step=0.1)
+    fundamentals = st.checkbox("Sertakan fundamental & verdict (butuh info Yahoo)", value=True)
+    refresh = st.checkbox("Refresh harga dulu (online)", value=False)
+    limit = st.number_input("Jumlah ticker (0 = semua)", min_value=0, value=0, step=50)
+
+tickers = watchlist[: int(limit)] if limit else watchlist
+
+if st.button(f"Jalankan screener ({len(tickers)} ticker)"):
+    bar = st.progress(0.0, text="Menyiapkan...")
+
+    if refresh:
+        default_store().refresh_many(
+            tickers, period=period,
+            on_progress=lambda i, n, t: bar.progress(i / n, text=f"Refresh harga {i}/{n} • {t}"),
+        )
+
+    st.session_state.screen = screen_universe(
+        tickers,
+        period=period,
+        rr=rr,
+        target_pe=target_pe,
+        target_pbv=target_pbv,
+        fundamentals=fundamentals,
+        on_progress=lambda i, n, t: bar.progress(i / n, text=f"Screening {i}/{n} • {t}"),
+    )
+    bar.empty()
+
+screen = st.session_state.get("screen")
+if screen is None:
+    st.caption("Belum ada hasil. Klik tombol di atas.")
+    st.stop()
+
+c1, c2, c3 = st.columns(3)
+with c1:
+    sectors = st.multiselect("Sektor", sorted(screen["Sector"].dropna().unique()) if "Sector" in screen else [])
+with c2:
+    grades = st.multiselect("Grade", sorted(screen["Grade"].dropna().unique()) if "Grade" in screen else [])
+with c3:
+    verdicts = st.multiselect("Verdict", list(screen["Verdict"].dropna().unique()) if "Verdict" in screen else [])
+
+view = filter_screen(screen, sectors=sectors, grades=grades, verdicts=verdicts)
+st.caption(f"{len(view)} dari {len(screen)} ticker • error: {int(screen['Error'].notna().sum())}")
+st.dataframe(view, use_container_width=True)
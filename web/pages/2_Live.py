@@ -0,0 +1,71 @@
+import time
+
+import pandas as pd
+import streamlit as st
+
+from services.live import LiveEngine, ReplaySource, history_for
+from utils import load_watchlist
+
+
+st.set_page_config(page_title="StockLab — Live", layout="wide")
+st.title("📡 Live Mode (Replay)")
+st.caption(
+    "Indikator, radar bandarmologi & technical plan di-update per event dari state incremental; "
+    "tabel hanya menerima field yang berubah. Sumber: replay bar historis dari PriceStore lokal."
+)
+
+watchlist = load_watchlist()
+
+with st.sidebar:
+    tickers = st.multiselect("Ticker", watchlist, default=watchlist[:20])
+    replay_days = st.number_input("Replay N hari terakhir", min_value=5, value=30, step=5)
+    ticks_per_bar = st.slider("Update per bar (bar berjalan)", 1, 10, 4)
+    speed = st.number_input("Kecepatan (detik data per detik, 0 = maks)", min_value=0, value=0, step=3600)
+    refresh_every = st.slider("Refresh tabel tiap N update", 1, 500, 50)
+
+if not tickers:
+    st.info("Pilih minimal satu ticker.")
+    st.stop()
+
+if st.button(f"Mulai replay ({len(tickers)} ticker)"):
+    full = history_for(tickers, period="2y", refresh=False)
+    if not full:
+        st.warning("Belum ada data lokal; jalankan app utama / screener sekali dulu (online).")
+        st.stop()
+
+    # butuh histori sebelum window replay untuk state awal indikator
+    short = [t for t, df in full.items() if len(df) <= replay_days]
+    full = {t: df for t, df in full.items() if len(df) > replay_days}
+    if short:
+        st.warning(f"Dilewati (histori lokal <= {int(replay_days)} bar): {', '.join(short)}")
+    if not full:
+        st.warning("Tidak ada ticker dengan histori cukup; kecilkan N hari replay.")
+        st.stop()
+
+    engine = LiveEngine()
+    start = min(df.index[-int(replay_days)] for df in full.values())
+    rows = {}
+    for t, df in full.items():
+        rows[t] = engine.subscribe(t, df.loc[df.index < start])
+
+    source = ReplaySource({t: df.loc[df.index >= start] for t, df in full.items()},
+                          ticks_per_bar=ticks_per_bar, speed=speed or None)
+
+    table = st.empty()
+    stats = st.empty()
+    pending = {"n": 0}
+
+    def on_update(upd):
+        rows[upd["ticker"]].update(upd["changes"])  # patch hanya field yang berubah
+        pending["n"] += 1
+        if pending["n"] % refresh_every == 0:
+            table.dataframe(pd.DataFrame.from_dict(rows, orient="index"), use_container_width=True)
+            stats.caption(str(engine.latency.summary()))
+
+    t0 = time.perf_counter()
+    summary = engine.run(source, on_update=on_update)
+    table.dataframe(pd.DataFrame.from_dict(rows, orient="index"), use_container_width=True)
+    stats.caption(
+        f"{summary['events']} event • {summary['updates']} update • {time.perf_counter() - t0:.2f}s • "
+        f"latency p50 {summary.get('p50_us', 0):.0f}µs, p99 {summary.get('p99_us', 0):.0f}µs"
+    )
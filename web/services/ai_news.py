@@ -1,33 +1,20 @@
+import hashlib
+import json
 import os
-import google.generativeai as genai
+import re
+import sqlite3
+import threading
+import time
+from functools import lru_cache
 
-def gemini_news_summary(news_items, max_words=120):
-    """
-    news_items = list of dict:
-    [
-      {"title": "...", "source": "...", "published": "..."},
-      ...
-    ]
-    """
-
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        return "Gemini API key tidak ditemukan."
+from services.paths import data_dir
+from services.ratelimit import RateLimiter
 
-    genai.configure(api_key=api_key)
-
-    model = genai.GenerativeModel("gemini-2.5-flash")
-
-    # ---- build structured input
-    bullets = []
-    for n in news_items[:8]:  # batasi biar hemat token
-        bullets.append(
-            f"- {n.get('title')} ({n.get('source','')}, {n.get('published','')})"
-        )
+GEMINI_MODEL = "gemini-2.5-flash"
+MAX_HEADLINES = 8  # batasi biar hemat token
+PROMPT_VERSION = 2  # naikkan kalau prompt berubah -> cache lama tidak dipakai
 
-    news_text = "\n".join(bullets)
-
-    prompt = f"""
+INSTRUCTIONS = """
     Kamu adalah asisten analis saham profesional.
 
     Tugas kamu adalah MERANGKUM berita berikut untuk investor saham Indonesia.
@@ -47,7 +34,123 @@ def gemini_news_summary(news_items, max_words=120):
     - Jangan memprediksi harga saham
     - Jangan memberi rekomendasi BUY / SELL
     - Jangan menggunakan bahasa promosi atau sensasional
+"""
+
+
+class MissingAPIKey(RuntimeError):
+    pass
+
+
+# =========================
+# BACKEND MODEL
+# =========================
+@lru_cache(maxsize=4)
+def _gemini_model(api_key: str, model_name: str):
+    """Client dibuat sekali per (key, model), bukan setiap request."""
+    import google.generativeai as genai
+
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(model_name)
+
+
+class GeminiBackend:
+    def __init__(self, model=GEMINI_MODEL, api_key=None):
+        self.model = model
+        self.api_key = api_key
+
+    def generate(self, prompt: str, json_mode=False) -> str:
+        api_key = self.api_key or os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise MissingAPIKey("Gemini API key tidak ditemukan.")
+        config = {"response_mime_type": "application/json"} if json_mode else None
+        response = _gemini_model(api_key, self.model).generate_content(prompt, generation_config=config)
+        return response.text.strip()
+
+
+class FakeBackend:
+    """Model lokal deterministik untuk test/benchmark: ringkasan = jumlah & judul berita pertama."""
+
+    model = "fake"
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def generate(self, prompt: str, json_mode=False) -> str:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        sections = re.findall(r"^### (\S+)\n((?:- .*\n?)*)", prompt, flags=re.M)
+        out = {}
+        for ticker, block in sections:
+            lines = [ln[2:] for ln in block.splitlines() if ln.startswith("- ")]
+            out[ticker] = f"[fake] {len(lines)} berita. Utama: {lines[0] if lines else '-'}. Dampak: LOW."
+        if json_mode:
+            return json.dumps(out, ensure_ascii=False)
+        block = prompt.split("Berita:", 1)[-1].split("Format output", 1)[0]
+        lines = [ln.strip()[2:] for ln in block.splitlines() if ln.strip().startswith("- ")]
+        return f"[fake] {len(lines)} berita. Utama: {lines[0] if lines else '-'}. Dampak: LOW."
+
+
+def backend_from_env():
+    """STOCKLAB_AI_BACKEND=fake -> FakeBackend (tanpa API key / jaringan)."""
+    if os.getenv("STOCKLAB_AI_BACKEND", "gemini").lower() == "fake":
+        return FakeBackend()
+    return GeminiBackend(model=os.getenv("STOCKLAB_GEMINI_MODEL", GEMINI_MODEL))
+
+
+# =========================
+# CACHE PERSISTEN
+# =========================
+class SummaryCache:
+    """SQLite key -> ringkasan; key = hash isi headline, jadi berita sama = tidak panggil model lagi."""
+
+    def __init__(self, path=None, ttl=7 * 24 * 3600):
+        self.path = path or os.path.join(data_dir("ai_news"), "summaries.sqlite")
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        with self._connect() as con:
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS summaries ("
+                "key TEXT PRIMARY KEY, ticker TEXT, summary TEXT, created_at REAL)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, key: str):
+        with self._lock, self._connect() as con:
+            row = con.execute("SELECT summary, created_at FROM summaries WHERE key = ?", (key,)).fetchone()
+        if row is None or time.time() - row[1] > self.ttl:
+            return None
+        return row[0]
+
+    def put_many(self, rows: dict):
+        """rows: {key: (ticker, summary)}"""
+        now = time.time()
+        with self._lock, self._connect() as con:
+            con.executemany(
+                "INSERT OR REPLACE INTO summaries (key, ticker, summary, created_at) VALUES (?, ?, ?, ?)",
+                [(k, t, s, now) for k, (t, s) in rows.items()],
+            )
 
+
+# =========================
+# PROMPT
+# =========================
+def headlines(news_items, n=MAX_HEADLINES) -> list[str]:
+    return [f"{x.get('title')} ({x.get('source', '')}, {x.get('published', '')})" for x in news_items[:n]]
+
+
+def summary_key(ticker, news_items, max_words, model) -> str:
+    top = [f"{x.get('title')}|{x.get('source', '')}" for x in news_items[:MAX_HEADLINES]]
+    blob = json.dumps([PROMPT_VERSION, model, max_words, ticker, top], ensure_ascii=False)
+    return hashlib.sha1(blob.encode()).hexdigest()
+
+
+def build_prompt(news_items, max_words=120) -> str:
+    news_text = "\n".join(f"- {h}" for h in headlines(news_items))
+    return f"""{INSTRUCTIONS.format(max_words=max_words)}
     Berita:
     {news_text}
 
@@ -56,8 +159,135 @@ def gemini_news_summary(news_items, max_words=120):
     diakhiri dengan kesimpulan dampak berita.
     """
 
-    try:
-        response = model.generate_content(prompt)
-        return response.text.strip()
-    except Exception as e:
-        return f"Gagal generate AI summary: {e}"
+
+def build_batch_prompt(batch: dict, max_words=120) -> str:
+    """batch: {ticker: news_items}. Satu request untuk beberapa saham, output JSON per ticker."""
+    sections = []
+    for ticker, items in batch.items():
+        sections.append(f"### {ticker}\n" + "\n".join(f"- {h}" for h in headlines(items)))
+    return (
+        INSTRUCTIONS.format(max_words=max_words)
+        + "\nRangkum berita SETIAP saham di bawah secara terpisah (berlaku per saham).\n\n"
+        + "\n\n".join(sections)
+        + "\n\nFormat output: JSON object saja, key = kode saham persis seperti di atas, "
+        + "value = ringkasan paragraf diakhiri kesimpulan dampak berita.\n"
+    )
+
+
+def parse_batch_response(text: str) -> dict:
+    """JSON {ticker: ringkasan}; toleran terhadap ```json fence."""
+    text = re.sub(r"^```(?:json)?\s*|\s*```$", "", text.strip())
+    data = json.loads(text)
+    if not isinstance(data, dict):
+        raise ValueError("respons batch bukan JSON object")
+    return {str(k): str(v).strip() for k, v in data.items()}
+
+
+# =========================
+# SUMMARIZER
+# =========================
+class NewsSummarizer:
+    """
+    Ringkasan berita per ticker: cache persisten (hash headline) -> batch beberapa ticker
+    per request (JSON per ticker) -> fallback per ticker kalau respons batch tidak lengkap.
+    Semua request lewat satu RateLimiter.
+    """
+
+    def __init__(self, backend=None, cache=None, limiter=None, batch_size=10, max_words=120):
+        self.backend = backend or backend_from_env()
+        self.cache = cache or SummaryCache()
+        self.limiter = limiter or RateLimiter(rate=10, per=60)
+        self.batch_size = batch_size
+        self.max_words = max_words
+
+    def _model(self):
+        return getattr(self.backend, "model", type(self.backend).__name__)
+
+    def _call(self, prompt, json_mode=False):
+        self.limiter.acquire()
+        return self.backend.generate(prompt, json_mode=json_mode)
+
+    def summarize(self, ticker, news_items, max_words=None) -> str:
+        return self.summarize_many({ticker: news_items}, max_words=max_words)[ticker]
+
+    def summarize_many(self, news_by_ticker: dict, max_words=None, on_progress=None) -> dict:
+        """{ticker: news_items} -> {ticker: ringkasan}. Error tidak di-cache (dicoba lagi lain kali)."""
+        max_words = max_words or self.max_words
+        model = self._model()
+        out, todo = {}, {}
+        for ticker, items in news_by_ticker.items():
+            if not items:
+                out[ticker] = "Tidak ada berita untuk dirangkum."
+                continue
+            key = summary_key(ticker, items, max_words, model)
+            cached = self.cache.get(key)
+            if cached is not None:
+                out[ticker] = cached
+            else:
+                todo[ticker] = (key, items)
+
+        tickers = list(todo)
+        for i in range(0, len(tickers), self.batch_size):
+            chunk = tickers[i:i + self.batch_size]
+            out.update(self._run_batch({t: todo[t] for t in chunk}, max_words))
+            if on_progress:
+                on_progress(min(i + self.batch_size, len(tickers)), len(tickers))
+        return out
+
+    def _run_batch(self, batch: dict, max_words) -> dict:
+        out, fresh = {}, {}
+        if len(batch) > 1:
+            try:
+                text = self._call(build_batch_prompt({t: items for t, (_, items) in batch.items()}, max_words),
+                                  json_mode=True)
+            except MissingAPIKey as e:
+                return {t: str(e) for t in batch}
+            except Exception as e:
+                # quota / 429 / jaringan: fallback per ticker hanya menambah request -> laporkan apa adanya
+                return {t: f"Gagal generate AI summary: {e}" for t in batch}
+            try:
+                parsed = parse_batch_response(text)
+            except ValueError:
+                parsed = {}  # respons batch rusak (termasuk JSONDecodeError) -> fallback per ticker
+            for t in batch:
+                if parsed.get(t):
+                    out[t] = parsed[t]
+                    fresh[batch[t][0]] = (t, parsed[t])
+
+        for t, (key, items) in batch.items():
+            if t in out:
+                continue
+            try:
+                out[t] = self._call(build_prompt(items, max_words))
+                fresh[key] = (t, out[t])
+            except MissingAPIKey as e:
+                out[t] = str(e)
+            except Exception as e:
+                out[t] = f"Gagal generate AI summary: {e}"
+
+        if fresh:
+            self.cache.put_many(fresh)
+        return out
+
+
+_default_summarizer = None
+_default_lock = threading.Lock()
+
+
+def default_summarizer() -> NewsSummarizer:
+    global _default_summarizer
+    with _default_lock:
+        if _default_summarizer is None:
+            _default_summarizer = NewsSummarizer()
+        return _default_summarizer
+
+
+def gemini_news_summary(news_items, max_words=120):
+    """
+    news_items = list of dict:
+    [
+      {"title": "...", "source": "...", "published": "..."},
+      ...
+    ]
+    """
+    return default_summarizer().summarize(None, news_items, max_words=max_words)
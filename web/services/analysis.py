@@ -0,0 +1,115 @@
+# services/analysis.py
+# Glue analisis yang sebelumnya hanya ada di app.py, supaya bisa dipakai ulang
+# oleh screener / CLI tanpa Streamlit.
+from services.valuation import fair_value_pe, fair_value_pbv, classify_valuation
+
+
+def _yoy(inc, metric):
+    if metric not in inc.index or len(inc.loc[metric]) < 2:
+        return None
+    s = inc.loc[metric]
+    return (s.iloc[0] - s.iloc[1]) / abs(s.iloc[1]) * 100 if s.iloc[1] != 0 else None
+
+
+def fundamental_inputs(info: dict, tables: dict) -> dict:
+    """Input untuk fundamental_score dari info Yahoo + key_financial_tables."""
+    rev_yoy = None
+    ni_yoy = None
+    gross_margin = None
+    net_margin = None
+
+    inc = tables["income"]
+    if not inc.empty:
+        rev_yoy = _yoy(inc, "Total Revenue")
+        ni_yoy = _yoy(inc, "Net Income")
+        if "Gross Profit" in inc.index and "Total Revenue" in inc.index:
+            gross_margin = inc.loc["Gross Profit"].iloc[0] / inc.loc["Total Revenue"].iloc[0]
+        if "Net Income" in inc.index and "Total Revenue" in inc.index:
+            net_margin = inc.loc["Net Income"].iloc[0] / inc.loc["Total Revenue"].iloc[0]
+
+    roe = info.get("returnOnEquity")
+    roe = roe * 100 if roe is not None else None
+
+    equity_ratio = None
+    bal = tables["balance"]
+    if not bal.empty:
+        if "Total Stockholder Equity" in bal.index and "Total Assets" in bal.index:
+            equity_ratio = bal.loc["Total Stockholder Equity"].iloc[0] / bal.loc["Total Assets"].iloc[0]
+
+    fcf_series = None
+    if not tables["cashflow"].empty and "Free Cash Flow" in tables["cashflow"].index:
+        fcf_series = tables["cashflow"].loc["Free Cash Flow"]
+
+    return {
+        "rev_yoy": rev_yoy,
+        "ni_yoy": ni_yoy,
+        "gross_margin": gross_margin,
+        "net_margin": net_margin,
+        "roe": roe,
+        "de_ratio": info.get("debtToEquity"),
+        "equity_ratio": equity_ratio,
+        "fcf_series": fcf_series,
+    }
+
+
+def valuation_summary(last_price: float, info: dict, target_pe: float, target_pbv: float) -> dict:
+    eps = info.get("trailingEps")
+    bvps = info.get("bookValue")
+
+    fv_pe = fair_value_pe(eps, target_pe) if eps else None
+    fv_pbv = fair_value_pbv(bvps, target_pbv) if bvps else None
+
+    # combine fair value (rata-rata yang available)
+    vals = [v for v in [fv_pe, fv_pbv] if v is not None and v > 0]
+    fair = sum(vals) / len(vals) if vals else None
+
+    # diskon / premium vs fair value
+    discount_pct = None
+    if fair and fair > 0:
+        discount_pct = (fair - last_price) / fair * 100
+
+    label = classify_valuation(last_price, fair, band=0.10) if fair else "UNKNOWN"
+
+    return {
+        "eps": eps,
+        "bvps": bvps,
+        "fv_pe": fv_pe,
+        "fv_pbv": fv_pbv,
+        "fair": fair,
+        "discount_pct": discount_pct,
+        "label": label,
+    }
+
+
+def calc_risk_snapshot(
+    capital,
+    entry_price,
+    stop_price,
+    tp_price,
+    risk_pct=1.0
+):
+    # risk per share
+    risk_per_share = entry_price - stop_price
+    if risk_per_share <= 0:
+        return None
+
+    # uang yang siap dirisikokan
+    risk_amount = capital * (risk_pct / 100)
+
+    # ukuran posisi (lembar)
+    position_size = risk_amount / risk_per_share
+
+    # nilai posisi
+    position_value = position_size * entry_price
+
+    # reward
+    reward_per_share = tp_price - entry_price
+    rr_actual = reward_per_share / risk_per_share if risk_per_share > 0 else None
+
+    return {
+        "risk_amount": risk_amount,
+        "position_size": position_size,
+        "position_value": position_value,
+        "rr_actual": rr_actual,
+        "risk_pct": risk_pct,
+    }
@@ -0,0 +1,190 @@
+# services/asof.py
+# Replay historis: rekonstruksi dashboard "as of" tanggal lampau tanpa look-ahead.
+import pandas as pd
+
+from services.analysis import valuation_summary
+from services.live import LiveEngine
+from services.pipeline import SOURCES, _fundamentals, default_pipeline
+from services.risk import risk_flags
+from services.statements import FILING_LAG, LONG_COLUMNS, to_long
+from services.verdict_engine import final_verdict
+
+# field info Yahoo yang dihitung ulang point-in-time dari laporan keuangan + harga penutupan as_of
+PIT_INFO_FIELDS = ("trailingEps", "bookValue", "returnOnEquity", "debtToEquity", "marketCap",
+                   "trailingPE", "priceToBook")
+
+# field deskriptif yang tidak bergantung waktu -> dipakai apa adanya; field lain dikosongkan (None)
+STATIC_INFO_FIELDS = ("longName", "shortName", "sector", "industry", "website", "longBusinessSummary",
+                      "country", "city", "currency", "financialCurrency", "exchange", "quoteType", "symbol",
+                      "sharesOutstanding")
+
+PLAN_PARAMS = ("rr", "pullback_pct", "atr_mult", "rsi_up", "rsi_side", "vol_min")
+
+
+def _ts(as_of) -> pd.Timestamp:
+    return pd.Timestamp(as_of).normalize()
+
+
+def slice_ohlcv(df: pd.DataFrame, as_of) -> pd.DataFrame:
+    """Bar s/d akhir hari `as_of` (inklusif)."""
+    if df is None or df.empty:
+        return df
+    end = _ts(as_of) + pd.Timedelta(days=1)
+    if df.index.tz is not None:
+        end = end.tz_localize(df.index.tz)
+    return df.loc[df.index < end]
+
+
+def point_in_time(fin, as_of, lag=None) -> pd.DataFrame:
+    """
+    Laporan keuangan yang sudah terbit per `as_of`: period_end + batas lapor (FILING_LAG) <= as_of.
+    `fin`: frame long StatementStore atau dict statement Yahoo (dikonversi ke long).
+    """
+    lag = lag or FILING_LAG
+    long = fin if isinstance(fin, pd.DataFrame) else to_long(fin or {})
+    if long.empty:
+        return pd.DataFrame(columns=LONG_COLUMNS)
+    known = pd.to_datetime(long["period_end"]) + long["freq"].map(lag)
+    return long.loc[known <= _ts(as_of)].reset_index(drop=True)
+
+
+def _latest(long, statement, metric):
+    d = long[(long["statement"] == statement) & (long["metric"] == metric) & (long["freq"] == "annual")]
+    if d.empty:
+        return None
+    return float(d.loc[pd.to_datetime(d["period_end"]).idxmax(), "value"])
+
+
+def info_as_of(info: dict, long: pd.DataFrame, price=None) -> dict:
+    """
+    Info Yahoo per `as_of`: field rasio (PIT_INFO_FIELDS) dihitung ulang dari laporan tahunan
+    point-in-time + `price` (Close as_of); field deskriptif (STATIC_INFO_FIELDS) dipakai apa adanya.
+    Field lain (forwardPE, currentPrice, dividendYield, margin, ...) tidak bisa direkonstruksi ->
+    dikosongkan supaya nilai masa depan tidak bocor.
+    Jumlah saham memakai sharesOutstanding saat ini (Yahoo tidak punya historinya) -> pendekatan.
+    """
+    out = {k: (v if k in STATIC_INFO_FIELDS else None) for k, v in (info or {}).items()}
+    shares = out.get("sharesOutstanding")
+    ni = _latest(long, "income", "Net Income")
+    equity = _latest(long, "balance", "Total Stockholder Equity")
+    liab = _latest(long, "balance", "Total Liab")
+
+    eps = ni / shares if ni is not None and shares else None
+    bvps = equity / shares if equity and shares else None
+    out["trailingEps"] = eps
+    out["bookValue"] = bvps
+    out["returnOnEquity"] = ni / equity if ni is not None and equity else None
+    out["debtToEquity"] = liab / equity * 100 if liab is not None and equity else None
+    out["marketCap"] = price * shares if price and shares else None
+    # PE negatif (rugi) tidak bermakna, sama seperti Yahoo yang tidak mengisi trailingPE
+    out["trailingPE"] = price / eps if price and eps and eps > 0 else None
+    out["priceToBook"] = price / bvps if price and bvps and bvps > 0 else None
+    return out
+
+
+def sources_as_of(sources: dict, as_of, ticker=None, signals=None) -> dict:
+    """
+    Potong semua sumber pipeline ke `as_of`: OHLCV s/d tanggal itu, laporan yang sudah terbit,
+    info rasio point-in-time, sinyal berita dari event s/d tanggal itu (kalau `signals` + `ticker` ada).
+    """
+    df = slice_ohlcv(sources.get("ohlcv"), as_of)
+    fin = point_in_time(sources.get("financials"), as_of)
+    price = float(df["Close"].iloc[-1]) if df is not None and not df.empty else None
+    news_sig = None
+    if signals is not None and ticker:
+        news_sig = signals.signal_at(ticker, _ts(as_of) + pd.Timedelta(days=1))
+    return {
+        "ohlcv": df,
+        "info": info_as_of(sources.get("info"), fin, price),
+        "financials": fin,
+        "news_signal": news_sig,
+    }
+
+
+class AsOfReplay:
+    """
+    Jalan hari demi hari (mis. setahun) tanpa menghitung ulang dari nol tiap langkah:
+    - indikator, radar & technical plan: state incremental LiveEngine, satu update per bar
+    - tabel & skor fundamental: dihitung ulang hanya saat slice laporan point-in-time berubah
+    - valuation, risiko & verdict: per hari dari harga penutupan + hasil di atas
+    Hasil tiap tanggal sama dengan pipeline.analyze(..., as_of=tanggal itu).
+    """
+
+    def __init__(self, sources: dict, params=None, lookback=20, ticker=None, signals=None, pipeline=None):
+        missing = [s for s in SOURCES if s not in sources and s != "news_signal"]
+        if missing:
+            raise ValueError(f"sumber kurang: {missing}")
+        self.sources = sources
+        self.params = params or {}
+        self.lookback = lookback
+        self.ticker = ticker or "_"
+        self.signals = signals
+        self.pipeline = pipeline or default_pipeline()
+        self._fund = {}  # jumlah rilis laporan s/d tanggal -> (fin_pit, tables, fundamentals)
+        self.stats = {"days": 0, "statement_slices": 0}
+
+        fin = sources["financials"]
+        self._long = fin if isinstance(fin, pd.DataFrame) else to_long(fin or {})
+        known = (pd.to_datetime(self._long["period_end"]) + self._long["freq"].map(FILING_LAG)
+                 if not self._long.empty else pd.Series(dtype="datetime64[ns]"))
+        self._releases = pd.DatetimeIndex(sorted(set(known)))  # tanggal slice laporan berubah
+
+    def _fundamentals(self, as_of):
+        key = int(self._releases.searchsorted(_ts(as_of), side="right"))  # jumlah rilis s/d as_of
+        if key not in self._fund:
+            fin = point_in_time(self._long, as_of)
+            info = info_as_of(self.sources["info"], fin)
+            res = self.pipeline.run({"info": info, "financials": fin}, targets=["tables"])
+            self._fund[key] = (fin, res["tables"], _fundamentals(info, res["tables"]))
+            self.stats["statement_slices"] += 1
+        return self._fund[key]
+
+    def run(self, start=None, end=None):
+        """Generator satu dict per hari bursa di [start, end]."""
+        df = self.sources["ohlcv"]
+        start = _ts(start) if start is not None else df.index[0]
+        days = slice_ohlcv(df, end) if end is not None else df
+        days = days.loc[days.index >= start]
+        if days.empty:
+            return
+
+        engine = LiveEngine(lookback=self.lookback,
+                            plan_kwargs={p: self.params[p] for p in PLAN_PARAMS if p in self.params})
+        history = df.loc[df.index < days.index[0]]
+        skip = 0 if len(history) else 1  # tanpa history: bar pertama jadi seed
+        engine.subscribe(self.ticker, history if skip == 0 else days.iloc[:1])
+
+        cols = days[["Open", "High", "Low", "Close", "Volume"]].to_numpy(dtype="float64")
+        for i, (ts, (o, h, l, c, v)) in enumerate(zip(days.index, cols)):
+            if i >= skip:
+                engine.on_event({"ticker": self.ticker, "ts": ts, "Open": o, "High": h, "Low": l,
+                                 "Close": c, "Volume": v, "final": True})
+            yield self._row(ts, c, engine.view(self.ticker))
+
+    def _row(self, ts, close, view) -> dict:
+        fin, tables, fund = self._fundamentals(ts)
+        info = info_as_of(self.sources["info"], fin, close)
+        val = valuation_summary(close, info, self.params.get("target_pe", 12.0),
+                                self.params.get("target_pbv", 2.0))
+        news_sig = None
+        if self.signals is not None:
+            news_sig = self.signals.signal_at(self.ticker, _ts(ts) + pd.Timedelta(days=1))
+        verdict = final_verdict(fund["score"], val["label"], view["setup_ok"], view["radar"], news_signal=news_sig)
+        self.stats["days"] += 1
+        return {
+            "Date": ts,
+            "Close": close,
+            "trend": view["trend"],
+            "setup_ok": view["setup_ok"],
+            "radar": view["radar"],
+            "fund_score": fund["score"],
+            "valuation": val["label"],
+            "fair": val["fair"],
+            "risks": len(risk_flags(info, tables)),
+            "news": news_sig["label"] if news_sig else None,
+            "verdict": verdict["verdict"],
+            "confidence": verdict["confidence"],
+        }
+
+    def frame(self, start=None, end=None) -> pd.DataFrame:
+        return pd.DataFrame(list(self.run(start, end))).set_index("Date")
@@ -0,0 +1,212 @@
+# services/backtest.py
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from services.store import default_store
+from services.technical import add_indicators, plan_signals
+
+IDX_LOT = 100          # 1 lot = 100 lembar
+BUY_FEE = 0.0015       # fee beli broker (tipikal)
+SELL_FEE = 0.0025      # fee jual + PPh final 0,1%
+WARMUP = 200           # bar awal dilewati supaya EMA200 sudah bermakna
+
+
+def simulate(d: pd.DataFrame, sig: pd.DataFrame, capital=50_000_000, risk_pct=1.0, max_hold=20,
+             buy_fee=BUY_FEE, sell_fee=SELL_FEE, warmup=WARMUP) -> dict:
+    """
+    Simulasi event-driven bar per bar (tanpa lookahead):
+    - sinyal di close bar t -> limit buy di entry_high untuk bar t+1 (berlaku 1 bar)
+    - fill kalau Low[t+1] <= entry_high, harga = min(Open, entry_high)
+    - exit: stop dicek dulu (konservatif), lalu TP, lalu time stop `max_hold` bar di close
+    - gap melewati stop/TP -> fill di Open
+    - ukuran posisi: risk_pct% equity / risk per lembar, dibulatkan ke lot, dibatasi cash
+    """
+    o = d["Open"].to_numpy(dtype="float64").tolist()
+    h = d["High"].to_numpy(dtype="float64").tolist()
+    l = d["Low"].to_numpy(dtype="float64").tolist()
+    c = d["Close"].to_numpy(dtype="float64").tolist()
+    ok = sig["setup_ok"].to_numpy(dtype=bool).tolist()
+    e_hi = sig["entry_high"].to_numpy(dtype="float64").tolist()
+    stops = sig["stop"].to_numpy(dtype="float64").tolist()
+    tps = sig["tp"].to_numpy(dtype="float64").tolist()
+    dates = d.index
+
+    n = len(c)
+    cash = float(capital)
+    equity = np.full(n, float(capital))
+    trades = []
+    pos = None      # dict posisi terbuka
+    pending = None  # index bar sinyal
+
+    for i in range(n):
+        # ---- fill order dari sinyal kemarin
+        if pending is not None and pos is None:
+            j = pending
+            pending = None
+            limit = e_hi[j]
+            if l[i] <= limit:
+                price = min(o[i], limit)
+                stop, tp = stops[j], tps[j]
+                risk_share = price - stop
+                if risk_share > 0:
+                    shares = math.floor(cash * risk_pct / 100 / risk_share / IDX_LOT) * IDX_LOT
+                    max_shares = math.floor(cash / (price * (1 + buy_fee)) / IDX_LOT) * IDX_LOT
+                    shares = min(shares, max_shares)
+                    if shares > 0:
+                        cost = shares * price * (1 + buy_fee)
+                        cash -= cost
+                        pos = {"entry_i": i, "signal_i": j, "price": price, "stop": stop, "tp": tp,
+                               "shares": shares, "cost": cost, "risk": shares * risk_share}
+
+        # ---- exit
+        if pos is not None:
+            exit_price, reason = None, None
+            stop, tp = pos["stop"], pos["tp"]
+            if i == pos["entry_i"]:
+                # bar fill: urutan intrabar tidak diketahui -> hanya cek stop
+                if l[i] <= stop:
+                    exit_price, reason = stop, "STOP"
+            elif o[i] <= stop:
+                exit_price, reason = o[i], "STOP"
+            elif l[i] <= stop:
+                exit_price, reason = stop, "STOP"
+            elif o[i] >= tp:
+                exit_price, reason = o[i], "TP"
+            elif h[i] >= tp:
+                exit_price, reason = tp, "TP"
+            elif i - pos["entry_i"] >= max_hold:
+                exit_price, reason = c[i], "TIME"
+            elif i == n - 1:
+                exit_price, reason = c[i], "EOD"
+
+            if exit_price is not None:
+                proceeds = pos["shares"] * exit_price * (1 - sell_fee)
+                cash += proceeds
+                pnl = proceeds - pos["cost"]
+                trades.append({
+                    "signal_date": dates[pos["signal_i"]],
+                    "entry_date": dates[pos["entry_i"]],
+                    "exit_date": dates[i],
+                    "entry": pos["price"],
+                    "exit": exit_price,
+                    "shares": pos["shares"],
+                    "pnl": pnl,
+                    "ret_pct": pnl / pos["cost"] * 100,
+                    "r_multiple": pnl / pos["risk"],
+                    "bars": i - pos["entry_i"],
+                    "reason": reason,
+                })
+                pos = None
+
+        # ---- sinyal baru (hanya kalau flat, dieksekusi bar berikutnya)
+        if pos is None and i >= warmup and ok[i] and i + 1 < n:
+            pending = i
+
+        equity[i] = cash + (pos["shares"] * c[i] if pos is not None else 0.0)
+
+    eq = pd.Series(equity, index=dates, name="equity")
+    tr = pd.DataFrame(trades)
+    return {"trades": tr, "equity": eq, "stats": trade_stats(tr, eq, capital)}
+
+
+def max_drawdown(equity: pd.Series) -> float:
+    if equity is None or equity.empty:
+        return 0.0
+    peak = equity.cummax()
+    return float(((equity - peak) / peak).min() * 100)
+
+
+def trade_stats(trades: pd.DataFrame, equity: pd.Series = None, capital=None) -> dict:
+    n = len(trades)
+    out = {
+        "trades": n,
+        "hit_rate": None,
+        "expectancy_r": None,
+        "expectancy_pct": None,
+        "profit_factor": None,
+        "total_return_pct": None,
+        "max_dd_pct": max_drawdown(equity) if equity is not None else None,
+    }
+    if capital and equity is not None and not equity.empty:
+        out["total_return_pct"] = float((equity.iloc[-1] / capital - 1) * 100)
+    if n == 0:
+        return out
+
+    wins = trades["pnl"] > 0
+    gross_win = trades.loc[wins, "pnl"].sum()
+    gross_loss = -trades.loc[~wins, "pnl"].sum()
+    out.update({
+        "hit_rate": float(wins.mean() * 100),
+        "expectancy_r": float(trades["r_multiple"].mean()),
+        "expectancy_pct": float(trades["ret_pct"].mean()),
+        "profit_factor": float(gross_win / gross_loss) if gross_loss > 0 else None,
+    })
+    return out
+
+
+PLAN_PARAMS = ("rr", "pullback_pct", "atr_mult", "rsi_up", "rsi_side", "vol_min")
+
+
+def backtest_df(df_raw: pd.DataFrame, **kwargs) -> dict:
+    """kwargs: parameter technical_plan (PLAN_PARAMS) + parameter simulate."""
+    d = add_indicators(df_raw)
+    if d.empty:
+        return {"trades": pd.DataFrame(), "equity": pd.Series(dtype=float), "stats": trade_stats(pd.DataFrame())}
+    plan_kwargs = {k: kwargs.pop(k) for k in PLAN_PARAMS if k in kwargs}
+    sig = plan_signals(d, **plan_kwargs)
+    return simulate(d, sig, **kwargs)
+
+
+def backtest_ticker(ticker: str, period="5y", refresh=False, **kwargs) -> dict:
+    """Backtest satu ticker dari PriceStore lokal. Output: {"ticker", "stats", "trades", "error"}"""
+    try:
+        df_raw = default_store().get(ticker, period=period, refresh=refresh)
+        if len(df_raw) <= WARMUP:
+            return {"ticker": ticker, "stats": None, "trades": pd.DataFrame(),
+                    "error": f"OHLCV kurang ({len(df_raw)} bar)"}
+        res = backtest_df(df_raw, **kwargs)
+        return {"ticker": ticker, "stats": res["stats"], "trades": res["trades"], "error": None}
+    except Exception as e:
+        return {"ticker": ticker, "stats": None, "trades": pd.DataFrame(), "error": f"{type(e).__name__}: {e}"}
+
+
+def backtest_universe(tickers, period="5y", max_workers=None, on_progress=None, **kwargs) -> dict:
+    """
+    Backtest paralel antar ticker (process pool).
+    Output:
+    {
+      "summary": DataFrame per ticker (stats + error),
+      "trades": DataFrame semua trade (kolom Ticker),
+      "stats": statistik gabungan semua trade,
+    }
+    """
+    tickers = list(dict.fromkeys(tickers))
+    results = []
+    max_workers = max_workers or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(max_workers=max_workers) as ex:
+        futures = {ex.submit(backtest_ticker, t, period=period, **kwargs): t for t in tickers}
+        for i, fut in enumerate(as_completed(futures), start=1):
+            results.append(fut.result())
+            if on_progress:
+                on_progress(i, len(tickers), futures[fut])
+
+    rows, all_trades = [], []
+    for r in results:
+        rows.append({"Ticker": r["ticker"], **(r["stats"] or {}), "error": r["error"]})
+        if r["trades"] is not None and not r["trades"].empty:
+            all_trades.append(r["trades"].assign(Ticker=r["ticker"]))
+
+    trades = pd.concat(all_trades, ignore_index=True) if all_trades else pd.DataFrame()
+    summary = pd.DataFrame(rows)
+    if "expectancy_r" in summary.columns:
+        summary = summary.sort_values("expectancy_r", ascending=False, na_position="last")
+    return {
+        "summary": summary.reset_index(drop=True),
+        "trades": trades,
+        "stats": trade_stats(trades),
+    }
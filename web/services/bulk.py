@@ -0,0 +1,150 @@
+# services/bulk.py
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+from services.data import OHLCV_COLUMNS, download_ohlcv
+
+# period yfinance -> offset (dipakai backend fixture untuk memotong data rekaman)
+PERIOD_OFFSETS = {
+    "1d": pd.DateOffset(days=1),
+    "5d": pd.DateOffset(days=5),
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+
+
+def slice_period(df: pd.DataFrame, period: str) -> pd.DataFrame:
+    if df is None or df.empty or period in (None, "max"):
+        return df
+    if period == "ytd":
+        return df[df.index >= pd.Timestamp(year=df.index[-1].year, month=1, day=1)]
+    offset = PERIOD_OFFSETS.get(period)
+    if offset is None:
+        raise ValueError(f"Period tidak dikenal: {period}")
+    return df[df.index > df.index[-1] - offset]
+
+
+# =========================
+# BACKENDS
+# =========================
+# Backend = fungsi fetch(ticker, period, interval, start) -> DataFrame OHLCV.
+# Harus RAISE kalau gagal (bukan return kosong diam-diam).
+
+def yahoo_backend(ticker: str, period="2y", interval="1d", start=None) -> pd.DataFrame:
+    return download_ohlcv(ticker, period=period, interval=interval, start=start)
+
+
+def fixture_backend(root: str, latency: float = 0.0):
+    """
+    Backend offline dari CSV rekaman (<root>/<TICKER>.csv, hasil record_fixtures).
+    `latency` (detik) mensimulasikan round trip jaringan untuk benchmark.
+    """
+    def fetch(ticker: str, period="2y", interval="1d", start=None) -> pd.DataFrame:
+        path = os.path.join(root, f"{ticker}.csv")
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Fixture tidak ada: {path}")
+        if latency:
+            time.sleep(latency)
+
+        df = pd.read_csv(path, index_col=0, parse_dates=True)
+        df.index.name = "Date"
+        if start is not None:
+            return df[df.index >= pd.Timestamp(start)]
+        return slice_period(df, period)
+
+    return fetch
+
+
+# =========================
+# BULK LOADER
+# =========================
+def _fetch_with_retry(backend, ticker, period, interval, start, retries, backoff):
+    last_err = None
+    for attempt in range(retries + 1):
+        try:
+            df = backend(ticker, period=period, interval=interval, start=start)
+            if df is None or df.empty:
+                raise ValueError("data kosong")
+            return df
+        except Exception as e:
+            last_err = e
+            if attempt < retries:
+                # exponential backoff + jitter supaya tidak serentak kena rate limit
+                time.sleep(backoff * (2 ** attempt) * (1 + random.random() * 0.25))
+    raise last_err
+
+
+def fetch_ohlcv_bulk(
+    tickers,
+    period="2y",
+    interval="1d",
+    start=None,
+    backend=None,
+    max_workers=8,
+    retries=2,
+    backoff=0.5,
+    on_progress=None,
+):
+    """
+    Fetch OHLCV banyak ticker sekaligus secara paralel (maks `max_workers` koneksi).
+
+    Output:
+    {
+      "frames": {"BBRI.JK": df, ...},          # hanya yang sukses
+      "errors": {"XXXX.JK": "pesan error", ...},
+      "elapsed": detik,
+    }
+    `on_progress(done, total, ticker)` dipanggil setiap satu ticker selesai.
+    """
+    backend = backend or yahoo_backend
+    tickers = list(dict.fromkeys(tickers))  # buang duplikat, urutan tetap
+    frames, errors = {}, {}
+    t0 = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as ex:
+        futures = {
+            ex.submit(_fetch_with_retry, backend, t, period, interval, start, retries, backoff): t
+            for t in tickers
+        }
+        for i, fut in enumerate(as_completed(futures), start=1):
+            t = futures[fut]
+            try:
+                frames[t] = fut.result()
+            except Exception as e:
+                errors[t] = f"{type(e).__name__}: {e}"
+            if on_progress:
+                on_progress(i, len(tickers), t)
+
+    # urutkan sesuai input
+    frames = {t: frames[t] for t in tickers if t in frames}
+    return {
+        "frames": frames,
+        "errors": errors,
+        "elapsed": time.perf_counter() - t0,
+    }
+
+
+def to_long(frames: dict) -> pd.DataFrame:
+    """dict {ticker: df} -> satu frame tidy dengan index (Ticker, Date)."""
+    if not frames:
+        return pd.DataFrame(columns=OHLCV_COLUMNS)
+    out = pd.concat(frames, names=["Ticker", "Date"])
+    return out[OHLCV_COLUMNS]
+
+
+def record_fixtures(tickers, root: str, period="5y", interval="1d", **kwargs):
+    """Rekam data live ke CSV supaya bisa diputar ulang via fixture_backend."""
+    os.makedirs(root, exist_ok=True)
+    res = fetch_ohlcv_bulk(tickers, period=period, interval=interval, **kwargs)
+    for t, df in res["frames"].items():
+        df.to_csv(os.path.join(root, f"{t}.csv"), index_label="Date")
+    return res
@@ -0,0 +1,216 @@
+# services/cache.py
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+
+from services.coordinator import FetchTimeout, default_coordinator
+from services.paths import data_dir
+
+# TTL (detik) per sumber data
+DEFAULT_TTLS = {
+    "ohlcv": 300,
+    "info": 3600,
+    "financials": 24 * 3600,
+    "news": 900,
+}
+
+
+class DataCache:
+    """
+    Cache dua tingkat untuk layer data:
+    - L1: LRU di memori (maks `max_items` entry, per proses)
+    - L2: SQLite di disk (dipakai bersama antar restart & antar worker di mesin yang sama)
+    TTL per namespace (DEFAULT_TTLS). Request bersamaan untuk key yang sama hanya memanggil loader
+    sekali (services.coordinator, dengan timeout per sumber). Kalau loader error dan masih ada
+    entry kadaluarsa di disk, entry itu yang dipakai (stale) supaya Yahoo down / restart tidak jadi
+    badai request.
+    Nilai yang dikembalikan dipakai bersama -> jangan dimutasi.
+    """
+
+    def __init__(self, path=None, max_items=512, ttls=None, clock=None, coordinator=None):
+        self.path = path or os.path.join(data_dir("cache"), "data.sqlite")
+        self.coordinator = coordinator or default_coordinator()
+        self.max_items = max_items
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.clock = clock or time.time
+        self._mem = OrderedDict()  # (ns, key) -> (stored_at, value)
+        self._lock = threading.Lock()
+        self.metrics = {"mem_hits": 0, "disk_hits": 0, "misses": 0, "loads": 0, "errors": 0, "stale": 0}
+        with self._connect() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS entries (ns TEXT, key TEXT, stored_at REAL, value BLOB, "
+                "PRIMARY KEY (ns, key))"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _count(self, name):
+        with self._lock:
+            self.metrics[name] += 1
+
+    def ttl(self, ns: str) -> float:
+        return self.ttls.get(ns, 3600)
+
+    # ---------- tingkat memori ----------
+    def _mem_get(self, k):
+        with self._lock:
+            hit = self._mem.get(k)
+            if hit is not None:
+                self._mem.move_to_end(k)
+            return hit
+
+    def _mem_put(self, k, stored_at, value):
+        with self._lock:
+            self._mem[k] = (stored_at, value)
+            self._mem.move_to_end(k)
+            while len(self._mem) > self.max_items:
+                self._mem.popitem(last=False)
+
+    # ---------- tingkat disk ----------
+    def _disk_get(self, k):
+        with self._connect() as con:
+            row = con.execute("SELECT stored_at, value FROM entries WHERE ns = ? AND key = ?", k).fetchone()
+        if row is None:
+            return None
+        try:
+            return row[0], pickle.loads(row[1])
+        except Exception:
+            return None  # blob rusak / versi library beda -> anggap miss
+
+    def _disk_put(self, k, stored_at, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._connect() as con:
+            con.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)", (*k, stored_at, blob))
+
+    # ---------- API ----------
+    def get(self, ns: str, key: str, allow_stale=False):
+        """(hit, value) dari memori lalu disk; entry kadaluarsa hanya dikembalikan kalau `allow_stale`."""
+        k = (ns, str(key))
+        now = self.clock()
+        ttl = self.ttl(ns)
+
+        hit = self._mem_get(k)
+        if hit is not None and (allow_stale or now - hit[0] < ttl):
+            self._count("mem_hits")
+            return True, hit[1]
+
+        hit = self._disk_get(k)
+        if hit is not None and (allow_stale or now - hit[0] < ttl):
+            self._mem_put(k, *hit)
+            self._count("disk_hits")
+            return True, hit[1]
+        return False, None
+
+    def age(self, ns: str, key: str):
+        """Umur entry (detik) di memori/disk, None kalau belum pernah di-cache; tidak dihitung di metrics."""
+        k = (ns, str(key))
+        hit = self._mem_get(k)
+        if hit is None:
+            with self._connect() as con:
+                hit = con.execute("SELECT stored_at FROM entries WHERE ns = ? AND key = ?", k).fetchone()
+        return self.clock() - hit[0] if hit is not None else None
+
+    def put(self, ns: str, key: str, value):
+        k = (ns, str(key))
+        now = self.clock()
+        self._mem_put(k, now, value)
+        self._disk_put(k, now, value)
+
+    def get_or_load(self, ns: str, key: str, loader, cache_if=None, timeout=None):
+        """
+        Nilai segar dari cache, atau panggil `loader()` sekali walau banyak thread minta key yang sama.
+        `cache_if(value)` False -> hasil dikembalikan tapi tidak disimpan (mis. DataFrame kosong).
+        Loader lewat timeout (fetch tetap jalan di background) -> entry kadaluarsa kalau ada, sama seperti error.
+        """
+        hit, value = self.get(ns, key)
+        if hit:
+            return value
+        try:
+            return self.coordinator.fetch(ns, key, partial(self._load, ns, key, loader, cache_if), timeout=timeout)
+        except FetchTimeout:
+            stale, old = self.get(ns, key, allow_stale=True)
+            if not stale:
+                raise
+            self._count("stale")
+            return old
+
+    def reload(self, ns: str, key: str, loader, cache_if=None, timeout=None):
+        """
+        Paksa `loader()` walau entry masih segar (warm-up sebelum kadaluarsa), lewat coordinator yang sama
+        dengan get_or_load sehingga request halaman untuk key ini ikut menunggu fetch yang sama.
+        Error di-raise; entry lama tetap tersimpan.
+        """
+        return self.coordinator.fetch(ns, key, partial(self._reload, ns, key, loader, cache_if), timeout=timeout)
+
+    def _reload(self, ns, key, loader, cache_if):
+        self._count("loads")
+        try:
+            value = loader()
+        except Exception:
+            self._count("errors")
+            raise
+        if cache_if is None or cache_if(value):
+            self.put(ns, key, value)
+        return value
+
+    def _load(self, ns, key, loader, cache_if):
+        hit, value = self.get(ns, key)  # flight sebelumnya bisa saja baru selesai menyimpan
+        if hit:
+            return value
+        self._count("misses")
+        self._count("loads")
+        try:
+            value = loader()
+        except Exception:
+            self._count("errors")
+            stale, old = self.get(ns, key, allow_stale=True)
+            if not stale:
+                raise
+            self._count("stale")
+            return old
+        if cache_if is None or cache_if(value):
+            self.put(ns, key, value)
+        return value
+
+    def invalidate(self, ns: str, key: str = None):
+        with self._lock:
+            for k in [k for k in self._mem if k[0] == ns and (key is None or k[1] == str(key))]:
+                del self._mem[k]
+        with self._connect() as con:
+            if key is None:
+                con.execute("DELETE FROM entries WHERE ns = ?", (ns,))
+            else:
+                con.execute("DELETE FROM entries WHERE ns = ? AND key = ?", (ns, str(key)))
+
+    def purge(self, max_age=7 * 24 * 3600) -> int:
+        """Hapus entry disk yang lebih tua dari `max_age` (entry kadaluarsa disimpan untuk fallback stale)."""
+        with self._connect() as con:
+            cur = con.execute("DELETE FROM entries WHERE stored_at < ?", (self.clock() - max_age,))
+            return cur.rowcount
+
+    def stats(self) -> dict:
+        with self._lock:
+            m = dict(self.metrics)
+            m["mem_items"] = len(self._mem)
+        hits = m["mem_hits"] + m["disk_hits"]
+        total = hits + m["misses"]
+        m["hit_rate"] = hits / total if total else 0.0
+        return m
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def default_cache() -> DataCache:
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = DataCache()
+        return _default_cache
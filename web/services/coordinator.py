@@ -0,0 +1,96 @@
+# services/coordinator.py
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+# batas tunggu (detik) per sumber data
+DEFAULT_TIMEOUTS = {
+    "ohlcv": 30.0,
+    "info": 20.0,
+    "financials": 60.0,
+    "news": 15.0,
+}
+
+COUNTERS = ("requests", "started", "coalesced", "timeouts", "errors")
+
+
+class FetchTimeout(TimeoutError):
+    pass
+
+
+class FetchCoordinator:
+    """
+    Satu fetch in-flight per key (source, ticker, params), dipakai bersama semua sesi/thread di proses ini.
+    Request yang datang saat fetch key yang sama masih jalan menunggu future yang sama (coalesced).
+    Loader jalan di pool sendiri, jadi semua pemanggil bisa berhenti menunggu setelah `timeout`;
+    fetch-nya sendiri tetap selesai di background dan request berikutnya ikut menunggu hasil itu.
+    Loader tidak boleh memanggil coordinator yang sama (pool bisa habis menunggu diri sendiri).
+    """
+
+    def __init__(self, timeouts=None, default_timeout=30.0, max_workers=32):
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.default_timeout = default_timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch")
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._counts = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+
+    @staticmethod
+    def key(source: str, ticker: str, params=None) -> tuple:
+        return source, str(ticker), tuple(sorted((params or {}).items()))
+
+    def _done(self, k, fut):
+        with self._lock:
+            if self._inflight.get(k) is fut:
+                del self._inflight[k]
+            if fut.exception() is not None:
+                self._counts[k[0]]["errors"] += 1
+
+    def submit(self, source: str, ticker: str, loader, params=None):
+        """Future untuk key ini: yang sedang jalan kalau ada, kalau tidak fetch baru."""
+        k = self.key(source, ticker, params)
+        with self._lock:
+            c = self._counts[source]
+            c["requests"] += 1
+            fut = self._inflight.get(k)
+            if fut is not None:
+                c["coalesced"] += 1
+                return fut
+            c["started"] += 1
+            fut = self._inflight[k] = self._pool.submit(loader)
+        fut.add_done_callback(lambda f: self._done(k, f))
+        return fut
+
+    def fetch(self, source: str, ticker: str, loader, params=None, timeout=None):
+        """Hasil loader (atau exception-nya); FetchTimeout kalau lewat `timeout` detik."""
+        fut = self.submit(source, ticker, loader, params)
+        timeout = timeout if timeout is not None else self.timeouts.get(source, self.default_timeout)
+        try:
+            return fut.result(timeout=timeout)
+        except FutureTimeout:
+            with self._lock:
+                self._counts[source]["timeouts"] += 1
+            raise FetchTimeout(f"{source} {ticker}: belum selesai setelah {timeout:g}s") from None
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._inflight)
+
+    def stats(self) -> dict:
+        with self._lock:
+            by_source = {s: dict(c) for s, c in self._counts.items()}
+            in_flight = len(self._inflight)
+        total = {name: sum(c[name] for c in by_source.values()) for name in COUNTERS}
+        return {**total, "in_flight": in_flight, "by_source": by_source}
+
+
+_default_coordinator = None
+_default_lock = threading.Lock()
+
+
+def default_coordinator() -> FetchCoordinator:
+    global _default_coordinator
+    with _default_lock:
+        if _default_coordinator is None:
+            _default_coordinator = FetchCoordinator()
+        return _default_coordinator
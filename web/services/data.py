@@ -1,45 +1,82 @@
+import os
+
 import pandas as pd
 import yfinance as yf
-import streamlit as st
 
-@st.cache_data(ttl=300)
-@st.cache_data(ttl=300, show_spinner=False)
-def get_ohlcv(ticker: str, period="2y", interval="1d") -> pd.DataFrame:
-    try:
-        df = yf.download(
-            ticker,
-            period=period,
-            interval=interval,
-            progress=False,
-            auto_adjust=False,
-            group_by="column",   # PENTING
-            threads=False
-        )
-
-        if df is None or df.empty:
-            return pd.DataFrame()
-
-        # ===== FIX MULTIINDEX =====
-        if isinstance(df.columns, pd.MultiIndex):
-            df.columns = [c[0] for c in df.columns]
-
-        # ===== VALIDASI KETAT =====
-        required = {"Open", "High", "Low", "Close", "Volume"}
-        if not required.issubset(set(df.columns)):
-            return pd.DataFrame()
-
-        return df[["Open", "High", "Low", "Close", "Volume"]].dropna()
+from services.cache import default_cache
+
+# OHLCV harian dibaca dari PriceStore lokal (refresh incremental), set "0" untuk mematikan
+USE_PRICE_STORE = os.getenv("STOCKLAB_PRICE_STORE", "1") != "0"
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def download_ohlcv(ticker: str, period="2y", interval="1d", start=None) -> pd.DataFrame:
+    """
+    Download mentah tanpa cache. Beda dengan get_ohlcv: error TIDAK ditelan,
+    supaya bulk loader bisa melaporkan kegagalan per ticker.
+    Kalau `start` diisi, `period` diabaikan (dipakai untuk fetch incremental).
+    """
+    kwargs = {"period": period} if start is None else {"start": start}
+    df = yf.download(
+        ticker,
+        interval=interval,
+        progress=False,
+        auto_adjust=False,
+        group_by="column",   # PENTING
+        threads=False,
+        **kwargs,
+    )
+
+    if df is None or df.empty:
+        return pd.DataFrame()
+
+    # ===== FIX MULTIINDEX =====
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = [c[0] for c in df.columns]
+
+    # ===== VALIDASI KETAT =====
+    missing = set(OHLCV_COLUMNS) - set(df.columns)
+    if missing:
+        raise ValueError(f"{ticker}: kolom OHLCV tidak lengkap ({', '.join(sorted(missing))})")
+
+    return df[OHLCV_COLUMNS].dropna()
+
+
+def _non_empty(value) -> bool:
+    return value is not None and len(value) > 0
+
 
+def ohlcv_key(ticker: str, period="2y", interval="1d") -> str:
+    return f"{ticker}|{period}|{interval}"
+
+
+def get_ohlcv(ticker: str, period="2y", interval="1d", refresh=False) -> pd.DataFrame:
+    """
+    OHLCV lewat cache dua tingkat (services.cache); error -> DataFrame kosong (tidak di-cache).
+    `refresh=True`: fetch ulang walau cache masih segar (dipakai prefetcher).
+    """
+    def load():
+        if interval == "1d" and USE_PRICE_STORE:
+            from services.store import default_store  # lazy: store -> bulk -> data
+            # refresh: lewati batas umur file store juga (max_age store >= interval prefetch)
+            return default_store().get(ticker, period=period, max_age=0 if refresh else None)
+        return download_ohlcv(ticker, period=period, interval=interval)
+
+    cache = default_cache()
+    try:
+        if refresh:
+            return cache.reload("ohlcv", ohlcv_key(ticker, period, interval), load, cache_if=_non_empty)
+        return cache.get_or_load("ohlcv", ohlcv_key(ticker, period, interval), load, cache_if=_non_empty)
     except Exception:
         return pd.DataFrame()
 
 
-@st.cache_data(ttl=3600)
-def get_info(ticker: str) -> dict:
+def fetch_info(ticker: str) -> dict:
     return yf.Ticker(ticker).info or {}
 
-@st.cache_data(ttl=3600)
-def get_financials(ticker: str) -> dict:
+
+def fetch_financials(ticker: str) -> dict:
     t = yf.Ticker(ticker)
     # Yahoo kadang tidak lengkap; kita ambil yang ada
     return {
@@ -49,3 +86,22 @@ def get_financials(ticker: str) -> dict:
         "income_q": t.quarterly_income_stmt,
         "cashflow_q": t.quarterly_cashflow,
     }
+
+
+def get_info(ticker: str, refresh=False) -> dict:
+    """Info lewat cache dua tingkat; `refresh=True` fetch ulang walau cache masih segar."""
+    cache = default_cache()
+    if refresh:
+        return cache.reload("info", ticker, lambda: fetch_info(ticker), cache_if=_non_empty)
+    return cache.get_or_load("info", ticker, lambda: fetch_info(ticker), cache_if=_non_empty)
+
+
+def cached_info(ticker: str) -> dict:
+    """Info dari cache saja (boleh kadaluarsa), tanpa jaringan; {} kalau belum pernah di-fetch."""
+    hit, value = default_cache().get("info", ticker, allow_stale=True)
+    return value if hit else {}
+
+
+def get_financials(ticker: str) -> dict:
+    return default_cache().get_or_load("financials", ticker, lambda: fetch_financials(ticker),
+                                       cache_if=lambda fin: any(_non_empty(v) for v in fin.values()))
@@ -1,10 +1,83 @@
 import pandas as pd
 
+# nama metric kanonik -> label Yahoo (lama & baru), urutan = prioritas
+CANONICAL_METRICS = {
+    "Total Revenue": ["Total Revenue", "Operating Revenue"],
+    "Gross Profit": ["Gross Profit"],
+    "Operating Income": ["Operating Income", "Total Operating Income As Reported"],
+    "EBIT": ["EBIT"],
+    "EBITDA": ["EBITDA", "Normalized EBITDA"],
+    "Net Income": ["Net Income", "Net Income Common Stockholders",
+                   "Net Income From Continuing Operation Net Minority Interest"],
+    "Total Assets": ["Total Assets"],
+    "Total Liab": ["Total Liab", "Total Liabilities Net Minority Interest"],
+    "Total Stockholder Equity": ["Total Stockholder Equity", "Stockholders Equity", "Common Stock Equity"],
+    "Cash And Cash Equivalents": ["Cash And Cash Equivalents", "Cash",
+                                  "Cash Cash Equivalents And Short Term Investments"],
+    "Short Long Term Debt": ["Short Long Term Debt", "Current Debt", "Current Debt And Capital Lease Obligation"],
+    "Long Term Debt": ["Long Term Debt", "Long Term Debt And Capital Lease Obligation"],
+    "Total Cash From Operating Activities": ["Total Cash From Operating Activities", "Operating Cash Flow",
+                                             "Cash Flow From Continuing Operating Activities"],
+    "Capital Expenditures": ["Capital Expenditures", "Capital Expenditure"],
+    "Free Cash Flow": ["Free Cash Flow"],
+}
+
+INCOME_KEYS = [
+    "Total Revenue",
+    "Gross Profit",
+    "Operating Income",
+    "EBIT",
+    "EBITDA",
+    "Net Income",
+]
+
+BALANCE_KEYS = [
+    "Total Assets",
+    "Total Liab",
+    "Total Stockholder Equity",
+    "Cash And Cash Equivalents",
+    "Short Long Term Debt",
+    "Long Term Debt",
+]
+
+CASHFLOW_KEYS = [
+    "Total Cash From Operating Activities",
+    "Capital Expenditures",
+    "Free Cash Flow",
+]
+
+
+def canonicalize(fin: pd.DataFrame) -> pd.DataFrame:
+    """
+    Samakan label statement Yahoo ke nama kanonik (mis. "Total Liabilities Net Minority Interest"
+    -> "Total Liab"). Per periode dipakai alias pertama yang ada nilainya; baris lain tetap.
+    """
+    if fin is None or fin.empty:
+        return fin
+
+    rows = {}
+    used = set()
+    for name, aliases in CANONICAL_METRICS.items():
+        present = [a for a in aliases if a in fin.index]
+        if not present:
+            continue
+        s = fin.loc[present[0]]
+        for a in present[1:]:
+            s = s.combine_first(fin.loc[a])
+        rows[name] = s
+        used.update(present)
+
+    rest = fin.loc[[i for i in fin.index if i not in used]]
+    out = pd.concat([pd.DataFrame(rows).T, rest]) if rows else rest
+    out.columns = fin.columns
+    return out
+
+
 def summarize_annual(fin: pd.DataFrame, keys: list[str], years=5) -> pd.DataFrame:
     if fin is None or fin.empty:
         return pd.DataFrame()
 
-    df = fin.copy()
+    df = canonicalize(fin)
 
     # 1️⃣ pastikan kolom datetime
     df.columns = pd.to_datetime(df.columns, errors="coerce")
@@ -29,37 +102,47 @@ def summarize_annual(fin: pd.DataFrame, keys: list[str], years=5) -> pd.DataFram
     return out
 
 
-def key_financial_tables(fin_data: dict):
+def key_financial_tables(fin_data):
+    """
+    fin_data: dict statement Yahoo (get_financials) ATAU frame long dari StatementStore
+    (kolom statement, freq, period_end, metric, value) -> dibaca dalam satu query vektor.
+    """
+    if isinstance(fin_data, pd.DataFrame):
+        return key_tables_from_long(fin_data)
+
     income = fin_data.get("income")
     balance = fin_data.get("balance")
     cashflow = fin_data.get("cashflow")
 
-    income_keys = [
-        "Total Revenue",
-        "Gross Profit",
-        "Operating Income",
-        "EBIT",
-        "EBITDA",
-        "Net Income",
-    ]
-
-    balance_keys = [
-        "Total Assets",
-        "Total Liab",
-        "Total Stockholder Equity",
-        "Cash And Cash Equivalents",
-        "Short Long Term Debt",
-        "Long Term Debt",
-    ]
-
-    cashflow_keys = [
-        "Total Cash From Operating Activities",
-        "Capital Expenditures",
-        "Free Cash Flow",
-    ]
-
     return {
-        "income": summarize_annual(income, income_keys),
-        "balance": summarize_annual(balance, balance_keys),
-        "cashflow": summarize_annual(cashflow, cashflow_keys),
+        "income": summarize_annual(income, INCOME_KEYS),
+        "balance": summarize_annual(balance, BALANCE_KEYS),
+        "cashflow": summarize_annual(cashflow, CASHFLOW_KEYS),
     }
+
+
+def key_tables_from_long(long: pd.DataFrame, years=5) -> dict:
+    keys = {"income": INCOME_KEYS, "balance": BALANCE_KEYS, "cashflow": CASHFLOW_KEYS}
+    out = {k: pd.DataFrame() for k in keys}
+    if long is None or long.empty:
+        return out
+
+    wanted = pd.MultiIndex.from_tuples([(st, m) for st, ms in keys.items() for m in ms])
+    d = long[(long["freq"] == "annual")
+             & pd.MultiIndex.from_frame(long[["statement", "metric"]]).isin(wanted)]
+    if d.empty:
+        return out
+
+    wide = d.pivot_table(index=["statement", "metric"], columns="period_end", values="value", aggfunc="last")
+    wide = wide.sort_index(axis=1, ascending=False)
+
+    for st, ms in keys.items():
+        if st not in wide.index.get_level_values(0):
+            continue
+        t = wide.loc[st].dropna(axis=1, how="all")
+        t = t.iloc[:, :years]
+        t = t.reindex([m for m in ms if m in t.index])
+        t.columns = [str(c.year) for c in t.columns]
+        t.index.name = "Metric"
+        out[st] = t
+    return out
@@ -1,6 +1,9 @@
 # services/fundamental_score.py
 import math
 
+import numpy as np
+import pandas as pd
+
 def clamp(x, lo=0, hi=100):
     return max(lo, min(hi, x))
 
@@ -89,17 +92,23 @@ def grade_from_score(score):
     if score >= 45: return "C"
     return "D"
 
+def _val(x):
+    # NaN (mis. sel kosong dari tabel keuangan) diperlakukan sama dengan None / data tidak ada
+    if x is None or (isinstance(x, float) and math.isnan(x)):
+        return None
+    return x
+
 def fundamental_score(inputs):
     total = 0
     reasons = []
 
-    s, r = score_growth(inputs.get("rev_yoy"), inputs.get("ni_yoy"))
+    s, r = score_growth(_val(inputs.get("rev_yoy")), _val(inputs.get("ni_yoy")))
     total += s; reasons += r
 
-    s, r = score_profitability(inputs.get("gross_margin"), inputs.get("net_margin"), inputs.get("roe"))
+    s, r = score_profitability(_val(inputs.get("gross_margin")), _val(inputs.get("net_margin")), _val(inputs.get("roe")))
     total += s; reasons += r
 
-    s, r = score_health(inputs.get("de_ratio"), inputs.get("equity_ratio"))
+    s, r = score_health(_val(inputs.get("de_ratio")), _val(inputs.get("equity_ratio")))
     total += s; reasons += r
 
     s, r = score_cashflow(inputs.get("fcf_series"))
@@ -113,3 +122,121 @@ def fundamental_score(inputs):
         "grade": grade,
         "reasons": reasons
     }
+
+
+# =========================
+# VERSI KOLUMNAR (banyak ticker sekaligus)
+# =========================
+# kode alasan (int) -> teks; 0 = tidak ada alasan untuk slot tsb
+REASON_TEXT = [
+    None,
+    "Revenue tumbuh kuat", "Revenue tumbuh moderat", "Revenue tumbuh tipis", "Revenue stagnan/menurun",
+    "Laba tumbuh kuat", "Laba tumbuh moderat", "Laba tumbuh tipis", "Laba stagnan/menurun",
+    "Gross margin sangat sehat", "Gross margin sehat", "Gross margin tipis",
+    "Net margin tinggi", "Net margin sehat", "Net margin tipis",
+    "ROE sangat kuat", "ROE sehat", "ROE cukup",
+    "Utang rendah", "Utang terkontrol", "Utang cukup tinggi", "Utang tinggi",
+    "Equity kuat", "Equity cukup", "Equity lemah",
+    "FCF konsisten positif", "FCF mayoritas positif", "FCF fluktuatif", "FCF sering negatif",
+    "Data FCF tidak tersedia",
+]
+REASON_CODE = {t: i for i, t in enumerate(REASON_TEXT) if t}
+
+# urutan slot = urutan alasan di versi skalar
+REASON_SLOTS = ["r_rev", "r_ni", "r_gm", "r_nm", "r_roe", "r_de", "r_eq", "r_fcf"]
+
+FRAME_INPUTS = ["rev_yoy", "ni_yoy", "gross_margin", "net_margin", "roe", "de_ratio", "equity_ratio",
+                "fcf_pos", "fcf_n"]
+
+GRADE_BINS = [45, 55, 65, 75, 85]
+GRADE_LABELS = np.array(["D", "C", "B", "B+", "A-", "A"])
+
+
+def _codes(*texts):
+    return [REASON_CODE[t] for t in texts]
+
+
+def _tiered(x, bins, scores, codes, else_score=0, else_code=0):
+    """
+    Satu rantai if/elif sebagai np.select. bins: list (op, ambang) dari yang paling ketat.
+    NaN = data tidak ada -> skor 0, kode 0.
+    """
+    present = ~np.isnan(x)
+    conds = []
+    for op, thr in bins:
+        conds.append(x >= thr if op == ">=" else (x <= thr if op == "<=" else x > thr))
+    score = np.select(conds, scores, default=else_score)
+    code = np.select(conds, codes, default=else_code)
+    return np.where(present, score, 0), np.where(present, code, 0)
+
+
+def fundamental_inputs_frame(inputs_list, index=None) -> pd.DataFrame:
+    """list input dict versi skalar (dengan fcf_series) -> frame kolumnar FRAME_INPUTS."""
+    rows = []
+    for inp in inputs_list:
+        fcf = inp.get("fcf_series")
+        n = 0 if fcf is None else len(fcf)
+        row = {k: _val(inp.get(k)) for k in FRAME_INPUTS[:7]}
+        row["fcf_pos"] = int((fcf > 0).sum()) if n else 0
+        row["fcf_n"] = n
+        rows.append(row)
+    return pd.DataFrame(rows, index=index, columns=FRAME_INPUTS).astype("float64")
+
+
+def fundamental_score_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Versi vektor fundamental_score. df: satu baris per ticker, kolom FRAME_INPUTS
+    (NaN = data tidak ada; fcf_pos/fcf_n = jumlah FCF positif / jumlah tahun).
+    Output: score, grade, dan kode alasan per slot (REASON_SLOTS) -> render_reasons().
+    """
+    col = lambda c: df[c].to_numpy(dtype="float64") if c in df.columns else np.full(len(df), np.nan)
+
+    growth = [(">=", 10), (">=", 5), (">", 0)]
+    s_rev, r_rev = _tiered(col("rev_yoy"), growth, [15, 10, 5],
+                           _codes("Revenue tumbuh kuat", "Revenue tumbuh moderat", "Revenue tumbuh tipis"),
+                           else_code=REASON_CODE["Revenue stagnan/menurun"])
+    s_ni, r_ni = _tiered(col("ni_yoy"), growth, [15, 10, 5],
+                         _codes("Laba tumbuh kuat", "Laba tumbuh moderat", "Laba tumbuh tipis"),
+                         else_code=REASON_CODE["Laba stagnan/menurun"])
+
+    s_gm, r_gm = _tiered(col("gross_margin"), [(">=", 0.4), (">=", 0.25), (">=", 0.15)], [10, 7, 4],
+                         _codes("Gross margin sangat sehat", "Gross margin sehat", "Gross margin tipis"))
+    s_nm, r_nm = _tiered(col("net_margin"), [(">=", 0.2), (">=", 0.1), (">=", 0.05)], [10, 7, 4],
+                         _codes("Net margin tinggi", "Net margin sehat", "Net margin tipis"))
+    s_roe, r_roe = _tiered(col("roe"), [(">=", 20), (">=", 15), (">=", 10)], [10, 7, 4],
+                           _codes("ROE sangat kuat", "ROE sehat", "ROE cukup"))
+
+    s_de, r_de = _tiered(col("de_ratio"), [("<=", 0.5), ("<=", 1.0), ("<=", 2.0)], [12, 8, 4],
+                         _codes("Utang rendah", "Utang terkontrol", "Utang cukup tinggi"),
+                         else_code=REASON_CODE["Utang tinggi"])
+    s_eq, r_eq = _tiered(col("equity_ratio"), [(">=", 0.5), (">=", 0.3)], [13, 8],
+                         _codes("Equity kuat", "Equity cukup"),
+                         else_code=REASON_CODE["Equity lemah"])
+
+    pos = np.nan_to_num(col("fcf_pos"))
+    n = np.nan_to_num(col("fcf_n"))
+    has = n > 0
+    s_fcf = np.select([~has, pos == n, pos >= n - 1, pos >= n / 2], [0, 15, 10, 5], default=0)
+    r_fcf = np.select(
+        [~has, pos == n, pos >= n - 1, pos >= n / 2],
+        _codes("Data FCF tidak tersedia", "FCF konsisten positif", "FCF mayoritas positif", "FCF fluktuatif"),
+        default=REASON_CODE["FCF sering negatif"],
+    )
+
+    total = (
+        np.clip(s_rev + s_ni, 0, 30)
+        + np.clip(s_gm + s_nm + s_roe, 0, 30)
+        + np.clip(s_de + s_eq, 0, 25)
+        + np.clip(s_fcf, 0, 15)
+    )
+    total = np.clip(total, 0, 100).astype("int64")
+
+    out = pd.DataFrame({"score": total, "grade": GRADE_LABELS[np.digitize(total, GRADE_BINS)]}, index=df.index)
+    for slot, codes in zip(REASON_SLOTS, [r_rev, r_ni, r_gm, r_nm, r_roe, r_de, r_eq, r_fcf]):
+        out[slot] = codes.astype("uint8")
+    return out
+
+
+def render_reasons(row) -> list[str]:
+    """Kode alasan satu baris output fundamental_score_frame -> list teks (urutan sama dengan skalar)."""
+    return [REASON_TEXT[int(row[s])] for s in REASON_SLOTS if int(row[s])]
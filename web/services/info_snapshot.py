@@ -0,0 +1,212 @@
+# services/info_snapshot.py
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from services.data import fetch_info
+from services.paths import data_dir
+from services.relative import PeerIndex
+
+# field yf.Ticker.info yang dipakai app (profil, relative, valuation, scoring)
+SNAPSHOT_FIELDS = [
+    "longName",
+    "shortName",
+    "sector",
+    "industry",
+    "trailingPE",
+    "priceToBook",
+    "returnOnEquity",
+    "marketCap",
+    "trailingEps",
+    "bookValue",
+    "debtToEquity",
+    "sharesOutstanding",
+]
+TEXT_FIELDS = ["longName", "shortName", "sector", "industry"]
+NUMERIC_FIELDS = [k for k in SNAPSHOT_FIELDS if k not in TEXT_FIELDS]
+
+
+class InfoSnapshot:
+    """
+    Snapshot on-disk field info Yahoo untuk seluruh universe (1 file Parquet),
+    di-index per sektor & industri supaya peer lookup tidak perlu panggil Yahoo.
+    """
+
+    def __init__(self, path=None, fetch=None, max_age=24 * 3600):
+        self.path = path or os.path.join(data_dir("info"), "snapshot.parquet")
+        self.fetch = fetch or fetch_info
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self._df = None
+        self._mtime = None
+        self._by_sector = {}
+        self._by_industry = {}
+        self._index = None
+        self._thread = None
+        self._stop = threading.Event()
+        self.last_error = None  # error terakhir thread background
+
+    # ---------- load / index ----------
+    def frame(self) -> pd.DataFrame:
+        with self._lock:
+            mtime = os.path.getmtime(self.path) if os.path.exists(self.path) else None
+            if self._df is None or mtime != self._mtime:
+                # file bisa ditulis worker/proses lain -> reload kalau berubah
+                if mtime is None:
+                    df = pd.DataFrame(columns=SNAPSHOT_FIELDS + ["fetched_at"])
+                    df.index.name = "Ticker"
+                else:
+                    df = pd.read_parquet(self.path)
+                self._set(df, mtime)
+            return self._df
+
+    def _set(self, df: pd.DataFrame, mtime, changed=None):
+        self._df = df
+        self._mtime = mtime
+        if changed is None:
+            self._index = None  # reload penuh -> index dibangun ulang saat dibutuhkan
+        elif self._index is not None:
+            for t, row in changed.items():
+                self._index.upsert(t, row)
+        self._by_sector = {k: list(v) for k, v in df.groupby("sector").groups.items()} if not df.empty else {}
+        self._by_industry = {k: list(v) for k, v in df.groupby("industry").groups.items()} if not df.empty else {}
+
+    def _save(self, df: pd.DataFrame, changed=None):
+        tmp = self.path + ".tmp"
+        df.to_parquet(tmp)
+        os.replace(tmp, self.path)
+        self._set(df, os.path.getmtime(self.path), changed=changed)
+
+    @staticmethod
+    def _row(info: dict) -> dict:
+        # Yahoo kadang kirim string ("Infinity", "") di field angka -> NaN, supaya kolom tetap float
+        row = {k: (info.get(k) if isinstance(info.get(k), str) else None) for k in TEXT_FIELDS}
+        for k in NUMERIC_FIELDS:
+            v = pd.to_numeric(info.get(k), errors="coerce")
+            row[k] = float(v) if np.isfinite(v) else np.nan
+        return row
+
+    @staticmethod
+    def _to_info(row: pd.Series) -> dict:
+        return {k: (None if isinstance(v, float) and np.isnan(v) else v) for k, v in row.items() if k != "fetched_at"}
+
+    # ---------- query ----------
+    def get(self, ticker: str) -> dict:
+        df = self.frame()
+        return self._to_info(df.loc[ticker]) if ticker in df.index else {}
+
+    def tickers_in(self, sector=None, industry=None) -> list[str]:
+        self.frame()
+        if industry:
+            return self._by_industry.get(industry, [])
+        if sector:
+            return self._by_sector.get(sector, [])
+        return list(self._df.index)
+
+    def peers(self, sector=None, industry=None) -> dict:
+        """{ticker: info_dict} untuk build_peer_table."""
+        df = self.frame()
+        tickers = self.tickers_in(sector=sector, industry=industry)
+        sub = df.loc[tickers, SNAPSHOT_FIELDS]
+        sub = sub.astype(object).where(sub.notna(), None)
+        return sub.to_dict("index")
+
+    def peer_index(self) -> PeerIndex:
+        """Agregat sektor/industri; di-update incremental setiap upsert."""
+        with self._lock:
+            df = self.frame()
+            if self._index is None:
+                sub = df[SNAPSHOT_FIELDS].astype(object).where(df[SNAPSHOT_FIELDS].notna(), None)
+                self._index = PeerIndex.from_infos(sub.to_dict("index"))
+            return self._index
+
+    def stale(self, tickers) -> list[str]:
+        df = self.frame()
+        now = time.time()
+        fetched = df["fetched_at"] if "fetched_at" in df.columns else pd.Series(dtype=float)
+        return [t for t in tickers if t not in df.index or pd.isna(fetched.get(t)) or now - fetched.get(t) > self.max_age]
+
+    # ---------- update ----------
+    def update(self, ticker: str, info: dict):
+        """Upsert satu ticker (mis. info yang baru saja di-fetch halaman utama)."""
+        self._upsert({ticker: {**self._row(info), "fetched_at": time.time()}})
+
+    def _upsert(self, rows: dict):
+        with self._lock:
+            new = pd.DataFrame.from_dict(rows, orient="index")
+            new.index.name = "Ticker"
+            old = self.frame()
+            df = pd.concat([old[~old.index.isin(new.index)], new]) if not old.empty else new
+            df = df.astype({k: "float64" for k in NUMERIC_FIELDS + ["fetched_at"]})
+            self._save(df.sort_index(), changed=rows)
+
+    def refresh(self, tickers, max_workers=4, only_stale=True, on_progress=None, fetch=None, limiter=None) -> dict:
+        """`fetch` menggantikan self.fetch (mis. data.get_info); `limiter`: RateLimiter bersama, satu token per fetch."""
+        tickers = self.stale(tickers) if only_stale else list(dict.fromkeys(tickers))
+        fetch = fetch or self.fetch
+        rows, errors = {}, {}
+
+        def work(t):
+            try:
+                if limiter is not None:
+                    limiter.acquire()
+                rows[t] = {**self._row(fetch(t)), "fetched_at": time.time()}
+            except Exception as e:
+                errors[t] = f"{type(e).__name__}: {e}"
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as ex:
+            for i, _ in enumerate(ex.map(work, tickers), start=1):
+                if on_progress:
+                    on_progress(i, len(tickers), tickers[i - 1])
+
+        if rows:
+            self._upsert(rows)
+        return {"updated": len(rows), "errors": errors}
+
+    def start_background_refresh(self, tickers, every=3600, batch=50, max_workers=4, fetch=None, limiter=None):
+        """
+        Thread daemon: tiap `every` detik refresh ticker yang stale, per batch kecil
+        (disimpan per batch supaya progres tidak hilang kalau app restart).
+        `fetch` / `limiter` diteruskan ke refresh (app: get_info + RateLimiter prefetcher).
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return self._thread
+        tickers = list(tickers)
+
+        def loop():
+            while not self._stop.is_set():
+                todo = self.stale(tickers)
+                for i in range(0, len(todo), batch):
+                    if self._stop.is_set():
+                        return
+                    try:
+                        self.refresh(todo[i:i + batch], max_workers=max_workers, only_stale=False,
+                                     fetch=fetch, limiter=limiter)
+                    except Exception as e:
+                        # jangan sampai thread mati diam-diam; batch berikutnya tetap jalan
+                        self.last_error = f"{type(e).__name__}: {e}"
+                self._stop.wait(every)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=loop, name="info-snapshot-refresh", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+
+
+_default_snapshot = None
+_default_lock = threading.Lock()
+
+
+def default_snapshot() -> InfoSnapshot:
+    global _default_snapshot
+    with _default_lock:
+        if _default_snapshot is None:
+            _default_snapshot = InfoSnapshot()
+        return _default_snapshot
@@ -0,0 +1,281 @@
+# services/intraday.py
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from services.data import OHLCV_COLUMNS, download_ohlcv
+from services.orderflow import orderflow_radar
+from services.technical import atr, ema, rsi
+
+# menit per bar; None = harian ke atas
+INTERVAL_MINUTES = {"1m": 1, "2m": 2, "5m": 5, "15m": 15, "30m": 30, "60m": 60, "90m": 90, "1h": 60,
+                    "1d": None, "1wk": None, "1mo": None}
+
+# batas histori Yahoo per interval intraday
+MAX_PERIOD = {"1m": "7d", "2m": "60d", "5m": "60d", "15m": "60d", "30m": "60d", "60m": "730d", "90m": "60d",
+              "1h": "730d"}
+
+# aturan pandas.resample per interval tujuan
+RESAMPLE_RULE = {"2m": "2min", "5m": "5min", "15m": "15min", "30m": "30min", "60m": "60min", "90m": "90min",
+                 "1h": "60min", "1d": "1D", "1wk": "W-FRI", "1mo": "ME"}
+
+# sesi reguler BEI (WIB), termasuk pre-closing s/d 16:00. weekday: 0 = Senin
+IDX_TZ = "Asia/Jakarta"
+SESSIONS = {
+    0: [("09:00", "12:00"), ("13:30", "16:00")],
+    1: [("09:00", "12:00"), ("13:30", "16:00")],
+    2: [("09:00", "12:00"), ("13:30", "16:00")],
+    3: [("09:00", "12:00"), ("13:30", "16:00")],
+    4: [("09:00", "11:30"), ("14:00", "16:00")],
+}
+
+
+def _minutes(hhmm: str) -> int:
+    h, m = hhmm.split(":")
+    return int(h) * 60 + int(m)
+
+
+def session_minutes(weekday: int) -> int:
+    return sum(_minutes(b) - _minutes(a) for a, b in SESSIONS.get(weekday, []))
+
+
+# rata-rata menit perdagangan per hari bursa (Senin-Jumat)
+TRADING_MINUTES_PER_DAY = sum(session_minutes(d) for d in SESSIONS) / len(SESSIONS)
+
+# satuan window berbasis waktu: hari bursa (D/W/M/Y) atau durasi jam bursa (min/h)
+TRADING_DAYS = {"D": 1, "W": 5, "M": 21, "Y": 252}
+_WINDOW_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(min|h|D|W|M|Y)\s*$")
+
+
+def bars_per_day(interval: str, df: pd.DataFrame = None) -> float:
+    """Bar per hari bursa: diukur dari data kalau ada (median per tanggal), kalau tidak dari jam sesi."""
+    minutes = INTERVAL_MINUTES[interval]
+    if minutes is None:
+        return {"1d": 1.0, "1wk": 1 / 5, "1mo": 1 / 21}[interval]
+    if df is not None and not df.empty:
+        return float(df.groupby(df.index.date).size().median())
+    return float(np.ceil(TRADING_MINUTES_PER_DAY / minutes))
+
+
+def window_bars(window, interval: str, df: pd.DataFrame = None) -> int:
+    """
+    Window berbasis waktu -> jumlah bar di interval tsb. Contoh (interval 1d):
+    "20D" -> 20, "52W" -> 260; (interval 15m) "1D" -> ~21 bar, "4h" -> 16 bar.
+    Integer dianggap sudah dalam bar.
+    """
+    if isinstance(window, (int, np.integer)):
+        return int(window)
+    m = _WINDOW_RE.match(str(window))
+    if not m:
+        raise ValueError(f"window tidak dikenal: {window!r} (contoh: '20D', '52W', '90min', '4h')")
+    n, unit = float(m.group(1)), m.group(2)
+    if unit in ("min", "h"):
+        minutes = n * (60 if unit == "h" else 1)
+        step = INTERVAL_MINUTES[interval]
+        if step is None:
+            raise ValueError(f"window {window!r} lebih kecil dari satu bar {interval}")
+        return max(1, int(round(minutes / step)))
+    return max(1, int(round(n * TRADING_DAYS[unit] * bars_per_day(interval, df))))
+
+
+def trailing(df: pd.DataFrame, window) -> pd.DataFrame:
+    """Potong bar terakhir selebar `window` waktu kalender (mis. "52W" untuk 52W high/low)."""
+    if df.empty:
+        return df
+    m = _WINDOW_RE.match(str(window))
+    if not m:
+        raise ValueError(f"window tidak dikenal: {window!r}")
+    n, unit = float(m.group(1)), m.group(2)
+    offset = {
+        "min": pd.Timedelta(minutes=n),
+        "h": pd.Timedelta(hours=n),
+        "D": pd.Timedelta(days=n),
+        "W": pd.Timedelta(weeks=n),
+        "M": pd.DateOffset(months=int(n)),
+        "Y": pd.DateOffset(years=int(n)),
+    }[unit]
+    return df.loc[df.index > df.index[-1] - offset]
+
+
+def resample_ohlcv(df: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """
+    Agregasi OHLCV ke timeframe lebih besar (O first, H max, L min, C last, V sum).
+    Bin tanpa transaksi (istirahat siang, malam, libur) dibuang.
+    """
+    if df.empty:
+        return df
+    rule = RESAMPLE_RULE[interval]
+    kwargs = {"label": "left", "closed": "left"} if INTERVAL_MINUTES[interval] else {}
+    out = df[OHLCV_COLUMNS].resample(rule, **kwargs).agg(
+        {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+    )
+    return out.dropna(subset=["Open"])
+
+
+def add_indicators_tf(df: pd.DataFrame, interval="1d", spans=(20, 50, 200), rsi_period=14, atr_period=14,
+                      vol_window="20D") -> pd.DataFrame:
+    """
+    add_indicators untuk timeframe apa pun. Semua window boleh integer (jumlah bar) atau durasi
+    (window_bars: "20D", "4h", "90min"), mis. spans=("20D", "50D") di data 15m = EMA ~20 hari bursa.
+    Kolom EMA diberi nama sesuai input (EMA20, EMA20D); RSI14 / ATR14 / VOL_AVG20 tetap bernama itu
+    (dibaca technical_plan / orderflow_radar) walau window-nya durasi.
+    Untuk interval "1d" dengan default hasilnya sama persis dengan technical.add_indicators.
+    """
+    if df is None or df.empty or "Close" not in df.columns:
+        return pd.DataFrame()
+    close = df["Close"]
+    # tanpa df.copy(): kolom input dipakai bersama (copy-on-write), sama dengan technical.add_indicators
+    cols = {c: df[c] for c in df.columns}
+    for span in spans:
+        cols[f"EMA{span}"] = ema(close, window_bars(span, interval, df))
+    cols["RSI14"] = rsi(close, window_bars(rsi_period, interval, df))
+    cols["ATR14"] = atr(df, window_bars(atr_period, interval, df))
+    cols["VOL_AVG20"] = df["Volume"].rolling(window_bars(vol_window, interval, df)).mean()
+    return pd.DataFrame(cols, copy=False)
+
+
+def orderflow_radar_tf(df: pd.DataFrame, interval="1d", lookback="20D") -> dict:
+    """orderflow_radar dengan lookback durasi (window_bars); df = output add_indicators_tf."""
+    return orderflow_radar(df, lookback=window_bars(lookback, interval, df))
+
+
+class BarBuffer:
+    """
+    Ring buffer OHLCV berukuran tetap (numpy), untuk satu ticker & satu interval dasar.
+    Bar terakhir boleh di-update (bar berjalan); bar lebih lama dari bar terakhir diabaikan.
+    """
+
+    def __init__(self, interval="1m", capacity=20_000):
+        self.interval = interval
+        self.capacity = capacity
+        self._ts = np.empty(capacity, dtype="int64")
+        self._ohlcv = np.empty((capacity, len(OHLCV_COLUMNS)), dtype="float64")
+        self._start = 0
+        self._size = 0
+        self.tz = None
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def last_ts(self):
+        if not self._size:
+            return None
+        ts = pd.Timestamp(self._ts[(self._start + self._size - 1) % self.capacity], tz="UTC")
+        return ts.tz_convert(self.tz) if self.tz else ts.tz_localize(None)
+
+    def _push(self, ts: int, row):
+        if self._size:
+            last = (self._start + self._size - 1) % self.capacity
+            if ts == self._ts[last]:
+                self._ohlcv[last] = row
+                return
+            if ts < self._ts[last]:
+                return
+        pos = (self._start + self._size) % self.capacity
+        self._ts[pos] = ts
+        self._ohlcv[pos] = row
+        if self._size == self.capacity:
+            self._start = (self._start + 1) % self.capacity
+        else:
+            self._size += 1
+
+    def append(self, ts, open_, high, low, close, volume):
+        ts = pd.Timestamp(ts)
+        if self.tz is None and ts.tz is not None:
+            self.tz = str(ts.tz)
+        self._push(ts.value if ts.tz is not None or self.tz is None else ts.tz_localize(self.tz).value,
+                   (open_, high, low, close, volume))
+
+    def extend(self, df: pd.DataFrame):
+        if df is None or df.empty:
+            return
+        idx = pd.DatetimeIndex(df.index).as_unit("ns")  # pandas 3 default resolusi "us"
+        if self.tz is None and idx.tz is not None:
+            self.tz = str(idx.tz)
+        ts = idx.asi8 if idx.tz is not None or self.tz is None else idx.tz_localize(self.tz).as_unit("ns").asi8
+        vals = df[OHLCV_COLUMNS].to_numpy(dtype="float64")
+
+        if self._size:
+            last = self._ts[(self._start + self._size - 1) % self.capacity]
+            keep = ts >= last
+            ts, vals = ts[keep], vals[keep]
+            if len(ts) and ts[0] == last:
+                self._push(int(ts[0]), vals[0])
+                ts, vals = ts[1:], vals[1:]
+        if not len(ts):
+            return
+
+        # bulk: cukup tulis `capacity` bar terakhir
+        ts, vals = ts[-self.capacity:], vals[-self.capacity:]
+        n = len(ts)
+        pos = (self._start + self._size + np.arange(n)) % self.capacity
+        self._ts[pos] = ts
+        self._ohlcv[pos] = vals
+        total = self._size + n
+        if total > self.capacity:
+            self._start = (self._start + total - self.capacity) % self.capacity
+        self._size = min(total, self.capacity)
+
+    def frame(self, last=None) -> pd.DataFrame:
+        """Salinan bar (urut waktu) sebagai DataFrame; `last` = hanya n bar terakhir."""
+        n = self._size if last is None else min(last, self._size)
+        pos = (self._start + self._size - n + np.arange(n)) % self.capacity
+        name = "Datetime" if INTERVAL_MINUTES[self.interval] else "Date"
+        idx = pd.DatetimeIndex(self._ts[pos].view("datetime64[ns]"), name=name)
+        idx = idx.tz_localize("UTC").tz_convert(self.tz) if self.tz else idx
+        return pd.DataFrame(self._ohlcv[pos], index=idx, columns=OHLCV_COLUMNS)
+
+    def resample(self, interval: str) -> pd.DataFrame:
+        return resample_ohlcv(self.frame(), interval)
+
+
+class IntradayFeed:
+    """
+    Satu tarikan data intraday per ticker (interval dasar, mis. 1m/5m) di ring buffer;
+    timeframe lebih besar (15m, 60m, 1d, 1wk) di-resample dari buffer tanpa fetch ulang.
+    Refresh berikutnya hanya mengambil bar sejak tanggal bar terakhir.
+    """
+
+    def __init__(self, interval="5m", capacity=20_000, fetch=None):
+        if INTERVAL_MINUTES.get(interval) is None:
+            raise ValueError(f"interval dasar harus intraday, bukan {interval!r}")
+        self.interval = interval
+        self.capacity = capacity
+        self.fetch = fetch or download_ohlcv
+        self._buffers = {}
+        self._lock = threading.Lock()
+
+    def buffer(self, ticker: str) -> BarBuffer:
+        with self._lock:
+            if ticker not in self._buffers:
+                self._buffers[ticker] = BarBuffer(self.interval, self.capacity)
+            return self._buffers[ticker]
+
+    def refresh(self, ticker: str) -> int:
+        """Tarik bar baru ke buffer; output: jumlah bar di buffer."""
+        buf = self.buffer(ticker)
+        if len(buf):
+            df = self.fetch(ticker, interval=self.interval, start=buf.last_ts.strftime("%Y-%m-%d"))
+        else:
+            df = self.fetch(ticker, period=MAX_PERIOD[self.interval], interval=self.interval)
+        buf.extend(df)
+        return len(buf)
+
+    def bars(self, ticker: str, interval=None, refresh=False) -> pd.DataFrame:
+        if refresh or not len(self.buffer(ticker)):
+            self.refresh(ticker)
+        buf = self.buffer(ticker)
+        if interval is None or interval == self.interval:
+            return buf.frame()
+        if INTERVAL_MINUTES[interval] is not None and INTERVAL_MINUTES[interval] < INTERVAL_MINUTES[self.interval]:
+            raise ValueError(f"tidak bisa resample {self.interval} ke interval lebih kecil {interval}")
+        return buf.resample(interval)
+
+    def timeframes(self, ticker: str, intervals=("15m", "60m", "1d"), refresh=False) -> dict:
+        """{interval: OHLCV} dari satu buffer, untuk konfirmasi multi-timeframe."""
+        if refresh or not len(self.buffer(ticker)):
+            self.refresh(ticker)
+        return {iv: self.bars(ticker, iv) for iv in intervals}
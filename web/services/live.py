@@ -0,0 +1,289 @@
+# services/live.py
+import heapq
+import queue
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from services.orderflow import adl, obv, radar_label
+from services.streaming import IndicatorState
+from services.technical import plan_from_row
+
+# field yang dikirim ke UI + pembulatan (perubahan di bawah presisi ini tidak dikirim)
+LIVE_FIELDS = {
+    "Close": 2,
+    "Volume": 0,
+    "EMA20": 2,
+    "EMA50": 2,
+    "EMA200": 2,
+    "RSI14": 1,
+    "ATR14": 2,
+    "vol_ratio": 2,
+    "trend": None,
+    "setup_ok": None,
+    "entry": 2,
+    "stop": 2,
+    "tp": 2,
+    "radar": None,
+    "final": None,
+}
+
+
+# =========================
+# SUMBER DATA (pluggable)
+# =========================
+# Sumber = iterable event dict:
+#   bar : {"ticker", "ts", "Open", "High", "Low", "Close", "Volume", "final": bool}
+#   tick: {"ticker", "ts", "price", "size"}  -> digabung ke bar berjalan oleh LiveEngine
+class ReplaySource:
+    """
+    Putar ulang bar historis (per ticker) berurutan waktu, untuk test offline.
+    `ticks_per_bar` > 1: tiap bar dipecah jadi update bar berjalan (final=False) lalu bar final.
+    `speed`: None = secepatnya; 60 = satu menit data per detik, dst.
+    """
+
+    def __init__(self, frames: dict, ticks_per_bar=1, speed=None, start=None):
+        self.frames = frames
+        self.ticks_per_bar = max(1, ticks_per_bar)
+        self.speed = speed
+        self.start = pd.Timestamp(start) if start is not None else None
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "ReplaySource":
+        """File long (CSV/Parquet) berkolom Ticker, Date, Open, High, Low, Close, Volume."""
+        df = pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path, parse_dates=["Date"])
+        frames = {t: g.set_index("Date").sort_index() for t, g in df.groupby("Ticker")}
+        return cls(frames, **kwargs)
+
+    def _bars(self, ticker, df):
+        if self.start is not None:
+            df = df.loc[df.index >= self.start]
+        cols = df[["Open", "High", "Low", "Close", "Volume"]].to_numpy(dtype="float64")
+        for ts, (o, h, l, c, v) in zip(df.index, cols):
+            yield ts, ticker, (o, h, l, c, v)
+
+    def __iter__(self):
+        n = self.ticks_per_bar
+        t_prev = None
+        streams = [self._bars(t, df) for t, df in self.frames.items()]
+        for ts, ticker, (o, h, l, c, v) in heapq.merge(*streams, key=lambda x: x[0]):
+            if self.speed and t_prev is not None and ts > t_prev:
+                time.sleep((ts - t_prev).total_seconds() / self.speed)
+            t_prev = ts
+            for k in range(1, n + 1):
+                # bar berjalan: close bergerak dari open ke close, high/low & volume bertambah
+                frac = k / n
+                ck = o + (c - o) * frac
+                yield {
+                    "ticker": ticker,
+                    "ts": ts,
+                    "Open": o,
+                    "High": h if k == n else max(o, ck),
+                    "Low": l if k == n else min(o, ck),
+                    "Close": c if k == n else ck,
+                    "Volume": v * frac,
+                    "final": k == n,
+                }
+
+
+class QueueSource:
+    """Event dari thread lain (mis. klien websocket broker); `None` = selesai."""
+
+    def __init__(self, maxsize=10_000):
+        self.queue = queue.Queue(maxsize=maxsize)
+
+    def put(self, event):
+        self.queue.put(event)
+
+    def close(self):
+        self.queue.put(None)
+
+    def __iter__(self):
+        while True:
+            event = self.queue.get()
+            if event is None:
+                return
+            yield event
+
+
+# =========================
+# LATENCY
+# =========================
+class LatencyStats:
+    """Latensi per event (ns) di reservoir berukuran tetap; memori tidak tumbuh."""
+
+    def __init__(self, size=10_000):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+        self.max_ns = 0
+
+    def add(self, ns: int):
+        self.samples.append(ns)
+        self.count += 1
+        self.max_ns = max(self.max_ns, ns)
+
+    def summary(self) -> dict:
+        if not self.samples:
+            return {"events": 0}
+        a = np.fromiter(self.samples, dtype="int64") / 1000.0
+        return {
+            "events": self.count,
+            "p50_us": float(np.percentile(a, 50)),
+            "p95_us": float(np.percentile(a, 95)),
+            "p99_us": float(np.percentile(a, 99)),
+            "max_us": self.max_ns / 1000.0,
+        }
+
+
+# =========================
+# ENGINE
+# =========================
+class _TickerLive:
+    __slots__ = ("state", "flow", "bar", "bar_ts", "view")
+
+    def __init__(self, state, flow):
+        self.state = state  # IndicatorState s/d bar final terakhir
+        self.flow = flow    # deque (OBV, ADL) bar final terakhir, maxlen = lookback
+        self.bar = None     # bar berjalan dari tick
+        self.bar_ts = None
+        self.view = {}      # field terakhir yang sudah dikirim ke UI
+
+
+class LiveEngine:
+    """
+    Update indikator, radar bandarmologi & technical plan per event dalam O(1) per ticker.
+    Bar final memajukan IndicatorState; bar berjalan dihitung di salinan state (tidak mengubah state).
+    Output per event hanya field yang berubah (setelah pembulatan LIVE_FIELDS).
+    Memori per ticker tetap: state indikator + deque `lookback` (OBV, ADL).
+    """
+
+    def __init__(self, lookback=20, plan_kwargs=None, latency_samples=10_000):
+        self.lookback = lookback
+        self.plan_kwargs = plan_kwargs or {}
+        self.latency = LatencyStats(latency_samples)
+        self._tickers = {}
+        self._lock = threading.Lock()
+
+    # ---------- subscribe ----------
+    def subscribe(self, ticker: str, history: pd.DataFrame) -> dict:
+        """Seed dari history harian (mis. PriceStore); output: view awal (semua field)."""
+        state = IndicatorState.from_history(history)
+        flow = deque(zip(obv(history).tail(self.lookback), adl(history).tail(self.lookback)),
+                     maxlen=self.lookback)
+        live = _TickerLive(state, flow)
+        with self._lock:
+            self._tickers[ticker] = live
+        last = history.iloc[-1]
+        view = self._view(state.values(last), flow, final=True)
+        live.view = view
+        return dict(view)
+
+    def unsubscribe(self, ticker: str):
+        with self._lock:
+            self._tickers.pop(ticker, None)
+
+    @property
+    def tickers(self) -> list:
+        return list(self._tickers)
+
+    def view(self, ticker: str) -> dict:
+        return dict(self._tickers[ticker].view)
+
+    # ---------- hitung ----------
+    def _view(self, vals: dict, flow: deque, final: bool) -> dict:
+        vol_avg = vals["VOL_AVG20"] if vals["VOL_AVG20"] > 0 else 1.0
+        vol_ratio = vals["Volume"] / vol_avg
+        rng = vals["High"] - vals["Low"] if vals["High"] - vals["Low"] != 0 else 1.0
+        close_pos = (vals["Close"] - vals["Low"]) / rng
+
+        # window radar = (lookback - 1) bar final sebelumnya + bar ini
+        if final:
+            first_obv, first_adl = flow[0]
+        else:
+            first_obv, first_adl = flow[1] if len(flow) == flow.maxlen and len(flow) > 1 else flow[0]
+        radar = radar_label(vals["OBV"] - first_obv, vals["ADL"] - first_adl, vol_ratio, close_pos)
+
+        plan = plan_from_row(vals, **self.plan_kwargs)
+        out = {**vals, "vol_ratio": vol_ratio, "radar": radar, "final": final,
+               "trend": plan.get("trend"), "setup_ok": plan["setup_ok"],
+               "entry": plan.get("entry"), "stop": plan.get("stop"), "tp": plan.get("tp")}
+        return {k: (round(float(out[k]), nd) if nd is not None and out[k] is not None else out[k])
+                for k, nd in LIVE_FIELDS.items()}
+
+    def _commit(self, live, bar, ts) -> dict:
+        vals = live.state.update(bar, date=ts)
+        live.flow.append((vals["OBV"], vals["ADL"]))
+        live.bar = live.bar_ts = None
+        return vals
+
+    def _bar_from_tick(self, live, event) -> dict:
+        """Tick -> bar berjalan dengan timestamp bar event["ts"]; ts baru = bar sebelumnya final."""
+        ts, price, size = event["ts"], float(event["price"]), float(event.get("size", 0.0))
+        if live.bar is not None and ts != live.bar_ts:
+            self._commit(live, live.bar, live.bar_ts)
+        if live.bar is None:
+            live.bar = {"Open": price, "High": price, "Low": price, "Close": price, "Volume": 0.0}
+            live.bar_ts = ts
+        b = live.bar
+        b["High"] = max(b["High"], price)
+        b["Low"] = min(b["Low"], price)
+        b["Close"] = price
+        b["Volume"] += size
+        return b
+
+    def on_event(self, event: dict):
+        """Proses satu event; output {"ticker", "ts", "changes": {...}} atau None kalau tidak ada perubahan."""
+        t0 = time.perf_counter_ns()
+        live = self._tickers.get(event["ticker"])
+        if live is None:
+            return None
+
+        if "price" in event:
+            bar, final = self._bar_from_tick(live, event), bool(event.get("final", False))
+        else:
+            bar, final = event, bool(event.get("final", True))
+
+        if final:
+            vals = self._commit(live, bar, event.get("ts"))
+        else:
+            vals = live.state.copy().update(bar, date=event.get("ts"))
+
+        view = self._view(vals, live.flow, final)
+        changes = {k: v for k, v in view.items() if live.view.get(k) != v}
+        live.view = view
+        self.latency.add(time.perf_counter_ns() - t0)
+        if not changes:
+            return None
+        return {"ticker": event["ticker"], "ts": event.get("ts"), "changes": changes}
+
+    def run(self, source, on_update=None, max_events=None, stop=None) -> dict:
+        """Konsumsi source sampai habis / `max_events` / `stop` (threading.Event) di-set."""
+        n = pushed = 0
+        for event in source:
+            upd = self.on_event(event)
+            n += 1
+            if upd is not None:
+                pushed += 1
+                if on_update:
+                    on_update(upd)
+            if (max_events and n >= max_events) or (stop is not None and stop.is_set()):
+                break
+        return {"events": n, "updates": pushed, **self.latency.summary()}
+
+
+def history_for(tickers, period="2y", refresh=False, until=None) -> dict:
+    """History harian dari PriceStore untuk subscribe (`until` = potong s/d tanggal itu, untuk replay)."""
+    from services.store import default_store  # lazy: tidak perlu store kalau history disuplai sendiri
+
+    out = {}
+    for t in tickers:
+        df = default_store().get(t, period=period, refresh=refresh)
+        if until is not None:
+            df = df.loc[df.index < pd.Timestamp(until)]
+        if not df.empty:
+            out[t] = df
+    return out
+
@@ -1,9 +1,120 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import parse_qsl, quote, urlencode, urlsplit, urlunsplit
+
 import feedparser
-from urllib.parse import quote
 
-def google_news_rss(query: str, hl="id", gl="ID", ceid="ID:id", max_items=12):
-    url = f"https://news.google.com/rss/search?q={quote(query)}&hl={hl}&gl={gl}&ceid={ceid}"
-    feed = feedparser.parse(url)
+from services.coordinator import default_coordinator
+from services.paths import data_dir
+
+GOOGLE_NEWS_URL = "https://news.google.com/rss/search?q={q}&hl={hl}&gl={gl}&ceid={ceid}"
+USER_AGENT = "Mozilla/5.0 (StockLab news fetcher)"
+
+
+def feed_url(query: str, hl="id", gl="ID", ceid="ID:id", url_template=None) -> str:
+    return (url_template or GOOGLE_NEWS_URL).format(q=quote(query), hl=hl, gl=gl, ceid=ceid)
+
+
+class FeedCache:
+    """
+    Cache body feed on-disk per URL (+ ETag / Last-Modified).
+    Dalam `ttl` detik body dipakai langsung; setelah itu request kondisional,
+    304 = body lama tetap dipakai tanpa download ulang.
+    """
+
+    def __init__(self, root=None, ttl=15 * 60):
+        self.root = root or data_dir("news")
+        self.ttl = ttl
+
+    def _paths(self, url):
+        key = hashlib.sha1(url.encode()).hexdigest()
+        return os.path.join(self.root, f"{key}.xml"), os.path.join(self.root, f"{key}.json")
+
+    def get(self, url: str):
+        """(body | None, meta dict)"""
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                return f.read(), meta
+        except (FileNotFoundError, ValueError):
+            return None, {}
+
+    def fresh(self, meta: dict) -> bool:
+        return time.time() - meta.get("fetched_at", 0) < self.ttl
+
+    def put(self, url: str, body: bytes, etag=None, last_modified=None):
+        body_path, meta_path = self._paths(url)
+        if body is not None:
+            with open(body_path + ".tmp", "wb") as f:
+                f.write(body)
+            os.replace(body_path + ".tmp", body_path)
+        meta = {"url": url, "etag": etag, "last_modified": last_modified, "fetched_at": time.time()}
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(meta_path + ".tmp", meta_path)
+
+
+def _http_get(url, etag=None, last_modified=None, timeout=10):
+    """GET kondisional (blocking). Output: (status, body, etag, last_modified)."""
+    req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    if etag:
+        req.add_header("If-None-Match", etag)
+    if last_modified:
+        req.add_header("If-Modified-Since", last_modified)
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return resp.status, resp.read(), resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return 304, None, etag, last_modified
+        raise
+
+
+async def fetch_feed(url: str, cache: FeedCache, timeout=10, executor=None, coordinator=None,
+                     force=False) -> tuple[bytes, str]:
+    """
+    Output: (body, status) dengan status "cache" | "304" | "200" | "stale" (error jaringan, pakai cache lama).
+    `force=True`: request kondisional walau cache masih dalam ttl (warm-up prefetcher).
+    HTTP blocking dijalankan di `executor` (default: thread pool bawaan event loop); GET untuk URL
+    yang sama dari sesi lain yang sedang jalan digabung lewat services.coordinator.
+    """
+    body, meta = cache.get(url)
+    if body is not None and cache.fresh(meta) and not force:
+        return body, "cache"
+    etag = meta.get("etag") if body is not None else None
+    last_modified = meta.get("last_modified") if body is not None else None
+    try:
+        coordinator = coordinator or default_coordinator()
+        get = partial(_http_get, url, etag, last_modified, timeout)
+        status, new_body, etag, last_modified = await asyncio.get_running_loop().run_in_executor(
+            # header kondisional ikut key: pemanggil tanpa body cache tidak boleh ikut GET yang bisa 304
+            executor, partial(coordinator.fetch, "news", url, get,
+                              params={"etag": etag, "last_modified": last_modified}, timeout=timeout + 5)
+        )
+    except Exception:
+        if body is not None:
+            return body, "stale"
+        raise
+    if status == 304:
+        cache.put(url, None, etag, last_modified)
+        return body, "304"
+    cache.put(url, new_body, etag, last_modified)
+    return new_body, "200"
+
+
+def parse_items(body: bytes, max_items=12) -> list[dict]:
+    feed = feedparser.parse(body)
     items = []
     for e in feed.entries[:max_items]:
         items.append({
@@ -13,3 +124,131 @@ def google_news_rss(query: str, hl="id", gl="ID", ceid="ID:id", max_items=12):
             "source": getattr(e, "source", {}).get("title") if hasattr(e, "source") else ""
         })
     return items
+
+
+# =========================
+# DEDUP ARTIKEL
+# =========================
+def normalize_url(url: str) -> str:
+    """Buang skema/www/fragment/parameter tracking (utm_*, fbclid, ...) supaya URL yang sama cocok."""
+    parts = urlsplit((url or "").strip())
+    host = parts.netloc.lower().removeprefix("www.")
+    query = [(k, v) for k, v in parse_qsl(parts.query) if not k.lower().startswith(("utm_", "fbclid", "gclid"))]
+    return urlunsplit(("", host, parts.path.rstrip("/"), urlencode(sorted(query)), ""))
+
+
+def normalize_title(title: str, source: str = "") -> str:
+    """Judul Google News = "Judul - Sumber"; sufiks sumber & tanda baca dibuang."""
+    t = (title or "").strip()
+    if source and t.endswith(f" - {source}"):
+        t = t[: -len(source) - 3]
+    return re.sub(r"[\W_]+", " ", t.lower()).strip()
+
+
+def article_keys(item: dict) -> tuple[str, str]:
+    url_key = hashlib.sha1(normalize_url(item.get("link")).encode()).hexdigest()[:16]
+    title = normalize_title(item.get("title"), item.get("source") or "")
+    title_key = hashlib.sha1(title.encode()).hexdigest()[:16] if title else None
+    return url_key, title_key
+
+
+def dedupe_articles(by_key: dict) -> dict:
+    """
+    {ticker: [item, ...]} -> {"by_ticker": {ticker: [item, ...]}, "articles": {id: item}}.
+    Artikel sama (URL ternormalisasi ATAU judul ternormalisasi sama) jadi satu dict yang
+    dipakai bersama; item["tickers"] berisi semua ticker yang memuatnya.
+    """
+    articles, by_url, by_title = {}, {}, {}
+    out = {}
+    for key, items in by_key.items():
+        out[key] = []
+        for item in items:
+            url_key, title_key = article_keys(item)
+            aid = by_url.get(url_key) or (by_title.get(title_key) if title_key else None)
+            if aid is None:
+                aid = url_key
+                articles[aid] = {**item, "id": aid, "tickers": []}
+            by_url.setdefault(url_key, aid)
+            if title_key:
+                by_title.setdefault(title_key, aid)
+            art = articles[aid]
+            if key not in art["tickers"]:
+                art["tickers"].append(key)
+                out[key].append(art)
+    return {"by_ticker": out, "articles": articles}
+
+
+# =========================
+# FETCH BANYAK TICKER
+# =========================
+async def fetch_news_many(queries: dict, max_items=12, concurrency=16, cache=None, url_template=None,
+                          timeout=10, **url_kwargs) -> dict:
+    """
+    queries: {ticker: query}. Semua feed di-fetch konkuren (maks `concurrency` sekaligus).
+    Output: dedupe_articles(...) + "status": {ticker: status fetch_feed | error}.
+    """
+    cache = cache or default_feed_cache()
+    sem = asyncio.Semaphore(concurrency)
+    status = {}
+
+    async def one(key, query):
+        async with sem:
+            try:
+                body, status[key] = await fetch_feed(feed_url(query, url_template=url_template, **url_kwargs),
+                                                     cache, timeout=timeout, executor=executor)
+                return key, parse_items(body, max_items)
+            except Exception as e:
+                status[key] = f"error: {type(e).__name__}: {e}"
+                return key, []
+
+    # pool sendiri seukuran `concurrency` (pool bawaan loop cuma ~cpu+4 thread)
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        results = await asyncio.gather(*(one(k, q) for k, q in queries.items()))
+    out = dedupe_articles(dict(results))
+    out["status"] = status
+    return out
+
+
+def _run(coro):
+    """asyncio.run, tapi tetap jalan kalau dipanggil dari thread yang sudah punya event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    box = {}
+    t = threading.Thread(target=lambda: box.setdefault("r", asyncio.run(coro)))
+    t.start()
+    t.join()
+    return box["r"]
+
+
+def ticker_query(ticker: str) -> str:
+    """Query berita default per ticker: "<KODE> saham"."""
+    return f"{ticker.replace('.JK', '')} saham"
+
+
+def news_for_tickers(tickers, max_items=12, **kwargs) -> dict:
+    """Versi sync fetch_news_many dengan query default ticker_query."""
+    return _run(fetch_news_many({t: ticker_query(t) for t in tickers}, max_items=max_items, **kwargs))
+
+
+def google_news_rss(query: str, hl="id", gl="ID", ceid="ID:id", max_items=12, cache=None, url_template=None,
+                    force=False):
+    url = feed_url(query, hl=hl, gl=gl, ceid=ceid, url_template=url_template)
+    try:
+        body, _ = _run(fetch_feed(url, cache or default_feed_cache(), force=force))
+    except Exception:
+        return []
+    return parse_items(body, max_items)
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def default_feed_cache() -> FeedCache:
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = FeedCache()
+        return _default_cache
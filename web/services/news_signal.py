@@ -0,0 +1,224 @@
+# services/news_signal.py
+import os
+import re
+import sqlite3
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import pandas as pd
+
+from services.news import article_keys
+from services.paths import data_dir
+
+CATEGORIES = ("Operasional", "Keuangan", "Struktural")
+IMPACT_WEIGHT = {"LOW": 0.5, "MEDIUM": 1.0, "HIGH": 2.0}
+
+# keyword (huruf kecil) -> dipakai sebagai substring judul
+CATEGORY_KEYWORDS = {
+    "Struktural": ["akuisisi", "merger", "divestasi", "rups", "direksi", "komisaris", "tender offer",
+                   "buyback", "private placement", "rights issue", "right issue", "spin off", "pengendali",
+                   "go private", "delisting", "stock split", "suspensi"],
+    "Keuangan": ["laba", "rugi", "pendapatan", "kinerja", "kuartal", "dividen", "utang", "obligasi",
+                 "gagal bayar", "pkpu", "pailit", "margin", "revenue", "arus kas", "rating"],
+    "Operasional": ["produksi", "ekspansi", "pabrik", "kontrak", "proyek", "penjualan", "tambang",
+                    "gerai", "kapasitas", "ekspor", "peluncuran", "izin"],
+}
+HIGH_KEYWORDS = ["akuisisi", "merger", "tender offer", "rights issue", "right issue", "gagal bayar", "pkpu",
+                 "pailit", "suspensi", "delisting", "go private", "melonjak", "anjlok", "rekor"]
+MEDIUM_KEYWORDS = ["laba", "rugi", "dividen", "kontrak", "ekspansi", "buyback", "private placement",
+                   "kinerja", "obligasi", "stock split", "rating"]
+POSITIVE_KEYWORDS = ["naik", "melonjak", "tumbuh", "meningkat", "menguat", "rekor", "laba bersih naik",
+                     "dividen", "buyback", "kontrak baru", "ekspansi", "upgrade", "untung", "positif"]
+NEGATIVE_KEYWORDS = ["turun", "anjlok", "merosot", "melemah", "rugi", "gagal bayar", "pkpu", "pailit",
+                     "suspensi", "denda", "gugatan", "sanksi", "downgrade", "negatif", "tersangka", "korupsi"]
+
+
+def _hits(text, words):
+    return sum(1 for w in words if w in text)
+
+
+def keyword_classify(title: str) -> dict:
+    """Klasifikasi cepat berbasis kata kunci: category, impact (LOW/MEDIUM/HIGH), sign (-1/0/+1)."""
+    t = re.sub(r"\s+", " ", (title or "").lower())
+    scores = {c: _hits(t, kws) for c, kws in CATEGORY_KEYWORDS.items()}
+    category = max(CATEGORIES, key=lambda c: scores[c]) if any(scores.values()) else "Operasional"
+
+    if _hits(t, HIGH_KEYWORDS):
+        impact = "HIGH"
+    elif _hits(t, MEDIUM_KEYWORDS):
+        impact = "MEDIUM"
+    else:
+        impact = "LOW"
+
+    net = _hits(t, POSITIVE_KEYWORDS) - _hits(t, NEGATIVE_KEYWORDS)
+    return {"category": category, "impact": impact, "sign": (net > 0) - (net < 0)}
+
+
+def epoch_seconds(when) -> float:
+    """Tanggal / string / pd.Timestamp -> epoch detik (naive dianggap UTC)."""
+    ts = pd.Timestamp(when)
+    return (ts.tz_localize("UTC") if ts.tz is None else ts).timestamp()
+
+
+def published_ts(item: dict, default=None) -> float:
+    try:
+        return parsedate_to_datetime(item.get("published")).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return default if default is not None else time.time()
+
+
+class NewsSignals:
+    """
+    Sinyal berita per ticker, incremental:
+    - hanya artikel yang belum pernah dilihat (id = hash URL ternormalisasi) yang diklasifikasi
+    - skor = sum(sign * bobot impact * 0.5 ** (umur / half_life)), disimpan sebagai (score, as_of)
+      sehingga membaca skor saat ini cukup meluruhkan satu angka, tanpa rescoring.
+    """
+
+    def __init__(self, path=None, classify=None, half_life_days=7.0, threshold=1.0, alert_days=14):
+        self.path = path or os.path.join(data_dir("news"), "signals.sqlite")
+        self.classify = classify or keyword_classify
+        self.half_life = half_life_days * 86400
+        self.threshold = threshold
+        self.alert = alert_days * 86400
+        self._lock = threading.Lock()
+        self._seen = {}  # ticker -> set(id), dimuat sekali dari DB; hanya petunjuk (lihat update)
+        with self._connect() as con:
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS events (ticker TEXT, id TEXT, ts REAL, category TEXT, "
+                "impact TEXT, sign INTEGER, title TEXT, PRIMARY KEY (ticker, id))"
+            )
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS state (ticker TEXT PRIMARY KEY, score REAL, as_of REAL, "
+                "n INTEGER, last_ts REAL, last_high_neg REAL)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _decay(self, dt):
+        return 0.5 ** (dt / self.half_life)
+
+    def _seen_ids(self, con, ticker):
+        if ticker not in self._seen:
+            rows = con.execute("SELECT id FROM events WHERE ticker = ?", (ticker,)).fetchall()
+            self._seen[ticker] = {r[0] for r in rows}
+        return self._seen[ticker]
+
+    def _state(self, con, ticker):
+        row = con.execute("SELECT score, as_of, n, last_ts, last_high_neg FROM state WHERE ticker = ?",
+                          (ticker,)).fetchone()
+        return row or (0.0, None, 0, None, None)
+
+    def update(self, ticker: str, items, now=None) -> dict:
+        """
+        Catat artikel baru (kalau ada) lalu kembalikan signal(ticker).
+        `_seen` hanya petunjuk untuk melewati klasifikasi; yang menentukan artikel baru adalah INSERT
+        ke tabel events (rowcount 1) di satu transaksi BEGIN IMMEDIATE bersama update state, jadi proses
+        lain (worker Streamlit / CLI) yang memakai file yang sama tidak menghitung artikel dua kali.
+        """
+        now = now or time.time()
+        with self._lock:
+            with self._connect() as con:
+                seen = self._seen_ids(con, ticker)
+            new = {}
+            for item in items or []:
+                aid = item.get("id") or article_keys(item)[0]
+                if aid not in seen and aid not in new:
+                    new[aid] = item
+            if new:
+                # klasifikasi di luar transaksi (bisa lambat kalau classify = model)
+                rows = []
+                for aid, item in new.items():
+                    c = self.classify(item.get("title"))
+                    rows.append((ticker, aid, published_ts(item, default=now), c["category"], c["impact"],
+                                 c["sign"], item.get("title")))
+                self._record(ticker, rows, now)
+                seen.update(new)
+        return self.signal(ticker, now=now)
+
+    def _record(self, ticker, rows, now):
+        con = self._connect()
+        con.isolation_level = None  # transaksi diatur manual
+        try:
+            con.execute("BEGIN IMMEDIATE")
+            score, as_of, n, last_ts, last_high_neg = self._state(con, ticker)
+            score = score * self._decay(now - as_of) if as_of else 0.0
+            added = 0
+            for row in rows:
+                cur = con.execute("INSERT OR IGNORE INTO events VALUES (?, ?, ?, ?, ?, ?, ?)", row)
+                if cur.rowcount != 1:
+                    continue  # sudah dicatat proses lain
+                _, _, ts, _, impact, sign, _ = row
+                score += sign * IMPACT_WEIGHT[impact] * self._decay(max(0.0, now - ts))
+                last_ts = max(last_ts or ts, ts)
+                if impact == "HIGH" and sign < 0:
+                    last_high_neg = max(last_high_neg or ts, ts)
+                added += 1
+            if added:
+                con.execute("INSERT OR REPLACE INTO state VALUES (?, ?, ?, ?, ?, ?)",
+                            (ticker, score, now, n + added, last_ts, last_high_neg))
+            con.execute("COMMIT")
+        except Exception:
+            con.execute("ROLLBACK")
+            raise
+        finally:
+            con.close()
+
+    def signal(self, ticker: str, now=None) -> dict:
+        """Skor saat ini (diluruhkan dari state tersimpan), label & flag berita HIGH negatif terbaru."""
+        now = now or time.time()
+        with self._lock, self._connect() as con:
+            score, as_of, n, last_ts, last_high_neg = self._state(con, ticker)
+        score = round(score * self._decay(now - as_of), 2) if as_of else 0.0
+        return self._result(score, n, last_ts, last_high_neg, now)
+
+    def signal_at(self, ticker: str, when) -> dict:
+        """
+        Sinyal point-in-time untuk replay historis: hanya event dengan ts <= `when`,
+        diluruhkan ke `when` (dihitung dari tabel events, state tidak disentuh).
+        """
+        when = when if isinstance(when, (int, float)) else epoch_seconds(when)
+        with self._lock, self._connect() as con:
+            rows = con.execute("SELECT ts, impact, sign FROM events WHERE ticker = ? AND ts <= ?",
+                               (ticker, when)).fetchall()
+        score = sum(sign * IMPACT_WEIGHT[impact] * self._decay(when - ts) for ts, impact, sign in rows)
+        last_ts = max((ts for ts, _, _ in rows), default=None)
+        last_high_neg = max((ts for ts, impact, sign in rows if impact == "HIGH" and sign < 0), default=None)
+        return self._result(round(score, 2), len(rows), last_ts, last_high_neg, when)
+
+    def _result(self, score, n, last_ts, last_high_neg, now) -> dict:
+        if score >= self.threshold:
+            label = "POSITIF"
+        elif score <= -self.threshold:
+            label = "NEGATIF"
+        else:
+            label = "NETRAL"
+        return {
+            "score": score,
+            "label": label,
+            "events": n,
+            "last_ts": last_ts,
+            "high_negative": bool(last_high_neg and now - last_high_neg <= self.alert),
+        }
+
+    def events(self, ticker: str, limit=20) -> list[dict]:
+        with self._lock, self._connect() as con:
+            rows = con.execute(
+                "SELECT ts, category, impact, sign, title FROM events WHERE ticker = ? ORDER BY ts DESC LIMIT ?",
+                (ticker, limit),
+            ).fetchall()
+        return [dict(zip(["ts", "category", "impact", "sign", "title"], r)) for r in rows]
+
+
+_default_signals = None
+_default_lock = threading.Lock()
+
+
+def default_news_signals() -> NewsSignals:
+    global _default_signals
+    with _default_lock:
+        if _default_signals is None:
+            _default_signals = NewsSignals()
+        return _default_signals
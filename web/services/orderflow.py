@@ -1,46 +1,61 @@
 import pandas as pd
 import numpy as np
 
+def _cumsum_skipna(x: np.ndarray) -> np.ndarray:
+    """Sama dengan Series.cumsum (skipna): NaN tidak ikut dijumlah, posisinya tetap NaN. In-place."""
+    missing = np.isnan(x)
+    x[missing] = 0
+    np.cumsum(x, out=x)
+    x[missing] = np.nan
+    return x
+
 def obv(df: pd.DataFrame) -> pd.Series:
-    direction = np.sign(df["Close"].diff()).fillna(0)
-    return (direction * df["Volume"]).cumsum()
+    close = df["Close"].to_numpy(dtype="float64")
+    direction = np.zeros_like(close)
+    np.sign(close[1:] - close[:-1], out=direction[1:])
+    direction[np.isnan(direction)] = 0
+    direction *= df["Volume"].to_numpy(dtype="float64")
+    return pd.Series(_cumsum_skipna(direction), index=df.index)
 
 def adl(df: pd.DataFrame) -> pd.Series:
-    high, low, close, vol = df["High"], df["Low"], df["Close"], df["Volume"]
-    mfm = ((close - low) - (high - close)) / (high - low).replace(0, 1e-12)
-    mfv = mfm * vol
-    return mfv.cumsum()
+    high, low, close, vol = (df[k].to_numpy(dtype="float64") for k in ("High", "Low", "Close", "Volume"))
+    rng = high - low
+    rng[rng == 0] = 1e-12
+    mfv = ((close - low) - (high - close)) / rng
+    mfv *= vol
+    return pd.Series(_cumsum_skipna(mfv), index=df.index)
+
+def radar_label(obv_slope, adl_slope, vol_ratio, close_pos) -> str:
+    # simple label
+    if obv_slope > 0 and adl_slope > 0 and vol_ratio >= 1.5 and close_pos >= 0.6:
+        return "AKUMULASI"
+    if obv_slope < 0 and adl_slope < 0 and vol_ratio >= 1.5 and close_pos <= 0.4:
+        return "DISTRIBUSI"
+    return "NETRAL"
 
 def orderflow_radar(df: pd.DataFrame, lookback=20):
-    d = df.copy()
-    d["OBV"] = obv(d)
-    d["ADL"] = adl(d)
-    d["VOL_AVG20"] = d["Volume"].rolling(20).mean()
+    """df = output add_indicators (VOL_AVG20 dipakai ulang) atau OHLCV mentah; input tidak di-copy."""
+    obv_s = obv(df)
+    adl_s = adl(df)
+    vol_avg = df["VOL_AVG20"] if "VOL_AVG20" in df.columns else df["Volume"].rolling(20).mean()
 
-    recent = d.tail(lookback)
-    obv_slope = recent["OBV"].iloc[-1] - recent["OBV"].iloc[0]
-    adl_slope = recent["ADL"].iloc[-1] - recent["ADL"].iloc[0]
+    first = -min(lookback, len(df))
+    obv_slope = obv_s.iloc[-1] - obv_s.iloc[first]
+    adl_slope = adl_s.iloc[-1] - adl_s.iloc[first]
 
     # volume anomaly + candle strength
-    last = d.iloc[-1]
-    vol_ratio = float(last["Volume"]) / (float(last["VOL_AVG20"]) if float(last["VOL_AVG20"]) > 0 else 1.0)
-    rng = float(last["High"] - last["Low"]) if float(last["High"] - last["Low"]) != 0 else 1.0
-    close_pos = float((last["Close"] - last["Low"]) / rng)  # 0..1, >0.7 close near high
-
-    # simple label
-    if obv_slope > 0 and adl_slope > 0 and vol_ratio >= 1.5 and close_pos >= 0.6:
-        label = "AKUMULASI"
-    elif obv_slope < 0 and adl_slope < 0 and vol_ratio >= 1.5 and close_pos <= 0.4:
-        label = "DISTRIBUSI"
-    else:
-        label = "NETRAL"
+    vol_avg_last = float(vol_avg.iloc[-1])
+    high, low, close = (float(df[k].iloc[-1]) for k in ("High", "Low", "Close"))
+    vol_ratio = float(df["Volume"].iloc[-1]) / (vol_avg_last if vol_avg_last > 0 else 1.0)
+    rng = high - low if high - low != 0 else 1.0
+    close_pos = (close - low) / rng  # 0..1, >0.7 close near high
 
     return {
-        "label": label,
+        "label": radar_label(obv_slope, adl_slope, vol_ratio, close_pos),
         "vol_ratio": vol_ratio,
         "close_pos": close_pos,
         "obv_slope": obv_slope,
         "adl_slope": adl_slope,
-        "obv_series": d["OBV"],
-        "adl_series": d["ADL"],
+        "obv_series": obv_s,
+        "adl_series": adl_s,
     }
@@ -0,0 +1,16 @@
+# services/paths.py
+import os
+
+# folder web/
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def data_dir(*parts) -> str:
+    """
+    Folder data lokal (cache/store). Default: web/.stocklab/,
+    bisa dipindah lewat env STOCKLAB_DATA_DIR (mis. ke volume bersama antar worker).
+    """
+    root = os.getenv("STOCKLAB_DATA_DIR") or os.path.join(BASE_DIR, ".stocklab")
+    path = os.path.join(root, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,227 @@
+# services/pipeline.py
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from services.analysis import calc_risk_snapshot, fundamental_inputs, valuation_summary
+from services.data import cached_info, get_info
+from services.financials import key_financial_tables
+from services.fundamental_score import fundamental_score
+from services.info_snapshot import default_snapshot
+from services.news_signal import default_news_signals
+from services.orderflow import orderflow_radar
+from services.risk import risk_flags
+from services.statements import default_statement_store
+from services.store import default_store
+from services.technical import add_indicators, multi_timeframe_plan, technical_plan
+from services.verdict_engine import final_verdict
+
+SOURCES = ("ohlcv", "info", "financials", "news_signal")
+
+
+def fingerprint(obj) -> str:
+    """Hash isi (bukan identitas) input sumber: DataFrame, Series, dict, skalar."""
+    h = hashlib.sha1()
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        h.update(type(obj).__name__.encode())
+        if isinstance(obj, pd.DataFrame):
+            h.update(json.dumps([str(c) for c in obj.columns]).encode())
+        h.update(str(obj.shape).encode())
+        if len(obj):
+            h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, dict):
+        for k in sorted(obj, key=str):
+            h.update(str(k).encode())
+            h.update(fingerprint(obj[k]).encode())
+    else:
+        h.update(json.dumps(obj, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+class Stage:
+    """Satu node DAG: func(*hasil_deps, **params)."""
+
+    def __init__(self, name, func, deps=(), params=()):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.params = tuple(params)
+
+
+class Pipeline:
+    """
+    DAG analisis headless. Key cache tiap stage = hash(nama, key deps, nilai params),
+    jadi kalau hanya `target_pe` berubah, yang dihitung ulang cuma valuation -> verdict.
+    Dipakai bersama oleh Streamlit, CLI, dan skrip/test.
+    """
+
+    def __init__(self, stages, cache_size=256):
+        self.stages = OrderedDict((s.name, s) for s in stages)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _order(self, targets):
+        seen, order = set(), []
+
+        def visit(name):
+            if name in seen:
+                return
+            seen.add(name)
+            for d in self.stages[name].deps:
+                if d not in SOURCES:
+                    visit(d)
+            order.append(name)
+
+        for t in targets:
+            visit(t)
+        return order
+
+    def _get(self, key):
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return True, self._cache[key]
+            self.misses += 1
+            return False, None
+
+    def _put(self, key, value):
+        with self._lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def run(self, inputs: dict, params: dict = None, targets=None) -> dict:
+        """
+        inputs: {"ohlcv": df, "info": dict, "financials": ...}
+        params: nilai parameter stage (rr, target_pe, ...)
+        Output: {nama_stage: hasil, ..., "_timings": {stage: detik}, "_cached": [stage, ...]}
+        """
+        params = params or {}
+        keys = {s: fingerprint(inputs.get(s)) for s in SOURCES}
+        results = {s: inputs.get(s) for s in SOURCES}
+        timings, cached = {}, []
+
+        for name in self._order(targets or list(self.stages)):
+            stage = self.stages[name]
+            pvals = {p: params[p] for p in stage.params if p in params}
+            key = hashlib.sha1(
+                json.dumps([name, [keys[d] for d in stage.deps], pvals], sort_keys=True, default=str).encode()
+            ).hexdigest()
+            keys[name] = key
+
+            hit, value = self._get(key)
+            if hit:
+                cached.append(name)
+                timings[name] = 0.0
+            else:
+                t0 = time.perf_counter()
+                value = stage.func(*(results[d] for d in stage.deps), **pvals)
+                timings[name] = time.perf_counter() - t0
+                self._put(key, value)
+            results[name] = value
+
+        results["_timings"] = timings
+        results["_cached"] = cached
+        return results
+
+
+# =========================
+# STAGE ANALISIS STOCKLAB
+# =========================
+def _fundamentals(info, tables):
+    inputs = fundamental_inputs(info, tables)
+    return {"inputs": inputs, **fundamental_score(inputs)}
+
+
+def _valuation(df, info, target_pe=12.0, target_pbv=2.0):
+    last_price = float(df["Close"].iloc[-1])
+    return {"last_price": last_price, **valuation_summary(last_price, info, target_pe, target_pbv)}
+
+
+def _position(plan, capital=50_000_000, risk_pct=1.0):
+    if "entry" not in plan:
+        return None
+    return calc_risk_snapshot(capital, plan["entry"], plan["stop"], plan["tp"], risk_pct=risk_pct)
+
+
+def _verdict(fund, val, plan, rad, news_signal=None):
+    return final_verdict(
+        fundamental_score=fund["score"],
+        valuation_label=val["label"],
+        technical_ok=plan["setup_ok"],
+        bandarmologi_label=rad["label"],
+        news_signal=news_signal,
+    )
+
+
+def build_pipeline(cache_size=256) -> Pipeline:
+    return Pipeline([
+        Stage("indicators", add_indicators, deps=["ohlcv"]),
+        Stage("plan", technical_plan, deps=["indicators"],
+              params=["rr", "pullback_pct", "atr_mult", "rsi_up", "rsi_side", "vol_min"]),
+        Stage("mtf", multi_timeframe_plan, deps=["ohlcv"],
+              params=["rr", "pullback_pct", "atr_mult", "rsi_up", "rsi_side", "vol_min"]),
+        Stage("radar", orderflow_radar, deps=["indicators"], params=["lookback"]),
+        Stage("tables", key_financial_tables, deps=["financials"]),
+        Stage("fundamentals", _fundamentals, deps=["info", "tables"]),
+        Stage("risks", risk_flags, deps=["info", "tables"]),
+        Stage("valuation", _valuation, deps=["indicators", "info"], params=["target_pe", "target_pbv"]),
+        Stage("position", _position, deps=["plan"], params=["capital", "risk_pct"]),
+        Stage("verdict", _verdict, deps=["fundamentals", "valuation", "plan", "radar", "news_signal"]),
+    ], cache_size=cache_size)
+
+
+def local_info(ticker: str) -> dict:
+    """Info tanpa jaringan: snapshot on-disk, lalu cache data (boleh kadaluarsa); {} kalau dua-duanya kosong."""
+    return default_snapshot().get(ticker) or cached_info(ticker)
+
+
+def load_sources(ticker: str, period="2y", refresh=True) -> dict:
+    """
+    Sumber data headless (tanpa Streamlit): PriceStore, info Yahoo / snapshot, StatementStore,
+    sinyal berita yang sudah tercatat (tanpa fetch RSS).
+    `refresh=False` -> tanpa jaringan sama sekali, hanya data lokal.
+    """
+    info = get_info(ticker) if refresh else local_info(ticker)
+    return {
+        "ohlcv": default_store().get(ticker, period=period, refresh=refresh),
+        "info": info,
+        "financials": default_statement_store().load(ticker, refresh=refresh),
+        "news_signal": default_news_signals().signal(ticker),
+    }
+
+
+_default_pipeline = None
+_default_lock = threading.Lock()
+
+
+def default_pipeline() -> Pipeline:
+    global _default_pipeline
+    with _default_lock:
+        if _default_pipeline is None:
+            _default_pipeline = build_pipeline()
+        return _default_pipeline
+
+
+def analyze(ticker: str, period="2y", params=None, refresh=True, pipeline=None, as_of=None) -> dict:
+    """
+    Satu panggilan = seluruh analisis dashboard untuk satu ticker.
+    `as_of`: rekonstruksi per tanggal lampau (services.asof); slice di-hash per isi, jadi tanggal
+    dengan slice yang sama diambil dari cache stage.
+    """
+    pipeline = pipeline or default_pipeline()
+    sources = load_sources(ticker, period=period, refresh=refresh)
+    if as_of is not None:
+        from services.asof import sources_as_of  # lazy: asof mengimpor pipeline
+
+        sources = sources_as_of(sources, as_of, ticker, default_news_signals())
+    return pipeline.run(sources, params=params)
@@ -0,0 +1,249 @@
+# services/prefetch.py
+import heapq
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from services.cache import default_cache
+from services.data import get_info, get_ohlcv, ohlcv_key
+from services.info_snapshot import default_snapshot
+from services.intraday import IDX_TZ, SESSIONS
+from services.news import default_feed_cache, feed_url, google_news_rss, ticker_query
+from services.news_signal import default_news_signals
+from services.ratelimit import RateLimiter
+from services.statements import default_statement_store
+
+# margin sebelum pre-opening / sesudah penutupan yang masih dianggap jam bursa
+MARKET_MARGIN = pd.Timedelta(minutes=30)
+
+# job di-refresh sebelum entry cache kadaluarsa (fraksi TTL), supaya halaman tidak pernah dapat entry basi
+REFRESH_FRACTION = 0.8
+
+# bagian budget yang direncanakan untuk putaran rutin seluruh watchlist; sisanya untuk ticker hot/recent
+# (interval normal), job berat & refresh snapshot cadangan
+BUDGET_SHARE = 0.8
+
+
+def off_hours(now=None) -> bool:
+    """True di luar jam bursa BEI (malam, akhir pekan) -> waktu untuk job berat."""
+    now = pd.Timestamp(now) if now is not None else pd.Timestamp.now(tz=IDX_TZ)
+    now = now.tz_localize(IDX_TZ) if now.tz is None else now.tz_convert(IDX_TZ)
+    sessions = SESSIONS.get(now.weekday())
+    if not sessions:
+        return True
+    day = now.normalize()
+    opens = day + pd.Timedelta(sessions[0][0] + ":00") - MARKET_MARGIN
+    closes = day + pd.Timedelta(sessions[-1][1] + ":00") + MARKET_MARGIN
+    return not (opens <= now <= closes)
+
+
+def default_jobs(period="2y", news_items=10) -> dict:
+    """
+    Job warm-up per ticker, key = sumber. `every` = interval refresh (detik), `cost` = token rate budget,
+    `heavy` = hanya dijalankan di luar jam bursa.
+    Parameter harus sama dengan yang dipakai halaman utama supaya key cache-nya sama.
+    Job memaksa fetch ulang (refresh / force) tiap REFRESH_FRACTION x TTL cache-nya: kalau lewat get_*
+    biasa, entry yang belum kadaluarsa dikembalikan apa adanya dan refresh baru terjadi tiap 2x TTL.
+    """
+    cache = default_cache()
+
+    def info(ticker):
+        # satu fetch (lewat cache + coordinator) untuk halaman & snapshot peer; snapshot ditulis kalau stale
+        data = get_info(ticker, refresh=True)
+        snapshot = default_snapshot()
+        if data and snapshot.stale([ticker]):
+            snapshot.update(ticker, data)
+
+    def news(ticker):
+        items = google_news_rss(ticker_query(ticker), max_items=news_items, force=True)
+        default_news_signals().update(ticker, items)
+
+    return OrderedDict([
+        ("ohlcv", {"run": lambda t: get_ohlcv(t, period=period, refresh=True),
+                   "every": REFRESH_FRACTION * cache.ttl("ohlcv"), "cost": 1, "heavy": False}),
+        ("info", {"run": info, "every": REFRESH_FRACTION * cache.ttl("info"), "cost": 1, "heavy": False}),
+        ("news", {"run": news, "every": REFRESH_FRACTION * default_feed_cache().ttl, "cost": 1, "heavy": False}),
+        # 5 call Yahoo per ticker; StatementStore sendiri hanya fetch kalau periode baru seharusnya terbit
+        ("statements", {"run": lambda t: default_statement_store().refresh(t), "every": 24 * 3600, "cost": 5,
+                        "heavy": True}),
+    ])
+
+
+def staleness(ticker: str, period="2y") -> dict:
+    """Umur data (detik) per sumber yang dipakai halaman untuk `ticker`; None = belum pernah di-fetch."""
+    cache = default_cache()
+    feed_meta = default_feed_cache().get(feed_url(ticker_query(ticker)))[1]
+    checked = default_statement_store().meta(ticker).get("checked_at")
+    now = time.time()
+    return {
+        "ohlcv": cache.age("ohlcv", ohlcv_key(ticker, period)),
+        "info": cache.age("info", ticker),
+        "news": now - feed_meta["fetched_at"] if feed_meta.get("fetched_at") else None,
+        "statements": now - checked if checked else None,
+    }
+
+
+class Prefetcher:
+    """
+    Scheduler background yang menjaga cache watchlist tetap hangat.
+    Tiap (ticker, job) punya deadline = run terakhir + interval; yang paling lewat deadline jalan duluan
+    (heap), jadi budget yang kurang membuat semua ticker di-refresh lebih jarang secara merata, bukan
+    ticker di awal watchlist terus-menerus dan sisanya tidak pernah:
+    0. ticker yang sedang dibuka / berikutnya di selectbox (touch / hint_next, `hot_ttl` detik) selalu duluan
+    1. ticker hot & yang baru dilihat memakai interval `every` job apa adanya
+    2. sisa watchlist memakai `every` x stretch(): diperlebar supaya kebutuhan token seluruh watchlist
+       muat di BUDGET_SHARE dari rate budget
+    Job `heavy` (laporan keuangan) hanya di luar jam bursa; semua job memotong token dari satu
+    RateLimiter global, putaran berhenti kalau budget habis.
+    """
+
+    def __init__(self, tickers, jobs=None, limiter=None, workers=4, hot_ttl=300, recent_size=20,
+                 clock=time.time, is_off_hours=None):
+        self.tickers = list(dict.fromkeys(tickers))
+        self.jobs = jobs or default_jobs()
+        self.limiter = limiter or RateLimiter(float(os.getenv("STOCKLAB_PREFETCH_PER_MIN", "60")), per=60)
+        self.workers = workers
+        self.hot_ttl = hot_ttl
+        self.recent_size = recent_size
+        self.clock = clock
+        self.is_off_hours = is_off_hours or off_hours
+        self._hot = {}                # ticker -> waktu touch/hint
+        self._recent = OrderedDict()  # ticker -> waktu dilihat (terbaru di akhir)
+        self._status = {}             # (ticker, job) -> {"at", "ok", "error", "secs"}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.counts = {"done": 0, "errors": 0, "budget_stops": 0, "deferred_heavy": 0}
+
+    # ---------- sinyal dari UI ----------
+    def touch(self, ticker: str):
+        """Ticker dibuka di halaman: prioritas tertinggi + masuk daftar recent."""
+        now = self.clock()
+        with self._lock:
+            self._hot[ticker] = now
+            self._recent.pop(ticker, None)
+            self._recent[ticker] = now
+            while len(self._recent) > self.recent_size:
+                self._recent.popitem(last=False)
+        self._wake.set()
+
+    def hint_next(self, ticker: str):
+        """Ticker yang kemungkinan dibuka berikutnya (item selectbox setelah yang aktif)."""
+        with self._lock:
+            self._hot[ticker] = self.clock()
+        self._wake.set()
+
+    # ---------- penjadwalan ----------
+    def order(self) -> list:
+        now = self.clock()
+        with self._lock:
+            hot = sorted((t for t, ts in self._hot.items() if now - ts < self.hot_ttl),
+                         key=lambda t: -self._hot[t])
+            recent = list(reversed(self._recent))
+        seen, out = set(), []
+        for t in hot + recent + self.tickers:
+            if t not in seen:
+                seen.add(t)
+                out.append(t)
+        return out
+
+    def stretch(self) -> float:
+        """Pengali interval untuk ticker di luar hot/recent (>= 1) supaya seluruh watchlist muat di budget."""
+        need = len(self.tickers) * sum(j["cost"] / j["every"] for j in self.jobs.values() if not j["heavy"])
+        have = self.limiter.rate * BUDGET_SHARE  # token per detik
+        return max(1.0, need / have) if have > 0 else 1.0
+
+    def due(self) -> list:
+        """[(ticker, job)] yang lewat deadline: ticker hot duluan, lalu yang paling lama lewat deadline."""
+        now = self.clock()
+        with self._lock:
+            status = dict(self._status)
+            hot = {t for t, ts in self._hot.items() if now - ts < self.hot_ttl}
+            recent = set(self._recent)
+        stretch = self.stretch()
+        heap = []
+        for pos, t in enumerate(self.order()):
+            scale = 1.0 if t in hot or t in recent else stretch
+            for name, job in self.jobs.items():
+                last = status.get((t, name))
+                deadline = last["at"] + job["every"] * scale if last else float("-inf")
+                if deadline <= now:
+                    heap.append((t not in hot, deadline, pos, t, name))
+        heapq.heapify(heap)
+        return [heapq.heappop(heap)[3:] for _ in range(len(heap))]
+
+    def _run_job(self, ticker, name):
+        t0 = self.clock()
+        try:
+            self.jobs[name]["run"](ticker)
+            st = {"at": t0, "ok": True, "error": None}
+        except Exception as e:
+            st = {"at": t0, "ok": False, "error": f"{type(e).__name__}: {e}"}
+        st["secs"] = self.clock() - t0
+        with self._lock:
+            self._status[(ticker, name)] = st
+            self.counts["done" if st["ok"] else "errors"] += 1
+        return st
+
+    def run_once(self, max_jobs=None) -> int:
+        """Satu putaran: ambil job due sesuai prioritas selama budget cukup. Output: jumlah job dijalankan."""
+        off = self.is_off_hours()
+        picked, deferred = [], 0
+        for t, name in self.due():
+            if max_jobs is not None and len(picked) >= max_jobs:
+                break
+            job = self.jobs[name]
+            if job["heavy"] and not off:
+                deferred += 1
+                continue
+            if not self.limiter.try_acquire(job["cost"]):
+                self.counts["budget_stops"] += 1
+                break
+            picked.append((t, name))
+        self.counts["deferred_heavy"] = deferred  # putaran terakhir
+
+        if not picked:
+            return 0
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as ex:
+            list(ex.map(lambda tn: self._run_job(*tn), picked))
+        return len(picked)
+
+    def start(self, every=30):
+        """
+        Thread daemon. Putaran kecil (workers * 4 job) berturut-turut selama masih ada job due
+        dan budget, supaya touch/hint_next cepat masuk antrean; kalau tidak ada kerja, tidur `every`
+        detik atau sampai touch/hint_next berikutnya.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return self._thread
+
+        def loop():
+            while not self._stop.is_set():
+                if not self.run_once(max_jobs=self.workers * 4):
+                    self._wake.wait(every)
+                    self._wake.clear()
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=loop, name="prefetch", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    # ---------- status ----------
+    def status(self, ticker: str) -> dict:
+        with self._lock:
+            return {name: self._status.get((ticker, name)) for name in self.jobs}
+
+    def summary(self) -> dict:
+        with self._lock:
+            warm = {t for (t, _), st in self._status.items() if st["ok"]}
+            return {**self.counts, "warm_tickers": len(warm), "tickers": len(self.tickers),
+                    "budget_left": self.limiter.available(), "stretch": self.stretch()}
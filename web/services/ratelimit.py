@@ -0,0 +1,54 @@
+# services/ratelimit.py
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Token bucket thread-safe: rata-rata `rate` request per `per` detik, burst maks `burst`.
+    Dipakai bersama oleh semua thread yang memanggil API yang sama (Gemini, Yahoo, ...).
+    """
+
+    def __init__(self, rate: float, per: float = 60.0, burst=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate / per  # token per detik
+        self.capacity = float(burst if burst is not None else max(1, rate))
+        self._tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1, timeout=None) -> bool:
+        """Tunggu sampai token tersedia. False kalau `timeout` (detik) habis duluan."""
+        deadline = None if timeout is None else self._clock() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+            if deadline is not None:
+                left = deadline - self._clock()
+                if left <= 0:
+                    return False
+                wait = min(wait, left)
+            self._sleep(wait)
+
+    def available(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
@@ -1,6 +1,7 @@
 # services/relative.py
 import pandas as pd
 import numpy as np
+from bisect import bisect_left, bisect_right, insort
 
 def build_peer_table(target_ticker: str, peer_infos: dict) -> pd.DataFrame:
     """
@@ -55,3 +56,154 @@ def label_relative(value, median, band=0.15):
     if value > median * (1 + band):
         return "MAHAL"
     return "FAIR"
+
+
+# =========================
+# AGREGAT PER SEKTOR / INDUSTRI (incremental)
+# =========================
+PEER_METRICS = ["PE", "PBV", "ROE%", "MCap"]
+
+
+def peer_metrics(info: dict) -> dict:
+    """Nilai metric satu ticker, konversi sama dengan build_peer_table."""
+    vals = {
+        "PE": info.get("trailingPE"),
+        "PBV": info.get("priceToBook"),
+        "ROE%": (info.get("returnOnEquity") or np.nan) * 100,
+        "MCap": info.get("marketCap"),
+    }
+    out = {}
+    for k, v in vals.items():
+        try:
+            v = float(v)
+        except (TypeError, ValueError):
+            v = np.nan
+        out[k] = v
+    return out
+
+
+def _quantile(xs, q):
+    # interpolasi linear, sama dengan pandas/numpy default
+    pos = q * (len(xs) - 1)
+    lo = int(pos)
+    hi = min(lo + 1, len(xs) - 1)
+    return xs[lo] + (xs[hi] - xs[lo]) * (pos - lo)
+
+
+def _median(xs):
+    n = len(xs)
+    mid = n // 2
+    return xs[mid] if n % 2 else (xs[mid - 1] + xs[mid]) / 2
+
+
+def percentile_rank(value, sorted_values) -> float:
+    """Persentil (0-100) value di dalam peer; nilai sama dihitung setengah."""
+    if value is None or not sorted_values:
+        return None
+    lo = bisect_left(sorted_values, value)
+    hi = bisect_right(sorted_values, value)
+    return (lo + hi) / 2 / len(sorted_values) * 100
+
+
+class PeerIndex:
+    """
+    Index agregat peer per sektor & industri: count, median, Q1, Q3 untuk PE/PBV/ROE%/MCap.
+
+    - nilai per grup disimpan terurut -> update satu ticker = hapus + insort (bisect)
+    - statistik grup yang berubah dihitung ulang langsung, lookup = dict O(1)
+    - percentile rank = bisect O(log n) di list terurut
+    """
+
+    def __init__(self):
+        self._rows = {}    # ticker -> (sector, industry, metrics)
+        self._values = {}  # (level, group, metric) -> list terurut
+        self._stats = {}   # (level, group) -> {metric: {...}}
+
+    @classmethod
+    def from_infos(cls, peer_infos: dict) -> "PeerIndex":
+        idx = cls()
+        for tkr, info in peer_infos.items():
+            idx.upsert(tkr, info)
+        return idx
+
+    def _groups(self, sector, industry):
+        out = []
+        if sector:
+            out.append(("sector", sector))
+        if industry:
+            out.append(("industry", industry))
+        return out
+
+    def _touch(self, ticker, metrics, groups, add: bool):
+        for g in groups:
+            for m, v in metrics.items():
+                if np.isnan(v):
+                    continue
+                xs = self._values.setdefault((*g, m), [])
+                if add:
+                    insort(xs, v)
+                else:
+                    i = bisect_left(xs, v)
+                    if i < len(xs) and xs[i] == v:
+                        xs.pop(i)
+
+    def _recompute(self, groups):
+        for g in groups:
+            st = {}
+            for m in PEER_METRICS:
+                xs = self._values.get((*g, m), [])
+                st[m] = {
+                    "count": len(xs),
+                    "median": _median(xs) if xs else None,
+                    "q25": _quantile(xs, 0.25) if xs else None,
+                    "q75": _quantile(xs, 0.75) if xs else None,
+                }
+            self._stats[g] = st
+
+    def upsert(self, ticker: str, info: dict):
+        metrics = peer_metrics(info)
+        # baris yang benar2 kosong tidak ikut (sama dengan build_peer_table)
+        if all(np.isnan(metrics[m]) for m in ("PE", "PBV", "ROE%")):
+            self.remove(ticker)
+            return
+        old_groups = self.remove(ticker, recompute=False)
+        groups = self._groups(info.get("sector"), info.get("industry"))
+        self._rows[ticker] = (info.get("sector"), info.get("industry"), metrics)
+        self._touch(ticker, metrics, groups, add=True)
+        self._recompute(set(old_groups) | set(groups))
+
+    def remove(self, ticker: str, recompute=True):
+        row = self._rows.pop(ticker, None)
+        if row is None:
+            return []
+        sector, industry, metrics = row
+        groups = self._groups(sector, industry)
+        self._touch(ticker, metrics, groups, add=False)
+        if recompute:
+            self._recompute(groups)
+        return groups
+
+    # ---------- lookup ----------
+    def _key(self, sector=None, industry=None):
+        return ("industry", industry) if industry else ("sector", sector)
+
+    def stats(self, sector=None, industry=None) -> dict:
+        return self._stats.get(self._key(sector, industry), {})
+
+    def values(self, metric: str, sector=None, industry=None) -> list:
+        return self._values.get((*self._key(sector, industry), metric), [])
+
+    def snapshot(self, target_info: dict, sector=None, industry=None) -> dict:
+        """Format sama dengan calc_relative_snapshot, plus count & percentile rank."""
+        st = self.stats(sector=sector, industry=industry)
+        t = peer_metrics(target_info)
+        target = {m: (None if np.isnan(t[m]) else t[m]) for m in ("PE", "PBV", "ROE%")}
+        return {
+            "target": target,
+            "median": {m: st.get(m, {}).get("median") for m in ("PE", "PBV", "ROE%")},
+            "count": {m: st.get(m, {}).get("count", 0) for m in ("PE", "PBV", "ROE%")},
+            "pct_rank": {
+                m: percentile_rank(target[m], self.values(m, sector=sector, industry=industry))
+                for m in ("PE", "PBV", "ROE%")
+            },
+        }
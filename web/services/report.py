@@ -0,0 +1,185 @@
+# services/report.py
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from services.pipeline import default_pipeline, fingerprint, load_sources
+from services.screener import MIN_BARS, rank_screen, screen_row
+
+FORMATS = ("parquet", "csv", "json")
+CHECKPOINT = "checkpoint.jsonl"
+
+
+def _json_default(o):
+    if isinstance(o, np.generic):
+        return o.item()
+    return str(o)
+
+
+def report_one(ticker: str, params: dict, period="2y", refresh=True, prev_key=None) -> dict:
+    """
+    Analisis satu ticker untuk laporan batch.
+    Output: {"ticker", "key", "row", "timings", "skipped"}.
+    `key` = fingerprint sumber data + params; kalau sama dengan `prev_key`, pipeline tidak dijalankan.
+    """
+    out = {"ticker": ticker, "key": None, "row": None, "timings": {}, "skipped": False}
+    row = {"Ticker": ticker, "Error": None}
+    try:
+        t0 = time.perf_counter()
+        sources = load_sources(ticker, period=period, refresh=refresh)
+        out["timings"]["load"] = time.perf_counter() - t0
+
+        df_raw = sources["ohlcv"]
+        if df_raw.empty or len(df_raw) < MIN_BARS:
+            row["Error"] = f"OHLCV kurang ({len(df_raw)} bar)"
+            out["row"] = row
+            return out
+
+        # skor berita diluruhkan ke jam sekarang -> berubah tiap run; yang dipakai verdict hanya label & flag
+        news = sources.get("news_signal") or {}
+        keyed = {**sources, "news_signal": {"label": news.get("label"), "high_negative": news.get("high_negative")}}
+        out["key"] = fingerprint({"sources": keyed, "params": params})
+        if prev_key is not None and out["key"] == prev_key:
+            out["skipped"] = True
+            return out
+
+        res = default_pipeline().run(sources, params)
+        out["timings"].update(res["_timings"])
+        row.update(screen_row(res))
+        row["Reasons"] = "; ".join(res["verdict"]["reasons"])
+        row["Risks"] = "; ".join(res["risks"])
+        pos = res["position"]
+        row["Position (lembar)"] = pos["position_size"] if pos else None
+    except Exception as e:
+        row["Error"] = f"{type(e).__name__}: {e}"
+        out["key"] = None  # error tidak di-checkpoint -> dicoba lagi run berikutnya
+    out["row"] = row
+    return out
+
+
+def load_checkpoint(out_dir: str) -> dict:
+    """{ticker: {"key", "row"}}; baris terakhir per ticker yang menang, baris rusak (crash) diabaikan."""
+    path = os.path.join(out_dir, CHECKPOINT)
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path) as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            done[rec["ticker"]] = {"key": rec["key"], "row": rec["row"]}
+    return done
+
+
+def _compact_checkpoint(out_dir: str, done: dict):
+    path = os.path.join(out_dir, CHECKPOINT)
+    with open(path + ".tmp", "w") as f:
+        for t, rec in done.items():
+            f.write(json.dumps({"ticker": t, **rec}, default=_json_default) + "\n")
+    os.replace(path + ".tmp", path)
+
+
+def timing_summary(timings: list[dict]) -> pd.DataFrame:
+    """list {stage: detik} per ticker -> total / rata2 / p95 / max per stage."""
+    rows = [(stage, sec) for t in timings for stage, sec in t.items()]
+    if not rows:
+        return pd.DataFrame(columns=["stage", "n", "total_s", "mean_ms", "p95_ms", "max_ms"])
+    df = pd.DataFrame(rows, columns=["stage", "sec"])
+    g = df.groupby("stage", sort=False)["sec"]
+    out = pd.DataFrame({
+        "n": g.size(),
+        "total_s": g.sum(),
+        "mean_ms": g.mean() * 1000,
+        "p95_ms": g.quantile(0.95) * 1000,
+        "max_ms": g.max() * 1000,
+    })
+    return out.sort_values("total_s", ascending=False).reset_index()
+
+
+def write_report(df: pd.DataFrame, out_dir: str, formats=FORMATS, name="report") -> list[str]:
+    paths = []
+    for fmt in formats:
+        if fmt not in FORMATS:
+            raise ValueError(f"format tidak dikenal: {fmt} (pilih {', '.join(FORMATS)})")
+        path = os.path.join(out_dir, f"{name}.{fmt}")
+        if fmt == "parquet":
+            df.to_parquet(path + ".tmp")
+        elif fmt == "csv":
+            df.to_csv(path + ".tmp", index=False)
+        else:
+            df.to_json(path + ".tmp", orient="records", indent=2, force_ascii=False)
+        os.replace(path + ".tmp", path)
+        paths.append(path)
+    return paths
+
+
+def run_report(tickers, out_dir: str, params=None, period="2y", refresh=True, formats=FORMATS,
+               max_workers=None, resume=True, on_progress=None) -> dict:
+    """
+    Laporan verdict seluruh ticker -> out_dir/report.{parquet,csv,json} + timings.csv.
+    Setiap ticker yang selesai langsung di-append ke checkpoint.jsonl, jadi run yang terputus
+    bisa dilanjutkan. Ticker yang data & params-nya tidak berubah sejak run terakhir
+    (fingerprint sama) memakai baris checkpoint tanpa menjalankan pipeline.
+    Output: {"report", "timings", "computed", "skipped", "errors", "elapsed", "paths"}
+    """
+    params = params or {}
+    tickers = list(dict.fromkeys(tickers))
+    os.makedirs(out_dir, exist_ok=True)
+    done = load_checkpoint(out_dir) if resume else {}
+    max_workers = max_workers or os.cpu_count() or 1
+
+    t0 = time.perf_counter()
+    results, timings = {}, []
+    ckpt = open(os.path.join(out_dir, CHECKPOINT), "a" if resume else "w")
+    try:
+        def collect(i, res):
+            t = res["ticker"]
+            if res["skipped"]:
+                res["row"] = done[t]["row"]
+            else:
+                timings.append(res["timings"])
+                if res["key"] is not None:
+                    done[t] = {"key": res["key"], "row": res["row"]}
+                    ckpt.write(json.dumps({"ticker": t, **done[t]}, default=_json_default) + "\n")
+                    ckpt.flush()
+            results[t] = res
+            if on_progress:
+                on_progress(i, len(tickers), t)
+
+        def kwargs(t):
+            return dict(params=params, period=period, refresh=refresh, prev_key=done.get(t, {}).get("key"))
+
+        if max_workers == 1:
+            for i, t in enumerate(tickers, start=1):
+                collect(i, report_one(t, **kwargs(t)))
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as ex:
+                futures = [ex.submit(report_one, t, **kwargs(t)) for t in tickers]
+                for i, fut in enumerate(as_completed(futures), start=1):
+                    collect(i, fut.result())
+    finally:
+        ckpt.close()
+
+    _compact_checkpoint(out_dir, done)
+
+    report = rank_screen(pd.DataFrame([results[t]["row"] for t in tickers]))
+    timing = timing_summary(timings)
+    paths = write_report(report, out_dir, formats)
+    timing.to_csv(os.path.join(out_dir, "timings.csv"), index=False)
+
+    errors = {t: r["row"]["Error"] for t, r in results.items() if r["row"].get("Error")}
+    return {
+        "report": report,
+        "timings": timing,
+        "computed": sum(1 for r in results.values() if not r["skipped"]),
+        "skipped": sum(1 for r in results.values() if r["skipped"]),
+        "errors": errors,
+        "elapsed": time.perf_counter() - t0,
+        "paths": paths,
+    }
@@ -0,0 +1,144 @@
+# services/screener.py
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from services.data import get_info
+from services.info_snapshot import default_snapshot
+from services.news_signal import default_news_signals
+from services.pipeline import default_pipeline, local_info
+from services.statements import default_statement_store
+from services.store import default_store
+
+# urutan ranking verdict (kecil = lebih atas)
+VERDICT_RANK = {
+    "BUY": 0,
+    "BUY (Speculative)": 1,
+    "HOLD": 2,
+    "HOLD / REDUCE": 3,
+    "SELL / AVOID": 4,
+}
+
+MIN_BARS = 60
+
+
+def screen_one(ticker: str, period="2y", rr=2.0, target_pe=12.0, target_pbv=2.0,
+               fundamentals=True, refresh=False) -> dict:
+    """
+    Jalankan pipeline analisis (services.pipeline) untuk satu ticker, output satu baris tabel screener.
+    OHLCV dari PriceStore lokal (refresh=False -> tanpa jaringan sama sekali).
+    Error tidak di-raise, tapi dicatat di kolom "Error".
+    """
+    row = {"Ticker": ticker, "Error": None}
+    try:
+        df_raw = default_store().get(ticker, period=period, refresh=refresh)
+        if df_raw.empty or len(df_raw) < MIN_BARS:
+            row["Error"] = f"OHLCV kurang ({len(df_raw)} bar)"
+            return row
+
+        params = {"rr": rr, "lookback": 20, "target_pe": target_pe, "target_pbv": target_pbv}
+        if not fundamentals:
+            res = default_pipeline().run({"ohlcv": df_raw}, params, targets=["plan", "radar"])
+        else:
+            # refresh=False -> info lokal saja (snapshot / cache), {} kalau belum ada
+            info = (default_snapshot().get(ticker) or get_info(ticker)) if refresh else local_info(ticker)
+            fin = default_statement_store().load(ticker, refresh=refresh)
+            news_sig = default_news_signals().signal(ticker)
+            res = default_pipeline().run({"ohlcv": df_raw, "info": info, "financials": fin,
+                                          "news_signal": news_sig}, params)
+
+        row.update(screen_row(res, fundamentals=fundamentals))
+    except Exception as e:
+        row["Error"] = f"{type(e).__name__}: {e}"
+    return row
+
+
+def screen_row(res: dict, fundamentals=True) -> dict:
+    """Hasil Pipeline.run -> kolom tabel screener (juga dipakai laporan CLI)."""
+    plan, rad = res["plan"], res["radar"]
+    row = {
+        "Close": float(res["ohlcv"]["Close"].iloc[-1]),
+        "Trend": plan.get("trend"),
+        "RSI14": plan.get("rsi14"),
+        "Vol Ratio": plan.get("vol_ratio"),
+        "Setup OK": plan["setup_ok"],
+        "Entry": plan.get("entry"),
+        "Stop": plan.get("stop"),
+        "TP": plan.get("tp"),
+        "Radar": rad["label"],
+    }
+    if not fundamentals:
+        return row
+
+    info, fund, val, final = res["info"], res["fundamentals"], res["valuation"], res["verdict"]
+    row.update({
+        "Name": info.get("longName") or info.get("shortName"),
+        "Sector": info.get("sector"),
+        "Industry": info.get("industry"),
+        "Score": fund["score"],
+        "Grade": fund["grade"],
+        "Valuation": val["label"],
+        "Fair Value": val["fair"],
+        "Discount %": val["discount_pct"],
+        "Verdict": final["verdict"],
+        "Confidence": final["confidence"],
+    })
+    return row
+
+
+def rank_screen(df: pd.DataFrame) -> pd.DataFrame:
+    if df.empty:
+        return df
+    d = df.copy()
+    for c in ["Verdict", "Score", "Setup OK", "Discount %"]:
+        if c not in d.columns:
+            d[c] = None
+    d["_rank"] = d["Verdict"].map(VERDICT_RANK).fillna(len(VERDICT_RANK))
+    d = d.sort_values(
+        by=["_rank", "Score", "Setup OK", "Discount %"],
+        ascending=[True, False, False, False],
+        na_position="last",
+    )
+    return d.drop(columns="_rank").reset_index(drop=True)
+
+
+def screen_universe(tickers, period="2y", rr=2.0, target_pe=12.0, target_pbv=2.0,
+                    fundamentals=True, refresh=False, max_workers=None, on_progress=None) -> pd.DataFrame:
+    """
+    Screener seluruh universe pakai process pool (indikator = CPU bound).
+    `on_progress(done, total, ticker)` dipanggil setiap ticker selesai.
+    Output: tabel ter-ranking (verdict -> score -> setup -> diskon).
+    """
+    tickers = list(dict.fromkeys(tickers))
+    kwargs = dict(period=period, rr=rr, target_pe=target_pe, target_pbv=target_pbv,
+                  fundamentals=fundamentals, refresh=refresh)
+    rows = []
+    max_workers = max_workers or os.cpu_count() or 1
+
+    if max_workers == 1:
+        for i, t in enumerate(tickers, start=1):
+            rows.append(screen_one(t, **kwargs))
+            if on_progress:
+                on_progress(i, len(tickers), t)
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as ex:
+            futures = {ex.submit(screen_one, t, **kwargs): t for t in tickers}
+            for i, fut in enumerate(as_completed(futures), start=1):
+                rows.append(fut.result())
+                if on_progress:
+                    on_progress(i, len(tickers), futures[fut])
+
+    return rank_screen(pd.DataFrame(rows))
+
+
+def filter_screen(df: pd.DataFrame, sectors=None, grades=None, verdicts=None) -> pd.DataFrame:
+    """Filter hasil screener; argumen kosong/None = tidak difilter."""
+    out = df
+    if sectors and "Sector" in out.columns:
+        out = out[out["Sector"].isin(sectors)]
+    if grades and "Grade" in out.columns:
+        out = out[out["Grade"].isin(grades)]
+    if verdicts and "Verdict" in out.columns:
+        out = out[out["Verdict"].isin(verdicts)]
+    return out
@@ -0,0 +1,157 @@
+# services/statements.py
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+from services.data import fetch_financials
+from services.financials import canonicalize
+from services.paths import data_dir
+
+# key dict get_financials -> (statement, freq)
+SOURCES = {
+    "income": ("income", "annual"),
+    "balance": ("balance", "annual"),
+    "cashflow": ("cashflow", "annual"),
+    "income_q": ("income", "quarterly"),
+    "cashflow_q": ("cashflow", "quarterly"),
+}
+
+LONG_COLUMNS = ["statement", "freq", "period_end", "metric", "value"]
+
+# batas waktu lapor IDX (kira2): tahunan 90 hari, kuartalan ~30-60 hari setelah tutup buku
+PERIOD_STEP = {"annual": pd.DateOffset(years=1), "quarterly": pd.DateOffset(months=3)}
+FILING_LAG = {"annual": pd.Timedelta(days=90), "quarterly": pd.Timedelta(days=60)}
+
+
+def to_long(fin_data: dict) -> pd.DataFrame:
+    """dict statement Yahoo (wide) -> frame long kanonik, satu baris per (statement, freq, period_end, metric)."""
+    parts = []
+    for key, (statement, freq) in SOURCES.items():
+        wide = fin_data.get(key)
+        if wide is None or wide.empty:
+            continue
+        wide = canonicalize(wide)
+        wide.columns = pd.to_datetime(wide.columns, errors="coerce")
+        wide = wide.loc[:, wide.columns.notna()]
+        long = wide.rename_axis(index="metric", columns="period_end").stack().rename("value").reset_index()
+        long["statement"] = statement
+        long["freq"] = freq
+        parts.append(long)
+
+    if not parts:
+        return pd.DataFrame(columns=LONG_COLUMNS)
+    out = pd.concat(parts, ignore_index=True)[LONG_COLUMNS]
+    out["value"] = pd.to_numeric(out["value"], errors="coerce")
+    return out.dropna(subset=["value"]).reset_index(drop=True)
+
+
+class StatementStore:
+    """
+    Store laporan keuangan ternormalisasi per ticker (Parquet long, key (period_end, statement, freq, metric)).
+    Yahoo hanya dipanggil ulang kalau periode laporan baru seharusnya sudah terbit
+    (periode terakhir + 1 tahun/kuartal + batas waktu lapor), dicek paling sering `recheck` detik.
+    """
+
+    def __init__(self, root=None, fetch=None, recheck=24 * 3600):
+        self.root = root or data_dir("statements")
+        self.fetch = fetch or fetch_financials
+        self.recheck = recheck
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _path(self, ticker):
+        return os.path.join(self.root, f"{ticker}.parquet")
+
+    def _meta_path(self, ticker):
+        return os.path.join(self.root, f"{ticker}.json")
+
+    def _lock(self, ticker):
+        with self._locks_guard:
+            return self._locks.setdefault(ticker, threading.Lock())
+
+    def read(self, ticker: str) -> pd.DataFrame:
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=LONG_COLUMNS)
+        return pd.read_parquet(path)
+
+    def meta(self, ticker: str) -> dict:
+        try:
+            with open(self._meta_path(ticker)) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write_meta(self, ticker, meta):
+        tmp = self._meta_path(ticker) + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._meta_path(ticker))
+
+    def next_expected(self, long: pd.DataFrame) -> pd.Timestamp:
+        """Tanggal paling awal laporan periode berikutnya diperkirakan sudah terbit."""
+        if long.empty:
+            return pd.Timestamp.min
+        out = []
+        for freq, g in long.groupby("freq"):
+            last = pd.Timestamp(g["period_end"].max())
+            out.append(last + PERIOD_STEP[freq] + FILING_LAG[freq])
+        return min(out)
+
+    def needs_refresh(self, ticker: str, now=None) -> bool:
+        now = pd.Timestamp(now or pd.Timestamp.now())
+        meta = self.meta(ticker)
+        if not meta:
+            return True
+        if time.time() - meta.get("checked_at", 0) < self.recheck:
+            return False
+        return now >= pd.Timestamp(meta.get("next_expected") or pd.Timestamp.min)
+
+    def refresh(self, ticker: str, force=False) -> dict:
+        """Output: {"status": "skip" | "same" | "new", "periods": n periode baru}"""
+        with self._lock(ticker):
+            if not force and not self.needs_refresh(ticker):
+                return {"status": "skip", "periods": 0}
+
+            old = self.read(ticker)
+            new = to_long(self.fetch(ticker))
+            key = ["statement", "freq", "period_end", "metric"]
+            merged = pd.concat([old, new], ignore_index=True).drop_duplicates(subset=key, keep="last")
+            merged = merged.sort_values(["statement", "freq", "period_end", "metric"]).reset_index(drop=True)
+
+            old_periods = set(old["period_end"]) if not old.empty else set()
+            added = len(set(new["period_end"]) - old_periods) if not new.empty else 0
+
+            if added or force or old.empty:
+                tmp = self._path(ticker) + ".tmp"
+                merged.to_parquet(tmp)
+                os.replace(tmp, self._path(ticker))
+
+            self._write_meta(ticker, {
+                "checked_at": time.time(),
+                "next_expected": str(self.next_expected(merged)) if not merged.empty else None,
+            })
+            return {"status": "new" if added else "same", "periods": added}
+
+    def load(self, ticker: str, refresh=True) -> pd.DataFrame:
+        if refresh:
+            try:
+                self.refresh(ticker)
+            except Exception:
+                pass  # Yahoo error -> pakai data lama yang ada
+        return self.read(ticker)
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def default_statement_store() -> StatementStore:
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = StatementStore()
+        return _default_store
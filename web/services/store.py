@@ -0,0 +1,192 @@
+# services/store.py
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from services.bulk import PERIOD_OFFSETS, slice_period, yahoo_backend
+from services.data import OHLCV_COLUMNS
+from services.paths import data_dir
+
+
+def _period_rank(period: str) -> pd.Timedelta:
+    if period == "max":
+        return pd.Timedelta.max
+    offset = PERIOD_OFFSETS.get(period)
+    if offset is None:
+        return pd.Timedelta(days=366)  # ytd & lainnya: anggap <= 1y
+    ref = pd.Timestamp("2000-01-01")
+    return (ref + offset) - ref
+
+
+class PriceStore:
+    """
+    Store OHLCV harian lokal (1 file Parquet per ticker) dengan refresh incremental.
+
+    - refresh pertama: download penuh `period` (minimal `base_period`)
+    - refresh berikutnya: hanya fetch bar sejak `overlap` bar terakhir, lalu append
+    - kalau bar overlap beda (split / re-adjust harga dari Yahoo) -> history ditulis ulang
+    - bar terakhir yang tersimpan dianggap sementara (bisa bar intraday yang belum close)
+    """
+
+    def __init__(self, root=None, backend=None, base_period="5y", overlap=5, rtol=1e-6, max_age=300):
+        self.root = root or data_dir("prices")
+        os.makedirs(self.root, exist_ok=True)
+        self.backend = backend or yahoo_backend
+        self.base_period = base_period
+        self.overlap = overlap
+        self.rtol = rtol
+        self.max_age = max_age  # detik; refresh dilewati kalau file masih segar
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self.errors = {}  # ticker -> error refresh terakhir (dihapus lagi setelah refresh sukses)
+
+    # ---------- file layout ----------
+    def _path(self, ticker: str) -> str:
+        return os.path.join(self.root, f"{ticker}.parquet")
+
+    def _meta_path(self, ticker: str) -> str:
+        return os.path.join(self.root, f"{ticker}.json")
+
+    def _lock(self, ticker: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(ticker, threading.Lock())
+
+    def load(self, ticker: str) -> pd.DataFrame:
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+        return pd.read_parquet(path)
+
+    def meta(self, ticker: str) -> dict:
+        try:
+            with open(self._meta_path(ticker)) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save(self, ticker: str, df: pd.DataFrame, period: str):
+        df = df[OHLCV_COLUMNS].astype("float64")
+        df.index = pd.DatetimeIndex(df.index, name="Date")
+        tmp = self._path(ticker) + ".tmp"
+        df.to_parquet(tmp)
+        os.replace(tmp, self._path(ticker))  # atomic, pembaca tidak lihat file setengah jadi
+        self._write_meta(ticker, period)
+
+    def _write_meta(self, ticker: str, period: str):
+        tmp = self._meta_path(ticker) + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"period": period, "refreshed_at": time.time()}, f)
+        os.replace(tmp, self._meta_path(ticker))
+
+    # ---------- refresh ----------
+    def _overlap_matches(self, stored: pd.DataFrame, fresh: pd.DataFrame) -> bool:
+        # bar terakhir tersimpan di-skip: bisa jadi bar hari ini yang belum final
+        common = stored.index[:-1].intersection(fresh.index)
+        if len(common) == 0:
+            return False
+        a = stored.loc[common, OHLCV_COLUMNS].to_numpy(dtype="float64")
+        b = fresh.loc[common, OHLCV_COLUMNS].to_numpy(dtype="float64")
+        return bool(np.allclose(a, b, rtol=self.rtol, atol=0, equal_nan=True))
+
+    def refresh(self, ticker: str, period=None, force=False, max_age=None) -> dict:
+        """
+        Output: {"status": "full" | "append" | "rewrite" | "fresh", "bars": n, "added": n}
+        Error dari backend di-raise (biar bulk bisa melaporkan).
+        `max_age` (detik) menggantikan self.max_age untuk panggilan ini (0 = selalu fetch incremental).
+        """
+        period = period or self.base_period
+        max_age = self.max_age if max_age is None else max_age
+        with self._lock(ticker):
+            stored = self.load(ticker)
+            meta = self.meta(ticker)
+            want = max(period, meta.get("period", period), self.base_period, key=_period_rank)
+
+            if not stored.empty and not force:
+                age = time.time() - meta.get("refreshed_at", 0)
+                covered = _period_rank(meta.get("period", self.base_period)) >= _period_rank(period)
+                if not covered:
+                    return self._full(ticker, want, "full")
+                if age < max_age:
+                    return {"status": "fresh", "bars": len(stored), "added": 0}
+
+            if stored.empty or force:
+                return self._full(ticker, want, "full")
+
+            start = stored.index[-min(self.overlap, len(stored))]
+            fresh = self.backend(ticker, period=period, interval="1d", start=start)
+            if fresh is None or fresh.empty:
+                # tidak ada bar baru (libur bursa) -> cukup perbarui timestamp
+                self._write_meta(ticker, want)
+                return {"status": "append", "bars": len(stored), "added": 0}
+
+            if len(stored) > 1 and not self._overlap_matches(stored, fresh):
+                return self._full(ticker, want, "rewrite")
+
+            # ganti bar terakhir (provisional) + tambah bar baru
+            keep = stored[stored.index < fresh.index[0]]
+            merged = pd.concat([keep, fresh[OHLCV_COLUMNS]])
+            merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+            self._save(ticker, merged, want)
+            return {"status": "append", "bars": len(merged), "added": len(merged) - len(stored)}
+
+    def _full(self, ticker: str, period: str, status: str) -> dict:
+        df = self.backend(ticker, period=period, interval="1d")
+        if df is None or df.empty:
+            raise ValueError(f"{ticker}: data kosong")
+        self._save(ticker, df, period)
+        return {"status": status, "bars": len(df), "added": len(df)}
+
+    def get(self, ticker: str, period="2y", refresh=True, max_age=None) -> pd.DataFrame:
+        """
+        History `period` dari file lokal, di-refresh dulu kalau `refresh`.
+        Refresh gagal (Yahoo down) tapi history lokal ada -> history itu yang dipakai, ditandai
+        `df.attrs["stale"]` + pesan di `self.errors`; error hanya di-raise kalau belum ada data lokal.
+        """
+        error = None
+        if refresh:
+            try:
+                self.refresh(ticker, period=period, max_age=max_age)
+                self.errors.pop(ticker, None)
+            except Exception as e:
+                self.errors[ticker] = f"{type(e).__name__}: {e}"
+                error = e
+        df = slice_period(self.load(ticker), period)
+        if error is not None:
+            if df.empty:
+                raise error
+            df.attrs["stale"] = True
+        return df
+
+    def refresh_many(self, tickers, period=None, max_workers=8, on_progress=None) -> dict:
+        """Refresh paralel. Output: {"status": {ticker: hasil refresh}, "errors": {ticker: pesan}}"""
+        status, errors = {}, {}
+        tickers = list(dict.fromkeys(tickers))
+
+        def work(t):
+            try:
+                status[t] = self.refresh(t, period=period)
+            except Exception as e:
+                errors[t] = f"{type(e).__name__}: {e}"
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as ex:
+            for i, _ in enumerate(ex.map(work, tickers), start=1):
+                if on_progress:
+                    on_progress(i, len(tickers), tickers[i - 1])
+        return {"status": status, "errors": errors}
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def default_store() -> PriceStore:
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = PriceStore()
+        return _default_store
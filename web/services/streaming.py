@@ -0,0 +1,284 @@
+# services/streaming.py
+import copy
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from services.orderflow import obv, adl
+from services.technical import ema, atr
+
+
+def _alpha_from_span(span):
+    # sama persis dengan pandas: span -> com -> alpha
+    com = (span - 1) / 2.0
+    return 1.0 / (1.0 + com)
+
+
+def _alpha_from_alpha(alpha):
+    # pandas juga lewat com dulu, jadi alpha ikut dibulatkan dengan cara yang sama
+    com = 1.0 / alpha - 1.0
+    return 1.0 / (1.0 + com)
+
+
+class _Ewm:
+    """ewm(adjust=False).mean() satu langkah, replika aritmetika pandas."""
+    __slots__ = ("alpha", "value")
+
+    def __init__(self, alpha, value=math.nan):
+        self.alpha = alpha
+        self.value = value
+
+    def update(self, x):
+        if math.isnan(x):
+            return self.value
+        if math.isnan(self.value):
+            self.value = x
+        elif self.value != x:
+            old_wt = 1.0 - self.alpha
+            new_wt = self.alpha
+            self.value = (old_wt * self.value + new_wt * x) / (old_wt + new_wt)
+        return self.value
+
+
+class _RollingMean:
+    """
+    rolling(window).mean() incremental, replika algoritma pandas
+    (penjumlahan Kahan + kompensasi terpisah untuk tambah/hapus),
+    jadi hasilnya identik bit-per-bit dengan versi batch.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.buf = deque(maxlen=window)
+        self.nobs = 0
+        self.neg_ct = 0
+        self.sum_x = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.same_ct = 0
+        self.prev = math.nan
+
+    def _add(self, val):
+        if math.isnan(val):
+            return
+        self.nobs += 1
+        y = val - self.comp_add
+        t = self.sum_x + y
+        self.comp_add = t - self.sum_x - y
+        self.sum_x = t
+        if math.copysign(1.0, val) < 0:
+            self.neg_ct += 1
+        if val == self.prev:
+            self.same_ct += 1
+        else:
+            self.same_ct = 1
+        self.prev = val
+
+    def _remove(self, val):
+        if math.isnan(val):
+            return
+        self.nobs -= 1
+        y = -val - self.comp_remove
+        t = self.sum_x + y
+        self.comp_remove = t - self.sum_x - y
+        self.sum_x = t
+        if math.copysign(1.0, val) < 0:
+            self.neg_ct -= 1
+
+    def update(self, val):
+        if len(self.buf) == self.window:
+            self._remove(self.buf[0])
+        elif not self.buf:
+            self.prev = val
+            self.same_ct = 0
+        self.buf.append(val)
+        self._add(val)
+        return self.value
+
+    @property
+    def value(self):
+        if self.nobs < self.window or self.nobs == 0:
+            return math.nan
+        result = self.sum_x / self.nobs
+        if self.same_ct >= self.nobs:
+            result = self.prev
+        elif self.neg_ct == 0 and result < 0:
+            result = 0.0
+        elif self.neg_ct == self.nobs and result > 0:
+            result = 0.0
+        return result
+
+    def copy(self):
+        new = copy.copy(self)
+        new.buf = deque(self.buf, maxlen=self.window)
+        return new
+
+    def to_dict(self):
+        return {
+            "window": self.window, "buf": list(self.buf), "nobs": self.nobs, "neg_ct": self.neg_ct,
+            "sum_x": self.sum_x, "comp_add": self.comp_add, "comp_remove": self.comp_remove,
+            "same_ct": self.same_ct, "prev": self.prev,
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        r = cls(d["window"])
+        r.buf.extend(d["buf"])
+        for k in ("nobs", "neg_ct", "sum_x", "comp_add", "comp_remove", "same_ct", "prev"):
+            setattr(r, k, d[k])
+        return r
+
+
+class IndicatorState:
+    """
+    State indikator per ticker yang bisa dimajukan satu bar dalam O(1):
+    EMA20/50/200, RSI14 (Wilder), ATR14, VOL_AVG20, OBV, ADL.
+    Nilainya identik dengan add_indicators / obv / adl versi batch.
+
+        st = IndicatorState.from_history(df)   # seed dari history
+        vals = st.update(bar)                  # bar: dict/Series OHLCV
+        blob = st.to_dict()                    # JSON-able
+    """
+
+    EMA_SPANS = (20, 50, 200)
+    RSI_PERIOD = 14
+    ATR_PERIOD = 14
+    VOL_WINDOW = 20
+
+    def __init__(self):
+        self.ema = {n: _Ewm(_alpha_from_span(n)) for n in self.EMA_SPANS}
+        self.avg_gain = _Ewm(_alpha_from_alpha(1 / self.RSI_PERIOD))
+        self.avg_loss = _Ewm(_alpha_from_alpha(1 / self.RSI_PERIOD))
+        self.atr = _Ewm(_alpha_from_alpha(1 / self.ATR_PERIOD))
+        self.vol_avg = _RollingMean(self.VOL_WINDOW)
+        self.obv = 0.0
+        self.adl = 0.0
+        self.prev_close = math.nan
+        self.last_date = None
+        self.bars = 0
+
+    # ---------- seed ----------
+    @classmethod
+    def from_history(cls, df: pd.DataFrame) -> "IndicatorState":
+        """Seed dari df OHLCV (tanpa NaN). EWM/OBV/ADL diambil dari versi batch, rolling volume diputar ulang."""
+        st = cls()
+        if df is None or df.empty:
+            return st
+
+        close = df["Close"]
+        for n in cls.EMA_SPANS:
+            st.ema[n].value = float(ema(close, n).iloc[-1])
+
+        delta = close.diff()
+        p = cls.RSI_PERIOD
+        st.avg_gain.value = float(delta.clip(lower=0).ewm(alpha=1/p, adjust=False).mean().iloc[-1])
+        st.avg_loss.value = float((-delta.clip(upper=0)).ewm(alpha=1/p, adjust=False).mean().iloc[-1])
+        st.atr.value = float(atr(df, cls.ATR_PERIOD).iloc[-1])
+
+        for v in df["Volume"].to_numpy(dtype="float64"):
+            st.vol_avg.update(float(v))
+
+        # OBV / ADL: cumsum sekuensial, sama dengan services/orderflow
+        st.obv = float(obv(df).iloc[-1])
+        st.adl = float(adl(df).iloc[-1])
+
+        st.prev_close = float(close.iloc[-1])
+        st.last_date = df.index[-1]
+        st.bars = len(df)
+        return st
+
+    # ---------- step ----------
+    def update(self, bar, date=None) -> dict:
+        o, h, l, c, v = (float(bar[k]) for k in ("Open", "High", "Low", "Close", "Volume"))
+
+        for e in self.ema.values():
+            e.update(c)
+
+        pc = self.prev_close
+        if not math.isnan(pc):
+            delta = c - pc
+            self.avg_gain.update(max(delta, 0.0))
+            self.avg_loss.update(-min(delta, 0.0))
+            tr = max(h - l, abs(h - pc), abs(l - pc))
+            direction = float(np.sign(delta))
+        else:
+            tr = h - l
+            direction = 0.0
+        self.atr.update(tr)
+        self.vol_avg.update(v)
+
+        self.obv += direction * v
+        rng = (h - l) if (h - l) != 0 else 1e-12
+        self.adl += ((c - l) - (h - c)) / rng * v
+
+        self.prev_close = c
+        self.last_date = date if date is not None else getattr(bar, "name", None)
+        self.bars += 1
+        return self.values(bar)
+
+    # ---------- output ----------
+    @property
+    def rsi14(self):
+        avg_loss = self.avg_loss.value
+        if avg_loss == 0:
+            avg_loss = 1e-12
+        rs = self.avg_gain.value / avg_loss
+        return 100 - (100 / (1 + rs))
+
+    def values(self, bar=None) -> dict:
+        out = {
+            "EMA20": self.ema[20].value,
+            "EMA50": self.ema[50].value,
+            "EMA200": self.ema[200].value,
+            "RSI14": self.rsi14,
+            "ATR14": self.atr.value,
+            "VOL_AVG20": self.vol_avg.value,
+            "OBV": self.obv,
+            "ADL": self.adl,
+        }
+        if bar is not None:
+            out.update({k: float(bar[k]) for k in ("Open", "High", "Low", "Close", "Volume")})
+        return out
+
+    def copy(self) -> "IndicatorState":
+        """Salinan murah (tanpa history) untuk menghitung bar berjalan tanpa mengubah state asli."""
+        new = copy.copy(self)
+        new.ema = {n: _Ewm(e.alpha, e.value) for n, e in self.ema.items()}
+        new.avg_gain = _Ewm(self.avg_gain.alpha, self.avg_gain.value)
+        new.avg_loss = _Ewm(self.avg_loss.alpha, self.avg_loss.value)
+        new.atr = _Ewm(self.atr.alpha, self.atr.value)
+        new.vol_avg = self.vol_avg.copy()
+        return new
+
+    # ---------- serialisasi ----------
+    def to_dict(self) -> dict:
+        return {
+            "ema": {str(n): e.value for n, e in self.ema.items()},
+            "avg_gain": self.avg_gain.value,
+            "avg_loss": self.avg_loss.value,
+            "atr": self.atr.value,
+            "vol_avg": self.vol_avg.to_dict(),
+            "obv": self.obv,
+            "adl": self.adl,
+            "prev_close": self.prev_close,
+            "last_date": None if self.last_date is None else str(pd.Timestamp(self.last_date)),
+            "bars": self.bars,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "IndicatorState":
+        st = cls()
+        for n, v in d["ema"].items():
+            st.ema[int(n)].value = v
+        st.avg_gain.value = d["avg_gain"]
+        st.avg_loss.value = d["avg_loss"]
+        st.atr.value = d["atr"]
+        st.vol_avg = _RollingMean.from_dict(d["vol_avg"])
+        st.obv = d["obv"]
+        st.adl = d["adl"]
+        st.prev_close = d["prev_close"]
+        st.last_date = pd.Timestamp(d["last_date"]) if d.get("last_date") else None
+        st.bars = d["bars"]
+        return st
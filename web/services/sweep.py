@@ -0,0 +1,187 @@
+# services/sweep.py
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from services.backtest import WARMUP, simulate
+from services.store import default_store
+from services.technical import add_indicators, plan_signals
+
+# default: grid kecil (12 kombinasi) supaya sweep seluruh universe tetap dalam hitungan menit
+DEFAULT_GRID = {
+    "rr": [1.5, 2.0, 3.0],
+    "pullback_pct": [0.03],
+    "atr_mult": [1.2, 1.5],
+    "rsi_up": [(45, 70), (40, 65)],
+    "rsi_side": [(40, 60)],
+    "vol_min": [1.2],
+}
+
+# grid lengkap (432 kombinasi per ticker, berjam-jam untuk seluruh universe): opt-in lewat grid=FULL_GRID
+FULL_GRID = {
+    "rr": [1.5, 2.0, 2.5, 3.0],
+    "pullback_pct": [0.02, 0.03, 0.05],
+    "atr_mult": [1.0, 1.2, 1.5, 2.0],
+    "rsi_up": [(45, 70), (40, 65), (50, 75)],
+    "rsi_side": [(40, 60)],
+    "vol_min": [1.0, 1.2, 1.5],
+}
+
+STAT_COLUMNS = ["trades", "hit_rate", "expectancy_r", "expectancy_pct", "profit_factor",
+                "total_return_pct", "max_dd_pct"]
+
+
+def param_grid(grid: dict) -> list[dict]:
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def _flat(params: dict) -> dict:
+    """Tuple band RSI -> dua kolom (rsi_up_lo, rsi_up_hi) supaya tabel tetap kolumnar."""
+    out = {}
+    for k, v in params.items():
+        if isinstance(v, (tuple, list)):
+            out[f"{k}_lo"], out[f"{k}_hi"] = v
+        else:
+            out[k] = v
+    return out
+
+
+def sweep_df(df_raw: pd.DataFrame, combos: list[dict], windows=None, **sim_kwargs) -> list[dict]:
+    """
+    Evaluasi semua kombinasi parameter untuk satu ticker.
+    Indikator dihitung SEKALI lalu dipakai bersama oleh semua kombinasi.
+    windows: list (start, end) tanggal; None = seluruh history.
+    """
+    d = add_indicators(df_raw)
+    windows = windows or [(None, None)]
+    rows = []
+    for combo in combos:
+        sig = plan_signals(d, **combo)
+        sig.loc[sig.index[:WARMUP], "setup_ok"] = False
+        for start, end in windows:
+            dw, sw = d.loc[start:end], sig.loc[start:end]
+            if dw.empty:
+                continue
+            res = simulate(dw, sw, warmup=0, **sim_kwargs)
+            rows.append({
+                **_flat(combo),
+                "window": f"{dw.index[0].date()}..{dw.index[-1].date()}",
+                **res["stats"],
+            })
+    return rows
+
+
+def sweep_ticker(ticker: str, combos: list[dict], period="5y", windows=None, **sim_kwargs) -> pd.DataFrame:
+    df_raw = default_store().get(ticker, period=period, refresh=False)
+    if len(df_raw) <= WARMUP:
+        return pd.DataFrame()
+    out = pd.DataFrame(sweep_df(df_raw, combos, windows=windows, **sim_kwargs))
+    if out.empty:
+        return out
+    out.insert(0, "Ticker", ticker)
+    return _compact(out)
+
+
+def _compact(df: pd.DataFrame) -> pd.DataFrame:
+    for c in df.columns:
+        if c in ("Ticker", "window"):
+            df[c] = df[c].astype("category")
+        elif c == "trades":
+            df[c] = df[c].astype("int32")
+        elif df[c].dtype.kind == "f" or df[c].dtype == object:
+            df[c] = pd.to_numeric(df[c], errors="coerce").astype("float32")
+    return df
+
+
+def _grid_key(combos, period, windows, sim_kwargs) -> str:
+    blob = json.dumps({"combos": combos, "period": period, "windows": windows, "sim": sim_kwargs},
+                      sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode()).hexdigest()[:12]
+
+
+def run_sweep(tickers, out_dir: str, grid=None, period="5y", windows=None, max_workers=None,
+              on_progress=None, **sim_kwargs) -> pd.DataFrame:
+    """
+    Grid sweep paralel (satu task = satu ticker x semua kombinasi), default DEFAULT_GRID;
+    grid=FULL_GRID untuk sweep lengkap.
+    Hasil per ticker ditulis ke `out_dir/<ticker>.parquet` begitu selesai, jadi kalau
+    proses terputus, run berikutnya dengan grid yang sama melanjutkan ticker yang belum ada.
+    Ticker yang error (mis. Parquet rusak) tidak menghentikan sweep: dicatat di
+    `out_dir/errors.json` dan `hasil.attrs["errors"]`, lalu dicoba lagi di run berikutnya.
+    """
+    combos = param_grid(grid or DEFAULT_GRID)
+    os.makedirs(out_dir, exist_ok=True)
+
+    key = _grid_key(combos, period, windows, sim_kwargs)
+    manifest = os.path.join(out_dir, "sweep.json")
+    if os.path.exists(manifest):
+        with open(manifest) as f:
+            if json.load(f).get("key") != key:
+                raise ValueError(f"{out_dir} berisi hasil sweep dengan grid lain; pakai folder baru")
+    else:
+        with open(manifest, "w") as f:
+            json.dump({"key": key, "combos": len(combos), "period": period}, f)
+
+    tickers = list(dict.fromkeys(tickers))
+    done = {f[:-len(".parquet")] for f in os.listdir(out_dir) if f.endswith(".parquet")}
+    todo = [t for t in tickers if t not in done]
+    max_workers = max_workers or os.cpu_count() or 1
+
+    errors = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as ex:
+        futures = {ex.submit(sweep_ticker, t, combos, period, windows, **sim_kwargs): t for t in todo}
+        for i, fut in enumerate(as_completed(futures), start=1):
+            t = futures[fut]
+            try:
+                res = fut.result()
+                path = os.path.join(out_dir, f"{t}.parquet")
+                res.to_parquet(path + ".tmp")
+                os.replace(path + ".tmp", path)  # file ada = ticker selesai
+            except Exception as e:
+                errors[t] = f"{type(e).__name__}: {e}"
+            if on_progress:
+                on_progress(len(done) + i, len(tickers), t)
+
+    tmp = os.path.join(out_dir, "errors.json.tmp")
+    with open(tmp, "w") as f:
+        json.dump(errors, f, indent=1)
+    os.replace(tmp, os.path.join(out_dir, "errors.json"))
+
+    out = load_sweep(out_dir)
+    out.attrs["errors"] = errors
+    return out
+
+
+def load_sweep(out_dir: str) -> pd.DataFrame:
+    parts = [pd.read_parquet(os.path.join(out_dir, f)) for f in sorted(os.listdir(out_dir)) if f.endswith(".parquet")]
+    parts = [p for p in parts if not p.empty]
+    if not parts:
+        return pd.DataFrame()
+    return pd.concat(parts, ignore_index=True)
+
+
+def summarize_sweep(results: pd.DataFrame) -> pd.DataFrame:
+    """Agregat per kombinasi parameter lintas ticker (rata-rata tertimbang jumlah trade)."""
+    if results.empty:
+        return results
+    params = [c for c in results.columns if c not in STAT_COLUMNS + ["Ticker", "window"]]
+    r = results.copy()
+    w = r["trades"].astype("float64")
+    r["_hit_w"] = r["hit_rate"].astype("float64").fillna(0) * w
+    r["_exp_w"] = r["expectancy_r"].astype("float64").fillna(0) * w
+    g = r.groupby(params, observed=True)
+    out = pd.DataFrame({
+        "tickers": g["Ticker"].nunique(),
+        "trades": g["trades"].sum(),
+        "hit_rate": g["_hit_w"].sum() / g["trades"].sum().replace(0, np.nan),
+        "expectancy_r": g["_exp_w"].sum() / g["trades"].sum().replace(0, np.nan),
+        "median_return_pct": g["total_return_pct"].median(),
+        "median_max_dd_pct": g["max_dd_pct"].median(),
+    })
+    return out.sort_values("expectancy_r", ascending=False).reset_index()
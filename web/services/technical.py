@@ -13,12 +13,35 @@ def rsi(series: pd.Series, period: int = 14) -> pd.Series:
     rs = avg_gain / avg_loss
     return 100 - (100 / (1 + rs))
 
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """True range tanpa concat: fmax mengabaikan NaN (bar pertama -> high - low)."""
+    prev_close = np.empty_like(close)
+    prev_close[0] = np.nan
+    prev_close[1:] = close[:-1]
+    return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
 def atr(df: pd.DataFrame, period: int = 14) -> pd.Series:
-    high, low, close = df["High"], df["Low"], df["Close"]
-    prev_close = close.shift(1)
-    tr = pd.concat([(high - low), (high - prev_close).abs(), (low - prev_close).abs()], axis=1).max(axis=1)
+    high, low, close = (df[k].to_numpy(dtype="float64") for k in ("High", "Low", "Close"))
+    tr = pd.Series(true_range(high, low, close), index=df.index)
     return tr.ewm(alpha=1/period, adjust=False).mean()
 
+
+INDICATOR_COLUMNS = ["EMA20", "EMA50", "EMA200", "RSI14", "ATR14", "VOL_AVG20"]
+
+
+def indicator_block(df: pd.DataFrame) -> np.ndarray:
+    """Semua seri turunan add_indicators sekali jalan ke satu array (len(INDICATOR_COLUMNS), n) float64."""
+    close = df["Close"]
+    out = np.empty((len(INDICATOR_COLUMNS), len(df)))
+    out[0] = ema(close, 20).to_numpy()
+    out[1] = ema(close, 50).to_numpy()
+    out[2] = ema(close, 200).to_numpy()
+    out[3] = rsi(close, 14).to_numpy()
+    out[4] = atr(df, 14).to_numpy()
+    out[5] = df["Volume"].rolling(20).mean().to_numpy()
+    return out
+
+
 def add_indicators(df: pd.DataFrame) -> pd.DataFrame:
     if df is None or df.empty:
         return pd.DataFrame()
@@ -26,19 +49,135 @@ def add_indicators(df: pd.DataFrame) -> pd.DataFrame:
     if "Close" not in df.columns:
         return pd.DataFrame()
 
-    d = df.copy()
-    d["EMA20"] = ema(d["Close"], 20)
-    d["EMA50"] = ema(d["Close"], 50)
-    d["EMA200"] = ema(d["Close"], 200)
-    d["RSI14"] = rsi(d["Close"], 14)
-    d["ATR14"] = atr(d, 14)
-    d["VOL_AVG20"] = d["Volume"].rolling(20).mean()
-    return d
+    # tanpa df.copy(): kolom input dipakai bersama (copy-on-write pandas -> copy hanya kalau ditulis),
+    # indikator = baris-baris satu blok yang dialokasikan sekali
+    block = indicator_block(df)
+    cols = {c: df[c] for c in df.columns}
+    cols.update({c: pd.Series(block[k], index=df.index, copy=False) for k, c in enumerate(INDICATOR_COLUMNS)})
+    return pd.DataFrame(cols, copy=False)
+
+
+def plan_signals(d: pd.DataFrame, rr=2.0, pullback_pct=0.03, atr_mult=1.2,
+                 rsi_up=(45, 70), rsi_side=(40, 60), vol_min=1.2) -> pd.DataFrame:
+    """
+    Versi vektor technical_plan untuk SETIAP bar (dipakai backtest).
+    Baris t hanya memakai data s/d bar t (EMA/RSI/ATR/rolling kausal), tidak ada lookahead.
+    d = output add_indicators.
+    """
+    close = d["Close"]
+    ema20, ema50, ema200 = d["EMA20"], d["EMA50"], d["EMA200"]
+    vol_avg = d["VOL_AVG20"].where(d["VOL_AVG20"] > 0, 1.0)
+    vol_ratio = d["Volume"] / vol_avg
+
+    up = (ema20 > ema50) & (ema50 > ema200)
+    down = (ema20 < ema50) & (ema50 < ema200)
+    trend = np.select([up, down], ["UPTREND", "DOWNTREND"], default="SIDEWAYS")
+
+    pullback_ok = (close - ema20).abs() / ema20 <= pullback_pct
+    rsi14 = d["RSI14"]
+    rsi_ok = np.where(up, rsi14.between(*rsi_up), rsi14.between(*rsi_side))
+    vol_ok = vol_ratio >= vol_min
+
+    entry_low = ema20 * 0.995
+    entry_high = ema20 * 1.005
+    entry = (entry_low + entry_high) / 2
+    stop = np.minimum(ema50 * 0.985, entry - atr_mult * d["ATR14"])
+    risk = entry - stop
+
+    return pd.DataFrame({
+        "trend": trend,
+        "rsi14": rsi14,
+        "vol_ratio": vol_ratio,
+        "entry_low": entry_low,
+        "entry_high": entry_high,
+        "entry": entry,
+        "stop": stop,
+        "tp": entry + rr * risk,
+        "setup_ok": up & pullback_ok & rsi_ok & vol_ok & (risk > 0),
+    }, index=d.index)
+
+
+# =========================
+# PANEL (wide: index tanggal x kolom ticker)
+# =========================
+PANEL_FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def _pack(panel: dict):
+    """
+    Rapatkan bar valid tiap ticker ke atas (urutan waktu tetap), NaN di bawah.
+    Setelah dipack, ewm/diff/shift/rolling per kolom = persis versi per-ticker
+    (yang memakai df.dropna()), karena bar kosong (suspend / belum listing) hilang.
+    """
+    close = panel["Close"]
+    values = {f: panel[f].reindex(index=close.index, columns=close.columns).to_numpy(dtype="float64")
+              for f in PANEL_FIELDS}
+    valid = np.logical_and.reduce([~np.isnan(v) for v in values.values()])
+    order = np.argsort(~valid, axis=0, kind="stable")
+
+    packed = {}
+    for f, v in values.items():
+        v = np.where(valid, v, np.nan)
+        packed[f] = pd.DataFrame(np.take_along_axis(v, order, axis=0), columns=close.columns)
+    return packed, order, valid
+
+
+def _unpack(packed: pd.DataFrame, order, valid, like: pd.DataFrame) -> pd.DataFrame:
+    out = np.empty(order.shape)
+    np.put_along_axis(out, order, packed.to_numpy(), axis=0)
+    out[~valid] = np.nan
+    return pd.DataFrame(out, index=like.index, columns=like.columns)
+
 
+def add_indicators_panel(panel: dict) -> dict:
+    """
+    Versi vektor add_indicators untuk banyak ticker sekaligus.
+    panel: {"Open": wide, "High": wide, "Low": wide, "Close": wide, "Volume": wide}
+    Output: {"EMA20": wide, "EMA50": wide, "EMA200": wide, "RSI14": wide, "ATR14": wide, "VOL_AVG20": wide}
+    Hasil per kolom sama persis dengan add_indicators(df_ticker).
+    """
+    if not panel or panel.get("Close") is None or panel["Close"].empty:
+        return {}
 
-def technical_plan(df: pd.DataFrame, rr=2.0, pullback_pct=0.03, atr_mult=1.2):
-    last = df.iloc[-1]
+    p, order, valid = _pack(panel)
+    close = p["Close"]
 
+    # true range tanpa concat: fmax mengabaikan NaN (bar pertama -> high - low)
+    prev_close = close.shift(1)
+    tr = np.fmax(
+        p["High"] - p["Low"],
+        np.fmax((p["High"] - prev_close).abs(), (p["Low"] - prev_close).abs()),
+    )
+
+    out = {
+        "EMA20": ema(close, 20),
+        "EMA50": ema(close, 50),
+        "EMA200": ema(close, 200),
+        "RSI14": rsi(close, 14),
+        "ATR14": tr.ewm(alpha=1/14, adjust=False).mean(),
+        "VOL_AVG20": p["Volume"].rolling(20).mean(),
+    }
+    like = panel["Close"]
+    return {k: _unpack(v, order, valid, like) for k, v in out.items()}
+
+
+def panel_from_frames(frames: dict) -> dict:
+    """dict {ticker: df OHLCV} -> panel wide per field (kalender = gabungan tanggal)."""
+    return {
+        f: pd.DataFrame({t: df[f] for t, df in frames.items()}).sort_index()
+        for f in PANEL_FIELDS
+    }
+
+
+def technical_plan(df: pd.DataFrame, rr=2.0, pullback_pct=0.03, atr_mult=1.2,
+                   rsi_up=(45, 70), rsi_side=(40, 60), vol_min=1.2):
+    return plan_from_row(df.iloc[-1], rr=rr, pullback_pct=pullback_pct, atr_mult=atr_mult,
+                         rsi_up=rsi_up, rsi_side=rsi_side, vol_min=vol_min)
+
+
+def plan_from_row(last, rr=2.0, pullback_pct=0.03, atr_mult=1.2,
+                  rsi_up=(45, 70), rsi_side=(40, 60), vol_min=1.2):
+    """technical_plan dari satu baris (Series / dict) OHLCV + indikator, mis. dari IndicatorState."""
     close = float(last["Close"])
     ema20 = float(last["EMA20"])
     ema50 = float(last["EMA50"])
@@ -60,10 +199,11 @@ def technical_plan(df: pd.DataFrame, rr=2.0, pullback_pct=0.03, atr_mult=1.2):
     pullback_ok = abs(close - ema20) / ema20 <= pullback_pct
 
     # ---- RSI context (lebih fleksibel)
-    rsi_ok = 45 <= rsi14 <= 70 if trend == "UPTREND" else 40 <= rsi14 <= 60
+    rsi_lo, rsi_hi = rsi_up if trend == "UPTREND" else rsi_side
+    rsi_ok = rsi_lo <= rsi14 <= rsi_hi
 
     # ---- Volume confirmation
-    vol_ok = vol_ratio >= 1.2
+    vol_ok = vol_ratio >= vol_min
 
     # ---- Entry (defensif)
     entry_low = ema20 * 0.995
@@ -106,3 +246,90 @@ def technical_plan(df: pd.DataFrame, rr=2.0, pullback_pct=0.03, atr_mult=1.2):
         "rr": rr,
         "setup_ok": setup_ok
     }
+
+
+# =========================
+# MULTI-TIMEFRAME
+# =========================
+TIMEFRAME_LABELS = {"1d": "Daily", "1wk": "Weekly", "1mo": "Monthly"}
+
+
+def _tf_snapshot(d: pd.DataFrame, pullback_pct, long_bars=200, **plan_kwargs) -> dict:
+    """Kondisi bar terakhir satu timeframe (d = output add_indicators)."""
+    last = plan_signals(d.tail(1), pullback_pct=pullback_pct, **plan_kwargs).iloc[-1]
+    row = d.iloc[-1]
+    close, ema20, ema50 = float(row["Close"]), float(row["EMA20"]), float(row["EMA50"])
+
+    trend, basis = last["trend"], "EMA20/50/200"
+    if len(d) < long_bars:
+        # EMA200 belum bermakna (mis. bulanan 2 tahun = 24 bar) -> cukup EMA20 vs EMA50
+        basis = "EMA20/50"
+        trend = "UPTREND" if ema20 > ema50 else "DOWNTREND" if ema20 < ema50 else "SIDEWAYS"
+
+    rsi_lo, rsi_hi = plan_kwargs["rsi_up"] if trend == "UPTREND" else plan_kwargs["rsi_side"]
+    rsi14 = float(row["RSI14"])
+    return {
+        "bars": len(d),
+        "close": close,
+        "trend": trend,
+        "trend_basis": basis,
+        "rsi14": rsi14,
+        "rsi_ok": bool(rsi_lo <= rsi14 <= rsi_hi),
+        "pullback_ok": bool(abs(close - ema20) / ema20 <= pullback_pct),
+        "vol_ratio": round(float(last["vol_ratio"]), 2),
+        "atr14": float(row["ATR14"]),
+        "setup_ok": bool(last["setup_ok"]),
+    }
+
+
+def multi_timeframe_plan(df: pd.DataFrame, rr=2.0, pullback_pct=0.03, atr_mult=1.2,
+                         rsi_up=(45, 70), rsi_side=(40, 60), vol_min=1.2,
+                         timeframes=("1d", "1wk", "1mo"), require_up=("1wk",), forbid_down=("1mo",)) -> dict:
+    """
+    technical_plan multi-timeframe dari SATU frame OHLCV harian (tanpa download tambahan):
+    weekly/monthly di-resample dari daily, indikator yang sama dihitung di tiap timeframe.
+    Setup gabungan = timeframe `require_up` UPTREND, `forbid_down` tidak DOWNTREND,
+    dan timeframe dasar (pertama) sedang pullback ke EMA20 dengan RSI dalam band.
+    Entry / stop / TP tetap dari timeframe dasar.
+    """
+    from services.intraday import resample_ohlcv  # lazy: intraday -> technical
+
+    kwargs = dict(rr=rr, atr_mult=atr_mult, rsi_up=rsi_up, rsi_side=rsi_side, vol_min=vol_min)
+    raw = df[["Open", "High", "Low", "Close", "Volume"]]
+    base = timeframes[0]
+
+    breakdown, base_ind = {}, None
+    for tf in timeframes:
+        bars = raw if tf == base else resample_ohlcv(raw, tf)
+        if len(bars) < 2:
+            continue
+        d = add_indicators(bars)
+        if tf == base:
+            base_ind = d
+        breakdown[tf] = _tf_snapshot(d, pullback_pct, **kwargs)
+
+    reasons = []
+    for tf in require_up:
+        t = breakdown.get(tf, {}).get("trend")
+        if t != "UPTREND":
+            reasons.append(f"{TIMEFRAME_LABELS.get(tf, tf)} belum uptrend ({t or 'data kurang'})")
+    for tf in forbid_down:
+        if breakdown.get(tf, {}).get("trend") == "DOWNTREND":
+            reasons.append(f"{TIMEFRAME_LABELS.get(tf, tf)} downtrend")
+    b = breakdown.get(base, {})
+    if not b.get("pullback_ok"):
+        reasons.append(f"{TIMEFRAME_LABELS.get(base, base)} belum pullback ke EMA20")
+    if not b.get("rsi_ok"):
+        reasons.append(f"RSI {TIMEFRAME_LABELS.get(base, base)} di luar band")
+
+    plan = technical_plan(base_ind, pullback_pct=pullback_pct, **kwargs) if base_ind is not None else {}
+    aligned = not reasons and "entry" in plan
+    return {
+        "timeframes": breakdown,
+        "aligned": aligned,
+        "setup_ok": aligned,
+        "reasons": reasons or ["Trend timeframe besar searah, pullback di timeframe dasar"],
+        "entry": plan.get("entry"),
+        "stop": plan.get("stop"),
+        "tp": plan.get("tp"),
+    }
@@ -0,0 +1,141 @@
+# services/universe.py
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from services.data import OHLCV_COLUMNS, get_ohlcv
+
+PRICE_FIELDS = ["Open", "High", "Low", "Close"]
+
+
+class UniversePrices:
+    """
+    OHLCV harian seluruh universe dalam array padat bersama satu kalender bursa:
+    - harga: float32 (4, N, T)  -> Open/High/Low/Close, NaN = tidak ada bar
+    - volume: int64 (N, T)      -> 0 kalau tidak ada bar
+    Memori 24 byte per (ticker, tanggal kalender) vs 40 byte float64 + 8 byte index per bar di
+    DataFrame terpisah (benchmarks/bench_universe.py, 1000 ticker x 5y: 32 MB vs 48 MB,
+    termasuk padding NaN sebelum listing). Baris satu ticker kontigu, jadi frame(ticker) hanya
+    membungkus view (tanpa copy) dan panel(field) = view (T, N) untuk operasi lintas-ticker.
+    float32 menyimpan harga IDX (kelipatan tick, < 2^24) secara eksak.
+    """
+
+    def __init__(self, calendar: pd.DatetimeIndex, tickers, prices: np.ndarray, volume: np.ndarray):
+        self.calendar = pd.DatetimeIndex(calendar, name="Date")
+        self.tickers = list(tickers)
+        self.prices = prices
+        self.volume = volume
+        self._pos = {t: i for i, t in enumerate(self.tickers)}
+
+        valid = ~np.isnan(prices[PRICE_FIELDS.index("Close")])
+        any_valid = valid.any(axis=1)
+        first = np.where(any_valid, valid.argmax(axis=1), 0)
+        last = np.where(any_valid, valid.shape[1] - valid[:, ::-1].argmax(axis=1), 0)
+        self._span = np.stack([first, last], axis=1)
+        # bar kosong di tengah rentang (suspensi) -> frame() harus memfilter (copy)
+        self._gaps = valid.sum(axis=1) != (last - first)
+
+    # ---------- bangun ----------
+    @classmethod
+    def from_frames(cls, frames: dict, dtype="float32") -> "UniversePrices":
+        """dict {ticker: df OHLCV} (output get_ohlcv / PriceStore) -> universe; kalender = gabungan tanggal."""
+        frames = {t: df for t, df in frames.items() if df is not None and not df.empty}
+        calendar = pd.DatetimeIndex([])
+        for df in frames.values():
+            calendar = calendar.union(pd.DatetimeIndex(df.index))
+        n, t = len(frames), len(calendar)
+
+        prices = np.full((len(PRICE_FIELDS), n, t), np.nan, dtype=dtype)
+        volume = np.zeros((n, t), dtype="int64")
+        for i, df in enumerate(frames.values()):
+            pos = calendar.get_indexer(df.index)
+            prices[:, i, pos] = df[PRICE_FIELDS].to_numpy(dtype=dtype).T
+            volume[i, pos] = np.nan_to_num(df["Volume"].to_numpy(dtype="float64")).astype("int64")
+        return cls(calendar, frames.keys(), prices, volume)
+
+    @classmethod
+    def from_tickers(cls, tickers, period="5y", loader=None, **kwargs) -> "UniversePrices":
+        """Muat lewat get_ohlcv (cache / PriceStore); ticker tanpa data dilewati."""
+        loader = loader or (lambda t: get_ohlcv(t, period=period))
+        return cls.from_frames({t: loader(t) for t in tickers}, **kwargs)
+
+    # ---------- simpan / memory-map ----------
+    def save(self, root: str):
+        os.makedirs(root, exist_ok=True)
+        for name, arr in (("prices", self.prices), ("volume", self.volume),
+                          ("calendar", self.calendar.as_unit("ns").asi8)):
+            tmp = os.path.join(root, f"{name}.tmp.npy")
+            np.save(tmp, arr)
+            os.replace(tmp, os.path.join(root, f"{name}.npy"))
+        tmp = os.path.join(root, "tickers.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.tickers, f)
+        os.replace(tmp, os.path.join(root, "tickers.json"))
+
+    @classmethod
+    def load(cls, root: str, mmap=True) -> "UniversePrices":
+        """`mmap=True`: array dibaca lazily dari disk (read-only), dipakai bersama antar proses lewat page cache."""
+        mode = "r" if mmap else None
+        with open(os.path.join(root, "tickers.json")) as f:
+            tickers = json.load(f)
+        calendar = pd.DatetimeIndex(np.load(os.path.join(root, "calendar.npy")).view("datetime64[ns]"))
+        return cls(calendar, tickers,
+                   np.load(os.path.join(root, "prices.npy"), mmap_mode=mode),
+                   np.load(os.path.join(root, "volume.npy"), mmap_mode=mode))
+
+    # ---------- akses ----------
+    def __len__(self):
+        return len(self.tickers)
+
+    def __contains__(self, ticker):
+        return ticker in self._pos
+
+    @property
+    def nbytes(self) -> int:
+        return self.prices.nbytes + self.volume.nbytes + self.calendar.nbytes
+
+    def frame(self, ticker: str) -> pd.DataFrame:
+        """
+        DataFrame OHLCV satu ticker (kolom & index seperti get_ohlcv) yang membungkus view array,
+        tanpa copy. Ticker dengan bar kosong di tengah (suspensi) difilter -> copy.
+        Hasilnya read-only kalau universe di-memory-map; add_indicators / orderflow_radar tidak menulis ke input.
+        """
+        i = self._pos[ticker]
+        a, b = self._span[i]
+        cols = {f: self.prices[k, i, a:b] for k, f in enumerate(PRICE_FIELDS)}
+        cols["Volume"] = self.volume[i, a:b]
+        df = pd.DataFrame(cols, index=self.calendar[a:b], columns=OHLCV_COLUMNS, copy=False)
+        if self._gaps[i]:
+            df = df.loc[~np.isnan(cols["Close"])]
+        return df
+
+    def frames(self) -> dict:
+        return {t: self.frame(t) for t in self.tickers}
+
+    def field(self, name: str) -> np.ndarray:
+        """Array (N, T) satu field (view)."""
+        return self.volume if name == "Volume" else self.prices[PRICE_FIELDS.index(name)]
+
+    def panel(self, name: str) -> pd.DataFrame:
+        """Wide (tanggal x ticker) satu field, view transpose tanpa copy."""
+        return pd.DataFrame(self.field(name).T, index=self.calendar, columns=self.tickers, copy=False)
+
+    def panel_dict(self) -> dict:
+        """Input add_indicators_panel (technical): {field: wide}."""
+        return {f: self.panel(f) for f in OHLCV_COLUMNS}
+
+    def cross_section(self, date, name="Close") -> pd.Series:
+        """Nilai semua ticker di satu tanggal (bar terakhir <= date)."""
+        j = self.calendar.searchsorted(pd.Timestamp(date), side="right") - 1
+        if j < 0:
+            return pd.Series(dtype="float64", name=name)
+        return pd.Series(self.field(name)[:, j], index=self.tickers, name=self.calendar[j])
+
+    def returns(self, periods=1) -> np.ndarray:
+        """Return Close `periods` bar kalender (N, T), float32; NaN kalau salah satu ujung tidak ada bar."""
+        close = self.field("Close")
+        out = np.full_like(close, np.nan)
+        out[:, periods:] = close[:, periods:] / close[:, :-periods] - 1
+        return out
@@ -4,7 +4,36 @@ def final_verdict(
     valuation_label: str,
     technical_ok: bool,
     bandarmologi_label: str,
+    news_signal: dict = None,
 ):
+    out = _base_verdict(fundamental_score, valuation_label, technical_ok, bandarmologi_label)
+    return apply_news_signal(out, news_signal) if news_signal else out
+
+
+def apply_news_signal(out: dict, news_signal: dict) -> dict:
+    """
+    Sinyal berita (services.news_signal) sebagai input tambahan:
+    - sentimen NEGATIF menahan BUY jadi HOLD
+    - berita HIGH negatif baru-baru ini menurunkan confidence
+    - sentimen POSITIF hanya menambah alasan (tidak pernah meng-upgrade verdict)
+    """
+    verdict, confidence, reasons = out["verdict"], out["confidence"], list(out["reasons"])
+    label = news_signal.get("label")
+
+    if label == "NEGATIF" and verdict.startswith("BUY"):
+        verdict, confidence = "HOLD", "MEDIUM"
+        reasons.append("Sentimen berita negatif, tunggu kejelasan")
+    elif label == "POSITIF" and verdict.startswith("BUY"):
+        reasons.append("Sentimen berita positif")
+
+    if news_signal.get("high_negative") and verdict != "SELL / AVOID":
+        confidence = {"HIGH": "MEDIUM", "MEDIUM": "LOW"}.get(confidence, confidence)
+        reasons.append("Ada berita berdampak HIGH negatif (2 minggu terakhir)")
+
+    return {"verdict": verdict, "confidence": confidence, "reasons": reasons}
+
+
+def _base_verdict(fundamental_score, valuation_label, technical_ok, bandarmologi_label):
     reasons = []
 
     # --- Fundamental gate
@@ -1,3 +1,6 @@
+import os
+
+
 def rupiah(x, digits=0):
     if x is None:
         return "-"
@@ -26,3 +29,36 @@ def rupiah_short(x):
         return f"Rp {x/1_000_000:,.2f} Jt".replace(",", ".")
     else:
         return f"Rp {x:,.0f}".replace(",", ".")
+
+
+def load_watchlist(filename="watchlist.txt"):
+    base_dir = os.path.dirname(os.path.abspath(__file__))  # lokasi folder web/
+    file_path = os.path.join(base_dir, filename)
+
+    try:
+        with open(file_path, "r") as f:
+            tickers = []
+            for line in f:
+                t = line.strip().upper()
+                if not t:
+                    continue
+                if not t.endswith(".JK"):
+                    t += ".JK"
+                tickers.append(t)
+            return tickers
+
+    except FileNotFoundError:
+        return ["BBRI.JK", "ADRO.JK"]
+
+
+def age_label(seconds):
+    """Umur data singkat: 'baru saja', '12 mnt', '3 jam', '2 hari'."""
+    if seconds is None:
+        return "belum ada"
+    if seconds < 60:
+        return "baru saja"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f} mnt"
+    if seconds < 86400:
+        return f"{seconds / 3600:.0f} jam"
+    return f"{seconds / 86400:.0f} hari"